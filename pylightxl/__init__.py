@@ -1 +1 @@
-from .pylightxl import readxl, readcsv, writexl, writecsv, Database
+from .pylightxl import readxl, readxl_many, areadxl, readxl_index, readxl_window, readcsv, writexl, writexl_bytes, awritexl, writecsv, xlsx2csv, Database
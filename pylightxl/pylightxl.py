@@ -62,9 +62,30 @@ Code Structure:
 
 import zipfile
 import re
+import csv
+import itertools
 import os
+import locale
+import io
 import sys
 import shutil
+import multiprocessing
+import multiprocessing.pool
+import collections
+import hashlib
+import tempfile
+import array
+import mmap
+import struct
+import functools
+import threading
+import zlib
+import bisect
+try:
+    import sqlite3
+except ImportError:
+    # python built without sqlite (see SqliteCells)
+    sqlite3 = None
 from xml.etree import cElementTree as ET
 import time
 
@@ -80,37 +101,154 @@ if sys.version_info[0] < 3:
     PermissionError = Exception
     WindowsError = Exception
     import cgi as html
+    import cPickle as pickle
+    import Queue as queue
+    tracemalloc = None
 else:
     unicode = str
     WindowsError = Exception
     import html
+    import pickle
+    import queue
+    import tracemalloc
 
 
 ########################################################################################################
 # SEC-03: READXL FUNCTIONS
 ########################################################################################################
 
-def readxl(fn, ws=None):
+def readxl(fn, ws=None, cache=None, cache_size=1073741824, cache_hash=False, stats=None, progress=None,
+           prefetch=0, nr=None, storage=None, storage_threshold=None):
     """
     Reads an xlsx or xlsm file and returns a pylightxl database
 
     :param str fn: Excel file name
     :param str or list ws: sheetnames to read into the database, if not specified - all sheets are read
                             entry support single ws name (ex: ws='sh1') or multi (ex: ws=['sh1', 'sh2'])
+    :param str cache: (default=None) cache directory. Parsed databases are stored there, later reads of the
+                      same unchanged file (path, size and modified time) load the stored database instead
+                      of parsing the file again. The directory can be shared by processes, cache entries are
+                      only loaded as plain data (see utility_pickle_load). Storage options apply to cache hits too
+    :param int cache_size: (default=1GB) max bytes of the cache directory, least recently used entries are
+                           removed beyond it
+    :param bool cache_hash: (default=False) also key the cache by a hash of the file content, for files whose
+                            modified time is not reliable (ex: some network drives)
+    :param dict or callable stats: (default=None) instrumentation of the read. Each finished phase logs a record
+                                   {'phase': str, 'ws': str or None, 'time': seconds, 'bytes': decompressed bytes,
+                                   'cells': int, 'strings': shared strings resolved, 'peak': bytes or None}
+                                   that is appended to stats['phases'] (dict) or passed to stats(record) (callable).
+                                   Phases are 'zip', 'workbook', 'sharedStrings', then 'namespace', 'worksheet' and
+                                   'size' per worksheet ('cache' for cache reads). 'peak' is the peak allocation of
+                                   the phase if tracemalloc is tracing (python 3.4+)
+    :param callable progress: (default=None) called with {'ws': str, 'sheets_done': int, 'sheets': int,
+                              'rows': None, 'bytes': int, 'total_bytes': int} as each worksheet's xml is parsed
+                              ('bytes' of 'total_bytes' decompressed xml of the worksheet being parsed).
+                              Returning False cancels the read with a UserWarning
+    :param int prefetch: (default=0) number of worksheets decompressed ahead on a background thread while the
+                         current worksheet is parsed (zlib releases the GIL, so the two overlap). Each worksheet
+                         read ahead holds its decompressed xml in memory, 0 reads worksheets one after the other
+    :param str or list or bool nr: (default=None) named range names to read (ex: nr='table1' or nr=['table1',
+                                   'table2']), True for all named ranges. Only the worksheets the named ranges are
+                                   on are read, and only their cells inside the named ranges are kept (parsing of a
+                                   worksheet stops after the last row of its named ranges). Can not be used with ws
+                                   or cache
+    :param str or dict storage: (default=None) cell storage of the worksheets read, 'sqlite' for all worksheets or
+                                {ws: 'sqlite', ...} per worksheet. Cells of sqlite worksheets are streamed to a
+                                sqlite3 database on disk as they are parsed (see Worksheet.set_storage), None keeps
+                                cells in memory
+    :param int storage_threshold: (default=None) worksheets with more cells than this are moved to sqlite storage
+                                  while they are parsed
     :return: pylightxl.Database class
     """
 
     if type(ws) is str:
         ws = (ws,)
 
+    if nr is not None:
+        return readxl_nr(fn, nr, stats=stats, progress=progress, ws=ws, cache=cache)
+
+    fn = readxl_check_excelfile(fn)
+
+    if cache is not None:
+        cache_fn = os.path.join(cache, readxl_cache_key(fn, ws, cache_hash) + '.pylightxl')
+        t0 = time.time()
+        db = readxl_cache_load(cache_fn)
+        if db is not None:
+            # the cache key matches the file, so the file is in the state the cached database was read from
+            db._source_members = readxl_get_members(fn)
+            db._source_ws = ws
+            utility_stats(stats, 'cache', t0, nbytes=os.path.getsize(cache_fn),
+                          cells=sum([len(db.ws(worksheet)._data) for worksheet in db.ws_names]))
+            readxl_cache_storage(db, storage, storage_threshold)
+            utility_progress(progress, sheets_done=len(db.ws_names), sheets=len(db.ws_names))
+            return db
+        db = readxl(fn, ws, stats=stats, progress=progress, prefetch=prefetch, storage=storage,
+                    storage_threshold=storage_threshold)
+        t0 = time.time()
+        readxl_cache_save(db, cache_fn, cache_size)
+        utility_stats(stats, 'cache', t0)
+        return db
+
+    db, sharedString, sheets = readxl_plan(fn, ws, stats)
+
+    if prefetch:
+        contents = readxl_prefetch(fn, sheets, prefetch)
+    else:
+        contents = ((worksheet, fn_ws, None) for worksheet, fn_ws in sheets)
+
+    # scrape each sheet#.xml file
+    try:
+        for sheets_done, (worksheet, fn_ws, content) in enumerate(contents):
+            size = {}
+            sheet_progress = utility_progress_sheet(progress, worksheet, sheets_done, len(sheets))
+            sheet_storage = storage.get(worksheet) if isinstance(storage, dict) else storage
+            if sheet_storage not in [None, 'memory', 'sqlite']:
+                raise UserWarning('pylightxl - Incorrect storage ({}), use "sqlite" or "memory".'.format(sheet_storage))
+            if sheet_storage == 'sqlite' or (storage_threshold is not None and sheet_storage is None):
+                threshold = 0 if sheet_storage == 'sqlite' else storage_threshold
+                data = readxl_scrape_store(fn, fn_ws, sharedString, threshold, stats=stats, ws=worksheet,
+                                           progress=sheet_progress, size=size, content=content)
+            else:
+                data = readxl_scrape(fn, fn_ws, sharedString, stats=stats, ws=worksheet, progress=sheet_progress,
+                                     size=size, content=content)
+            t0 = time.time()
+            db.add_ws(ws=worksheet, data=data, size=[size['maxrow'], size['maxcol']])
+            utility_stats(stats, 'size', t0, ws=worksheet, cells=len(data))
+    finally:
+        # stops the prefetch thread if a worksheet failed or the read was cancelled
+        contents.close()
+    utility_progress(progress, sheets_done=len(sheets), sheets=len(sheets))
+
+    readxl_sync(db, fn, ws, sharedString)
+
+    return db
+
+
+def readxl_plan(fn, ws=None, stats=None):
+    """
+    Reads everything of an excel file but its worksheets: named ranges, sharedStrings and the worksheets
+    to scrape in order (see readxl)
+
+    :param str fn: Excel file name (checked by readxl_check_excelfile)
+    :param tuple ws: sheetnames to read, None for all
+    :param dict or callable stats: (default=None) phase records (see readxl)
+    :return tuple: (pylightxl.Database with named ranges, sharedStrings dict, [(sheetname, fn_ws), ...])
+    """
+
     # declare a db
     db = Database()
 
-    fn = readxl_check_excelfile(fn)
+    # zip member CRCs are logged before parsing so changes made during the read are picked up by db.refresh()
+    t0 = time.time()
+    db._source_members = readxl_get_members(fn)
+    t0 = utility_stats(stats, 'zip', t0)
 
     # {'ws': ws1: {'ws': str, 'rId': str, 'order': str, 'fn_ws': str}, ...
     #  'nr': {nr1: {'nr': str, 'ws': str, 'address': str}, ...}
     wb_rels = readxl_get_workbook(fn)
+    t0 = utility_stats(stats, 'workbook', t0,
+                       nbytes=sum([db._source_members.get(member, (0, 0))[1]
+                                   for member in ('xl/workbook.xml', 'xl/_rels/workbook.xml.rels')]))
 
     for nr_dict in wb_rels['nr'].values():
         name = nr_dict['nr']
@@ -120,6 +258,8 @@ def readxl(fn, ws=None):
 
     # get common string cell value table
     sharedString = readxl_get_sharedStrings(fn)
+    utility_stats(stats, 'sharedStrings', t0, nbytes=db._source_members.get('xl/sharedStrings.xml', (0, 0))[1],
+                  strings=len(sharedString))
 
     # put the ws in order
     ordered_ws = {}
@@ -127,299 +267,1879 @@ def readxl(fn, ws=None):
         order = wb_rels['ws'][worksheet]['order']
         ordered_ws[order] = worksheet
 
-    # scrape each sheet#.xml file
-    if ws is None:
-        # get all worksheets
-        for order in sorted(ordered_ws.keys()):
-            worksheet = ordered_ws[order]
-            fn_ws = wb_rels['ws'][worksheet]['fn_ws']
-            data = readxl_scrape(fn, fn_ws, sharedString)
-            db.add_ws(ws=worksheet, data=data)
-    else:
+    if ws is not None:
         # get only user specified worksheets
         # run through inputs and see if they are within the db read in
         for worksheet in ws:
             if worksheet not in wb_rels['ws'].keys():
                 raise UserWarning('pylightxl - Sheetname ({}) is not in the workbook.'.format(worksheet))
-        for order in sorted(ordered_ws.keys()):
-            worksheet = ordered_ws[order]
-            if worksheet in ws:
-                fn_ws = wb_rels['ws'][worksheet]['fn_ws']
-                data = readxl_scrape(fn, fn_ws, sharedString)
-                db.add_ws(ws=worksheet, data=data)
 
-    return db
+    sheets = []
+    for order in sorted(ordered_ws.keys()):
+        worksheet = ordered_ws[order]
+        if ws is None or worksheet in ws:
+            sheets.append((worksheet, wb_rels['ws'][worksheet]['fn_ws']))
+
+    return db, sharedString, sheets
+
+
+def readxl_nr(fn, nr, stats=None, progress=None, ws=None, cache=None):
+    """
+    Reads only the cells of named ranges of an xlsx or xlsm file and returns a pylightxl database (see readxl)
+
+    :param str fn: Excel file name
+    :param str or list or bool nr: named range names to read, True for all named ranges
+    :param dict or callable stats: (default=None) phase records (see readxl)
+    :param callable progress: (default=None) called as each worksheet is done (see readxl)
+    :param tuple ws: (default=None) must be None, readxl ws and nr can not be used together
+    :param str cache: (default=None) must be None, named range reads are not cached
+    :return: pylightxl.Database class
+    """
+
+    if ws is not None or cache is not None:
+        raise UserWarning('pylightxl - readxl nr can not be used with ws or cache.')
+
+    fn = readxl_check_excelfile(fn)
+
+    db, sharedString, sheets = readxl_plan(fn, stats=stats)
+
+    # {worksheet: [(minrow, mincol, maxrow, maxcol), ...], ...}
+    bounds = readxl_nr_bounds(db, nr)
+    fn_sheets = dict(sheets)
+    for worksheet in bounds.keys():
+        if worksheet not in fn_sheets:
+            raise UserWarning('pylightxl - Named range sheetname ({}) is not in the workbook.'.format(worksheet))
+    sheets = [(worksheet, fn_ws) for worksheet, fn_ws in sheets if worksheet in bounds]
+
+    for sheets_done, (worksheet, fn_ws) in enumerate(sheets):
+        t0 = time.time()
+        size = {}
+        data = readxl_scrape_ranges(fn, fn_ws, sharedString, bounds[worksheet], size=size)
+        utility_stats(stats, 'worksheet', t0, ws=worksheet, cells=len(data))
+        db.add_ws(ws=worksheet, data=data, size=[size['maxrow'], size['maxcol']])
+        utility_progress(progress, ws=worksheet, sheets_done=sheets_done + 1, sheets=len(sheets))
+
+    # in sync with the file: writing back only patches updated cells, cells outside the named ranges are kept
+    readxl_sync(db, fn, tuple([worksheet for worksheet, fn_ws in sheets]), sharedString, nr=nr)
+
+    return db
+
+
+def readxl_nr_bounds(db, nr):
+    """
+    Resolves named ranges into the cell bounds to read on each worksheet
+
+    :param pylightxl.Database db: database with the workbook's named ranges (see readxl_plan)
+    :param str or list or bool nr: named range names, True for all named ranges
+    :return dict: {worksheet: [(minrow, mincol, maxrow, maxcol), ...], ...}
+    """
+
+    if nr is True:
+        names = list(db.nr_names.keys())
+    elif type(nr) is str:
+        names = [nr]
+    else:
+        names = nr
+
+    rv = {}
+    for name in names:
+        if name not in db.nr_names:
+            raise UserWarning('pylightxl - Named range ({}) is not in the workbook.'.format(name))
+        # sheetnames may contain "!", the address is after the last one
+        worksheet, address = db.nr_names[name].rsplit('!', 1)
+        # sheetnames with spaces are quoted (ex: 'Sheet 1'!A1), quotes within them are doubled
+        if worksheet[:1] == "'" and worksheet[-1:] == "'":
+            worksheet = worksheet[1:-1].replace("''", "'")
+        rv.setdefault(worksheet, []).append(utility_range2bounds(address))
+
+    return rv
+
+
+def readxl_sync(db, fn, ws, sharedString, nr=None):
+    """
+    Marks a database as in sync with the excel file it was read from (see Database.refresh and writexl)
+
+    :param pylightxl.Database db: database read from fn
+    :param str fn: Excel file name
+    :param tuple ws: sheetnames read, None for all
+    :param dict sharedString: sharedStrings the worksheets were read with
+    :param str or list or bool nr: (default=None) named ranges read (see readxl nr), None if whole worksheets
+                                   were read
+    :return: None
+    """
+
+    # worksheets are now in sync with the file, writing back to it only has to patch their updated cells
+    for worksheet in db.ws_names:
+        db.ws(worksheet)._dirty = set()
+    db._source = os.path.abspath(fn)
+    db._source_ws = ws
+    db._source_nr = nr
+    db._source_sharedStrings = sharedString
+
+
+def readxl_prefetch(fn, sheets, depth=1):
+    """
+    Generator of decompressed worksheet xml, read ahead on a background thread with at most depth worksheets
+    waiting in the queue. Stopping the generator early (ex: a cancelled read) stops the thread
+
+    :param str fn: Excel file name
+    :param list sheets: [(worksheet name, fn_ws), ...] (see readxl_plan)
+    :param int depth: (default=1) max number of decompressed worksheets waiting to be parsed
+    :return: generator of (worksheet name, fn_ws, bytes) tuples
+    """
+
+    buffer = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item):
+        # a full queue is re-checked so the thread does not outlive a consumer that stopped
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker():
+        try:
+            with zipfile.ZipFile(fn, 'r') as f_zip:
+                for worksheet, fn_ws in sheets:
+                    if not put((worksheet, fn_ws, f_zip.read('xl/' + fn_ws), None)):
+                        return
+        except Exception as e:
+            put((None, None, None, e))
+            return
+        put((None, None, None, None))
+
+    thread = threading.Thread(target=worker)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            worksheet, fn_ws, content, error = buffer.get()
+            if error is not None:
+                raise error
+            if worksheet is None:
+                break
+            yield worksheet, fn_ws, content
+    finally:
+        stop.set()
+        thread.join()
+
+
+def areadxl(fn, ws=None, executor=None, loop=None):
+    """
+    Awaitable readxl for asyncio (ex: db = await pylightxl.areadxl('file.xlsx')). Parsing runs on an executor
+    one worksheet at a time, so the event loop is never blocked. Cancelling the returned future stops the read
+    at the next worksheet. Requires python 3.4+
+
+    :param str fn: Excel file name
+    :param str or list ws: sheetnames to read into the database (see readxl)
+    :param concurrent.futures.Executor executor: (default=None) executor that parses, None is the loop's default
+    :param asyncio.AbstractEventLoop loop: (default=None) event loop, None is the current event loop
+    :return asyncio.Future: future of the pylightxl.Database class
+    """
+
+    loop = utility_asyncio_loop(loop)
+
+    if type(ws) is str:
+        ws = (ws,)
+
+    future = loop.create_future()
+    state = {}
+
+    def step(done=None):
+        # runs on the event loop between executor jobs
+        if future.cancelled():
+            # the job that was running when the read was cancelled is dropped, including its errors
+            if done is not None and not done.cancelled():
+                done.exception()
+            return
+        try:
+            if done is None:
+                fn_checked = readxl_check_excelfile(fn)
+                state['fn'] = fn_checked
+                job = loop.run_in_executor(executor, readxl_plan, fn_checked, ws)
+            else:
+                rv = done.result()
+                if 'db' not in state:
+                    state['db'], state['sharedString'], state['sheets'] = rv
+                else:
+                    # the size is tracked by the executor as the worksheet is parsed
+                    size = state['size']
+                    state['db'].add_ws(ws=state['sheets'].pop(0)[0], data=rv, size=[size['maxrow'], size['maxcol']])
+
+                if not state['sheets']:
+                    readxl_sync(state['db'], state['fn'], ws, state['sharedString'])
+                    future.set_result(state['db'])
+                    return
+                state['size'] = {}
+                scrape = functools.partial(readxl_scrape, state['fn'], state['sheets'][0][1], state['sharedString'],
+                                           size=state['size'])
+                job = loop.run_in_executor(executor, scrape)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        job.add_done_callback(step)
+
+    step()
+
+    return future
+
+
+def readxl_many(paths, workers=1, ws=None, on_error='yield', ordered=True, pool='thread'):
+    """
+    Reads many xlsx or xlsm files on a pool of workers. At most 2x workers files are read ahead of the results
+    that have not been consumed yet, so memory stays bound for long lists of files
+
+    :param list paths: Excel file names (any iterable)
+    :param int workers: (default=1) number of files read at the same time, 1 reads them one by one
+    :param str or list ws: (default=None) sheetnames to read from every file (see readxl)
+    :param on_error: (default='yield') what to do with a file that fails to read: 'yield' yields the exception in
+                     place of its database, 'skip' leaves the file out, 'raise' stops the batch and raises it,
+                     or a function that is called with (path, exception) before the file is left out
+    :param bool ordered: (default=True) yield results in the order of paths, False yields them as they complete
+    :param str pool: (default='thread') 'thread' for a thread pool (files on slow drives), 'process' for a
+                     process pool (cpu bound parsing of many large files)
+    :return: generator of (path, pylightxl.Database) tuples
+    """
+
+    if pool not in ['thread', 'process']:
+        raise UserWarning('pylightxl - Unsupported pool ({}). Use "thread" or "process"'.format(pool))
+
+    if not callable(on_error) and on_error not in ['yield', 'skip', 'raise']:
+        raise UserWarning('pylightxl - Unsupported on_error ({}). '
+                          'Use "yield", "skip", "raise" or a function'.format(on_error))
+
+    args = ((path, ws) for path in paths)
+
+    if workers <= 1:
+        results = (readxl_many_worker(arg) for arg in args)
+        for result in readxl_many_results(results, on_error):
+            yield result
+        return
+
+    if pool == 'thread':
+        worker_pool = multiprocessing.pool.ThreadPool(workers)
+    else:
+        worker_pool = multiprocessing.Pool(workers)
+
+    try:
+        if ordered:
+            results = readxl_many_ordered(worker_pool, args, 2 * workers)
+        else:
+            results = readxl_many_unordered(worker_pool, args, 2 * workers)
+        for result in readxl_many_results(results, on_error):
+            yield result
+        worker_pool.close()
+    finally:
+        # stops the pool also when the generator is not consumed to the end
+        worker_pool.terminate()
+        worker_pool.join()
+
+
+def readxl_many_worker(args):
+    """
+    Worker of readxl_many, reads a file and returns the error instead of raising it
+
+    :param tuple args: (path, ws)
+    :return tuple: (path, pylightxl.Database or None, exception or None)
+    """
+
+    path, ws = args
+
+    try:
+        return path, readxl(path, ws), None
+    except Exception as e:
+        return path, None, e
+
+
+def readxl_many_ordered(worker_pool, args, window):
+    """
+    Generator of readxl_many worker results in submission order, with at most window files in flight
+
+    :param worker_pool: multiprocessing pool
+    :param args: iterable of worker args
+    :param int window: max number of submitted files that were not yielded yet
+    :return: generator of worker results
+    """
+
+    pending = collections.deque()
+
+    for arg in args:
+        pending.append(worker_pool.apply_async(readxl_many_worker, (arg,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+
+    while pending:
+        yield pending.popleft().get()
+
+
+def readxl_many_unordered(worker_pool, args, window):
+    """
+    Generator of readxl_many worker results in completion order, with at most window files in flight
+
+    :param worker_pool: multiprocessing pool
+    :param args: iterable of worker args
+    :param int window: max number of submitted files that were not yielded yet
+    :return: generator of worker results
+    """
+
+    if sys.version_info[0] < 3:
+        for result in readxl_many_unordered_poll(worker_pool, args, window):
+            yield result
+        return
+
+    done = queue.Queue()
+    in_flight = 0
+
+    for arg in args:
+        # results that fail to reach the parent (ex: an exception that can not be pickled back from a process
+        #  pool) are yielded as the file's error, otherwise done.get() would wait for them forever
+        worker_pool.apply_async(readxl_many_worker, (arg,), callback=done.put,
+                                error_callback=lambda e, path=arg[0]: done.put((path, None, e)))
+        in_flight += 1
+        if in_flight >= window:
+            yield done.get()
+            in_flight -= 1
+
+    while in_flight:
+        yield done.get()
+        in_flight -= 1
+
+
+def readxl_many_unordered_poll(worker_pool, args, window):
+    """
+    Generator of readxl_many worker results in completion order for python 2, its pools have no error_callback
+    so the submitted files are polled (see readxl_many_unordered)
+
+    :param worker_pool: multiprocessing pool
+    :param args: iterable of worker args
+    :param int window: max number of submitted files that were not yielded yet
+    :return: generator of worker results
+    """
+
+    # [(path, AsyncResult), ...] in submission order
+    pending = []
+
+    def next_done():
+        while True:
+            for i, (path, result) in enumerate(pending):
+                if result.ready():
+                    del pending[i]
+                    try:
+                        return result.get()
+                    except Exception as e:
+                        return path, None, e
+            pending[0][1].wait(0.01)
+
+    for arg in args:
+        pending.append((arg[0], worker_pool.apply_async(readxl_many_worker, (arg,))))
+        if len(pending) >= window:
+            yield next_done()
+
+    while pending:
+        yield next_done()
+
+
+def readxl_many_results(results, on_error):
+    """
+    Applies the on_error handling of readxl_many to worker results
+
+    :param results: iterable of (path, db, exception) worker results
+    :param on_error: 'yield', 'skip', 'raise' or a function (see readxl_many)
+    :return: generator of (path, pylightxl.Database or exception) tuples
+    """
+
+    for path, db, error in results:
+        if error is None:
+            yield path, db
+        elif on_error == 'yield':
+            yield path, error
+        elif on_error == 'raise':
+            raise error
+        elif callable(on_error):
+            on_error(path, error)
+
+
+def readxl_get_members(fn):
+    """
+    Takes an excel file and returns the CRC32 and size of each zip member from the zip central directory
+    (without decompressing anything)
+
+    :param str fn: Excel file name
+    :return dict: {member name: (CRC32, file size), ...}
+    """
+
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+        return dict([(info.filename, (info.CRC, info.file_size)) for info in f_zip.infolist()])
+
+
+def readxl_cache_key(fn, ws=None, cache_hash=False):
+    """
+    Returns the readxl cache key of an excel file, the key changes when the file is changed
+
+    :param str fn: Excel file name
+    :param tuple ws: sheetnames read into the database (None for all)
+    :param bool cache_hash: (default=False) also hash the file content
+    :return str: hex key
+    """
+
+    stat = os.stat(fn)
+    key = hashlib.sha1(repr((os.path.abspath(fn), stat.st_size, stat.st_mtime, ws)).encode('utf-8'))
+
+    if cache_hash:
+        with open(fn, 'rb') as f:
+            for block in iter(lambda: f.read(1048576), b''):
+                key.update(block)
+
+    return key.hexdigest()
+
+
+def readxl_cache_load(cache_fn):
+    """
+    Loads a database stored by readxl_cache_save
+
+    :param str cache_fn: cache file name
+    :return: pylightxl.Database class, or None if the cache file is missing or unreadable
+    """
+
+    try:
+        with open(cache_fn, 'rb') as f:
+            # the cache directory may be shared, only plain data is unpickled (see utility_pickle_load)
+            entry = utility_pickle_load(f)
+        tag, version = entry[:2]
+    except Exception:
+        # missing, evicted by another process or not a cache entry
+        return None
+
+    if (tag, version) != ('pylightxl', 2):
+        # written by an older pylightxl
+        return None
+    source, wsorder, sheets, nrs, sharedString = entry[2:]
+
+    try:
+        # mark the entry as recently used
+        os.utime(cache_fn, None)
+    except OSError:
+        pass
+
+    db = Database()
+    for worksheet in wsorder:
+        maxrow, maxcol, addresses, vals, formulas = sheets[worksheet]
+        db.add_ws(worksheet, {})
+        ws = db.ws(worksheet)
+        ws._data = dict([(address, {'v': val, 'f': formula, 's': ''})
+                         for address, val, formula in zip(addresses, vals, formulas)])
+        ws.maxrow = maxrow
+        ws.maxcol = maxcol
+        ws._dirty = set()
+    db._NamedRange = nrs
+    db._source = source
+    db._source_sharedStrings = sharedString
+
+    return db
+
+
+def readxl_cache_storage(db, storage=None, storage_threshold=None):
+    """
+    Moves the worksheets of a database loaded from the readxl cache to the cell storage readxl was asked for
+
+    :param pylightxl.Database db: database loaded by readxl_cache_load
+    :param str or dict storage: (default=None) 'sqlite' or {ws: 'sqlite', ...} (see readxl)
+    :param int storage_threshold: (default=None) worksheets with more cells than this are moved to sqlite
+    :return: None
+    """
+
+    for worksheet in db.ws_names:
+        sheet_storage = storage.get(worksheet) if isinstance(storage, dict) else storage
+        if sheet_storage not in [None, 'memory', 'sqlite']:
+            raise UserWarning('pylightxl - Incorrect storage ({}), use "sqlite" or "memory".'.format(sheet_storage))
+        if sheet_storage == 'sqlite' or (storage_threshold is not None and sheet_storage is None and
+                                         len(db.ws(worksheet)._data) > storage_threshold):
+            db.ws(worksheet).set_storage('sqlite')
+
+
+def readxl_cache_save(db, cache_fn, cache_size=1073741824):
+    """
+    Stores a database in the readxl cache. Cells are stored column-wise (addresses, values, formulas) which is
+    compact and fast to load. The cache file is written to a temporary file first and then renamed into place,
+    so other processes never see a partially written file
+
+    :param pylightxl.Database db: database to store
+    :param str cache_fn: cache file name
+    :param int cache_size: (default=1GB) max bytes of the cache directory (see readxl_cache_evict)
+    :return: None
+    """
+
+    cache = os.path.dirname(cache_fn)
+    if cache and not os.path.isdir(cache):
+        try:
+            os.makedirs(cache)
+        except OSError:
+            # made by another process
+            pass
+
+    sheets = {}
+    for worksheet in db.ws_names:
+        ws = db.ws(worksheet)
+        addresses = list(ws._data.keys())
+        vals = [ws._data[address]['v'] for address in addresses]
+        formulas = [ws._data[address]['f'] for address in addresses]
+        sheets[worksheet] = (ws.maxrow, ws.maxcol, addresses, vals, formulas)
+
+    fd, temp_fn = tempfile.mkstemp(dir=cache or None, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(('pylightxl', 2, db._source, db.ws_names, sheets, db._NamedRange,
+                         db._source_sharedStrings), f, pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(temp_fn, cache_fn)
+        except OSError:
+            # windows does not rename over an existing file, the entry was stored by another process
+            os.remove(temp_fn)
+    except:
+        if os.path.isfile(temp_fn):
+            os.remove(temp_fn)
+        raise
+
+    readxl_cache_evict(cache, cache_size)
+
+
+def readxl_cache_evict(cache, cache_size=1073741824):
+    """
+    Removes the least recently used readxl cache files until the cache directory is within its size
+
+    :param str cache: cache directory
+    :param int cache_size: (default=1GB) max bytes of the cache directory
+    :return: None
+    """
+
+    entries = []
+    for name in os.listdir(cache or '.'):
+        if name.endswith('.pylightxl'):
+            try:
+                stat = os.stat(os.path.join(cache, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum([entry[1] for entry in entries])
+    for _, size, name in sorted(entries):
+        if total <= cache_size:
+            break
+        try:
+            os.remove(os.path.join(cache, name))
+        except OSError:
+            # removed by another process, or in use on windows
+            pass
+        total -= size
+
+
+def readxl_check_excelfile(fn):
+    """
+    Takes a file-path and raises error if the file is not found/unsupported.
+
+    :param str fn: Excel file path
+    :return str: filename conditioned
+    """
+
+    # test that file entered was a valid excel file
+    if 'pathlib' in str(type(fn)):
+        fn = str(fn)
+
+    if type(fn) is not str:
+        raise UserWarning('pylightxl - Incorrect file entry ({}).'.format(fn))
+
+    if not os.path.isfile(fn):
+        raise UserWarning('pylightxl - File ({}) does not exit.'.format(fn))
+
+    extension = fn.split('.')[-1]
+
+    if extension.lower() not in ['xlsx', 'xlsm']:
+        raise UserWarning('pylightxl - Incorrect Excel file extension ({}). '
+                         'File extension supported: .xlsx .xlsm'.format(extension))
+
+    return fn
+
+
+def readxl_get_workbook(fn):
+    """
+    Takes a file-path for xl/workbook.xml and returns a list of sheetnames
+
+    :param str fn: Excel file path
+    :return dict: {'ws': {ws1: {'ws': str, 'rId': str, 'order': str, 'fn_ws': str}}, ...
+                   'nr': {nr1: {'nr': str, 'ws': str, 'address': str}}, ...}
+    """
+
+    # {'ws': ws1: {'ws': str, 'rId': str, 'order': str, 'fn_ws': str}, ...
+    #  'nr': {nr1: {'nr': str, 'ws': str, 'address': str}, ...}
+    rv = {'ws': {}, 'nr': {}}
+
+    # zip up the excel file to expose the xml files
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+
+        with f_zip.open('xl/workbook.xml') as file:
+            ns = utility_xml_namespace(file)
+            for prefix, uri in ns.items():
+                ET.register_namespace(prefix, uri)
+
+        with f_zip.open('xl/workbook.xml') as file:
+            tree = ET.parse(file)
+            root = tree.getroot()
+
+    wbrels = readxl_get_workbookxmlrels(fn)
+
+    for tag_sheet in root.findall('./default:sheets/default:sheet', ns):
+        name = tag_sheet.get('name')
+        rId = tag_sheet.get('{' + ns['r'] + '}id')
+        sheetId = int(rId.replace('rId', ''))
+        rv['ws'][name] = {'ws': name, 'rId': rId, 'order': sheetId, 'fn_ws': wbrels[rId]}
+
+    for tag_sheet in root.findall('./default:definedNames/default:definedName', ns):
+        name = tag_sheet.get('name')
+        # for user friendly entry, the "$" for locked cell-locations are removed
+        fulladdress = tag_sheet.text.replace('$', '')
+        try:
+            # sheetnames may contain "!", the address is after the last one
+            ws, address = fulladdress.rsplit('!', 1)
+        except ValueError:
+            raise UserWarning('pylightxl - Ill formatted workbook.xml. '
+                              'NamedRange does not contain sheet reference (ex: "Sheet1!A1"): '
+                              '{name} - {fulladdress}'.format(name=name, fulladdress=fulladdress))
+
+        rv['nr'][name] = {'nr': name, 'ws': ws, 'address': address}
+
+    return rv
+
+
+def readxl_get_workbookxmlrels(fn):
+    """
+    Takes a file-path for xl/_rels/workbook.xml.rels file and gets the sheet#.xml to rId relations
+
+    :param str fn: Excel file name
+    :return dict: {rId: fn_ws,...}
+    """
+
+    # {rId: fn_ws,...}
+    rv = {}
+
+    # zip up the excel file to expose the xml files
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+
+        with f_zip.open('xl/_rels/workbook.xml.rels') as file:
+            ns = utility_xml_namespace(file)
+            for prefix, uri in ns.items():
+                ET.register_namespace(prefix, uri)
+
+        with f_zip.open('xl/_rels/workbook.xml.rels') as file:
+            tree = ET.parse(file)
+            root = tree.getroot()
+
+    for relationship in root.findall('./default:Relationship', ns):
+        fn_ws = relationship.get('Target')
+        # openpyxl write its xl/_rels/workbook.xml.rels file differently than excel itself. It adds on /xl/ at the start of the file path
+        if fn_ws[:4] == '/xl/':
+            fn_ws = fn_ws[4:]
+        rId = relationship.get('Id')
+        rv[rId] = fn_ws
+
+    return rv
+
+
+def readxl_get_sharedStrings(fn):
+    """
+    Takes a file-path for xl/sharedStrings.xml and returns a dictionary of commonly used strings
+
+    :param str fn: Excel file name
+    :return: dict of commonly used strings
+    """
+
+    sharedStrings = {}
+
+    # zip up the excel file to expose the xml files
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+
+        if 'xl/sharedStrings.xml' not in f_zip.NameToInfo.keys():
+            return sharedStrings
+
+        with f_zip.open('xl/sharedStrings.xml') as file:
+            ns = utility_xml_namespace(file)
+            for prefix, uri in ns.items():
+                ET.register_namespace(prefix, uri)
+
+        with f_zip.open('xl/sharedStrings.xml') as file:
+            tree = ET.parse(file)
+            root = tree.getroot()
+
+    for i, tag_si in enumerate(root.findall('./default:si', ns)):
+        tag_t = tag_si.findall('./default:r//default:t', ns)
+        if tag_t:
+            text = ''.join([tag.text for tag in tag_t])
+        else:
+            text = tag_si.findall('./default:t', ns)[0].text
+        sharedStrings.update({i: text})
+
+    return sharedStrings
+
+
+def readxl_scrape(fn, fn_ws, sharedString, stats=None, ws=None, progress=None, size=None, content=None):
+    """
+    Takes a file-path for xl/worksheets/sheet#.xml and returns a dict of cell data
+
+    :param str fn: Excel file name
+    :param str fn_ws: file path for worksheet (ex: xl/worksheets/sheet1.xml)
+    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml for string only cell values
+    :param dict or callable stats: (default=None) logs the 'namespace' and 'worksheet' phase records (see readxl)
+    :param str ws: (default=None) worksheet name the phase and progress records are logged under
+    :param callable progress: (default=None) called with the bytes parsed as the xml is fed to the parser in
+                              64KB chunks (see readxl), returning False cancels the read with a UserWarning
+    :param dict size: (default=None) filled with {'maxrow': int, 'maxcol': int} of the parsed cells, tracked as
+                      rows are parsed so the worksheet does not have to calculate it (see Worksheet)
+    :param bytes content: (default=None) the worksheet xml if it was already read from the excel file (see
+                          readxl prefetch), None reads it from fn
+    :return dict: dict of cell data {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    """
+
+    # {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    data = {}
+
+    t0 = time.time()
+
+    # zip up the excel file to expose the xml files
+    f_zip = zipfile.ZipFile(fn, 'r') if content is None else None
+    try:
+        if content is None:
+            open_ws = functools.partial(f_zip.open, 'xl/' + fn_ws)
+            nbytes = f_zip.getinfo('xl/' + fn_ws).file_size
+        else:
+            open_ws = functools.partial(io.BytesIO, content)
+            nbytes = len(content)
+
+        with open_ws() as file:
+            ns = utility_xml_namespace(file)
+            for prefix, uri in ns.items():
+                ET.register_namespace(prefix, uri)
+
+        t0 = utility_stats(stats, 'namespace', t0, ws=ws)
+
+        with open_ws() as file:
+            if progress is None:
+                tree = ET.parse(file)
+                root = tree.getroot()
+            else:
+                # same as ET.parse, but fed by hand to report the bytes parsed
+                parser = ET.XMLParser()
+                nbytes_parsed = 0
+                while True:
+                    chunk = file.read(65536)
+                    if not chunk:
+                        break
+                    parser.feed(chunk)
+                    nbytes_parsed += len(chunk)
+                    utility_progress(progress, ws=ws, sheets_done=0, sheets=1, bytes=nbytes_parsed,
+                                     total_bytes=nbytes)
+                root = parser.close()
+    finally:
+        if f_zip is not None:
+            f_zip.close()
+
+    maxrow = 0
+    maxcol = 0
+    for tag_row in root.findall('./default:sheetData/default:row', ns):
+        cell_address = None
+        for tag_cell in tag_row.findall('./default:c', ns):
+            cell_address, cell_val, cell_formula = readxl_scrape_cell(tag_cell, ns, sharedString)
+
+            data.update({cell_address: {'v': cell_val, 'f': cell_formula, 's': ''}})
+
+        if cell_address:
+            # cells of a row are stored in column order, the last cell of a row is its widest
+            row, col = utility_address2index(cell_address)
+            maxrow = row if row > maxrow else maxrow
+            maxcol = col if col > maxcol else maxcol
+
+    if size is not None:
+        size['maxrow'] = maxrow
+        size['maxcol'] = maxcol
+
+    if stats is not None:
+        # counted apart so the cell loop is the same with or without stats
+        strings = len(root.findall("./default:sheetData/default:row/default:c[@t='s']", ns))
+        utility_stats(stats, 'worksheet', t0, ws=ws, nbytes=nbytes, cells=len(data), strings=strings)
+
+    return data
+
+
+def readxl_scrape_cell(tag_cell, ns, sharedString):
+    """
+    Takes a worksheet <c> element and returns its address, value and formula
+
+    :param xml.etree.ElementTree.Element tag_cell: <c> element of xl/worksheets/sheet#.xml
+    :param dict ns: worksheet xml namespace (see utility_xml_namespace)
+    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml for string only cell values
+    :return tuple: (cell_address, cell_val, cell_formula)
+    """
+
+    cell_address = tag_cell.get('r')
+    # t="e" is for error cells "#N/A"
+    # t="s" is for common strings
+    # t="str" is for equation strings (ex: =A1 & "this")
+    # t="b" is for bool, bool is not logged as a commonString in xml, 0 == FALSE, 1 == TRUE
+    # t="inlineStr" is for strings written in the cell itself <is><t>text</t></is> instead of sharedStrings
+    cell_type = tag_cell.get('t')
+    tag_val = tag_cell.find('./default:v', ns)
+    cell_val = tag_val.text if tag_val is not None else ''
+    tag_formula = tag_cell.find('./default:f', ns)
+    cell_formula = tag_formula.text if tag_formula is not None else ''
+
+    if cell_type == 's':
+        # commonString
+        cell_val = sharedString[int(cell_val)]
+    elif cell_type == 'b':
+        # bool
+        cell_val = True if cell_val == '1' else False
+    elif cell_type == 'inlineStr':
+        # inline string, rich text is split into runs <is><r><t>text</t></r>...</is>
+        tag_texts = tag_cell.findall('./default:is/default:t', ns) + \
+                    tag_cell.findall('./default:is/default:r/default:t', ns)
+        cell_val = ''.join([tag_text.text for tag_text in tag_texts if tag_text.text is not None])
+    elif cell_val == '' or cell_type == 'str' or cell_type == 'e':
+        # cell is either empty, or is a str formula - leave cell_val as a string
+        pass
+    else:
+        # int or float
+        if cell_val.isdigit():
+            cell_val = int(cell_val)
+        else:
+            cell_val = float(cell_val)
+
+    return cell_address, cell_val, cell_formula
+
+
+def readxl_scrape_ranges(fn, fn_ws, sharedString, bounds, size=None):
+    """
+    Takes a file-path for xl/worksheets/sheet#.xml and returns a dict of the cell data inside ranges. The xml is
+    streamed, cells of rows outside the ranges are not scraped and parsing stops after the last row of the ranges
+
+    :param str fn: Excel file name
+    :param str fn_ws: file path for worksheet (ex: xl/worksheets/sheet1.xml)
+    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml for string only cell values
+    :param list bounds: [(minrow, mincol, maxrow, maxcol), ...] of the ranges (see utility_range2bounds)
+    :param dict size: (default=None) filled with {'maxrow': int, 'maxcol': int} of the cells kept
+    :return dict: dict of cell data {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    """
+
+    # {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    data = {}
+
+    colnums = UTILITY_COLUMNNUMS
+    lastrow = max([bound[2] for bound in bounds])
+    maxrow = 0
+    maxcol = 0
+
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+
+        with f_zip.open('xl/' + fn_ws) as file:
+            ns = utility_xml_namespace(file)
+            for prefix, uri in ns.items():
+                ET.register_namespace(prefix, uri)
+
+        tag_prefix = '{' + ns['default'] + '}' if 'default' in ns else ''
+
+        with f_zip.open('xl/' + fn_ws) as file:
+            i_row = 0
+            sheetData = None
+            for event, elem in ET.iterparse(file, ('start', 'end')):
+                if event == 'start':
+                    if elem.tag == tag_prefix + 'sheetData':
+                        sheetData = elem
+                    continue
+
+                if elem.tag != tag_prefix + 'row':
+                    continue
+
+                i_row = int(elem.get('r')) if elem.get('r') else i_row + 1
+                if i_row > lastrow:
+                    # rest of the worksheet is not decompressed
+                    break
+
+                cols = [(bound[1], bound[3]) for bound in bounds if bound[0] <= i_row <= bound[2]]
+                i_col = 0
+                for tag_cell in elem.findall('./default:c', ns) if cols else []:
+                    cell_address = tag_cell.get('r')
+                    colletters = cell_address.rstrip('0123456789')
+                    try:
+                        i_col = colnums[colletters]
+                    except KeyError:
+                        i_col = utility_columnletter2num(colletters)
+                    if any([mincol <= i_col <= col_end for mincol, col_end in cols]):
+                        cell_address, cell_val, cell_formula = readxl_scrape_cell(tag_cell, ns, sharedString)
+                        data[cell_address] = {'v': cell_val, 'f': cell_formula, 's': ''}
+                        maxrow = i_row if i_row > maxrow else maxrow
+                        maxcol = i_col if i_col > maxcol else maxcol
+
+                # drop the parsed row so memory stays flat
+                elem.clear()
+                if sheetData is not None:
+                    sheetData.remove(elem)
+
+    if size is not None:
+        size['maxrow'] = maxrow
+        size['maxcol'] = maxcol
+
+    return data
+
+
+def readxl_scrape_store(fn, fn_ws, sharedString, threshold=0, path=None, stats=None, ws=None, progress=None,
+                        size=None, content=None):
+    """
+    Takes a file-path for xl/worksheets/sheet#.xml and streams its cells into a dict that is moved to sqlite
+    storage (see SqliteCells) once it holds more than threshold cells. From then on cells are bulk inserted every
+    10000 cells as rows are parsed, only the row being parsed and the cells not inserted yet are kept in memory
+
+    :param str fn: Excel file name
+    :param str fn_ws: file path for worksheet (ex: xl/worksheets/sheet1.xml)
+    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml for string only cell values
+    :param int threshold: (default=0) number of cells above which the cells are moved to sqlite storage
+    :param str path: (default=None) sqlite database file, None for a temporary file
+    :param dict or callable stats: (default=None) logs the 'namespace' and 'worksheet' phase records (see readxl)
+    :param str ws: (default=None) worksheet name the phase and progress records are logged under
+    :param callable progress: (default=None) called with the rows parsed every 10000 rows (see readxl),
+                              returning False cancels the read with a UserWarning
+    :param dict size: (default=None) filled with {'maxrow': int, 'maxcol': int} of the parsed cells
+    :param bytes content: (default=None) the worksheet xml if it was already read from the excel file (see
+                          readxl prefetch), None reads it from fn
+    :return dict or SqliteCells: cell data {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    """
+
+    # {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    data = {}
+    cells = None
+
+    t0 = time.time()
+    maxrow = 0
+    maxcol = 0
+    strings = 0
+
+    f_zip = zipfile.ZipFile(fn, 'r') if content is None else None
+    try:
+        if content is None:
+            open_ws = functools.partial(f_zip.open, 'xl/' + fn_ws)
+            nbytes = f_zip.getinfo('xl/' + fn_ws).file_size
+        else:
+            open_ws = functools.partial(io.BytesIO, content)
+            nbytes = len(content)
+
+        with open_ws() as file:
+            ns = utility_xml_namespace(file)
+            for prefix, uri in ns.items():
+                ET.register_namespace(prefix, uri)
+
+        t0 = utility_stats(stats, 'namespace', t0, ws=ws)
+
+        tag_prefix = '{' + ns['default'] + '}' if 'default' in ns else ''
+
+        with open_ws() as file:
+            i_row = 0
+            sheetData = None
+            for event, elem in ET.iterparse(file, ('start', 'end')):
+                if event == 'start':
+                    if elem.tag == tag_prefix + 'sheetData':
+                        sheetData = elem
+                    continue
+
+                if elem.tag != tag_prefix + 'row':
+                    continue
+
+                cell_address = None
+                for tag_cell in elem.findall('./default:c', ns):
+                    cell_address, cell_val, cell_formula = readxl_scrape_cell(tag_cell, ns, sharedString)
+                    data[cell_address] = {'v': cell_val, 'f': cell_formula, 's': ''}
+                    if stats is not None and tag_cell.get('t') == 's':
+                        strings += 1
+
+                if cell_address:
+                    # cells of a row are stored in column order, the last cell of a row is its widest
+                    row, col = utility_address2index(cell_address)
+                    maxrow = row if row > maxrow else maxrow
+                    maxcol = col if col > maxcol else maxcol
+
+                # drop the parsed row so memory stays flat
+                elem.clear()
+                if sheetData is not None:
+                    sheetData.remove(elem)
+
+                if cells is None and len(data) > threshold:
+                    cells = SqliteCells(path)
+                if cells is not None and len(data) >= 10000:
+                    cells.update(data)
+                    data = {}
+
+                i_row += 1
+                if progress is not None and i_row % 10000 == 0:
+                    utility_progress(progress, ws=ws, sheets_done=0, sheets=1, rows=i_row)
+
+        if cells is not None:
+            cells.update(data)
+            cells.commit()
+            data = cells
+    except:
+        if cells is not None:
+            cells.close()
+        raise
+    finally:
+        if f_zip is not None:
+            f_zip.close()
+
+    if size is not None:
+        size['maxrow'] = maxrow
+        size['maxcol'] = maxcol
+
+    utility_stats(stats, 'worksheet', t0, ws=ws, nbytes=nbytes, cells=len(data), strings=strings)
+
+    return data
+
+
+def readxl_scrape_rows(fn, fn_ws, sharedString, size=None):
+    """
+    Takes a file-path for xl/worksheets/sheet#.xml and streams its rows one at a time. Only the row that is
+    being parsed is kept in memory (unlike readxl_scrape that parses the whole worksheet)
+
+    :param str fn: Excel file name
+    :param str fn_ws: file path for worksheet (ex: xl/worksheets/sheet1.xml)
+    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml for string only cell values
+    :param dict size: (default=None) filled with {'maxrow': int, 'maxcol': int} from the worksheet's <dimension>
+                      tag once it is parsed (before the first row is yielded), left empty if there is none
+    :return: generator of (row index, {col index: cell value, ...}) for rows that have cells
+    """
+
+    colnums = UTILITY_COLUMNNUMS
+
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+
+        with f_zip.open('xl/' + fn_ws) as file:
+            ns = utility_xml_namespace(file)
+
+        tag_prefix = '{' + ns['default'] + '}' if 'default' in ns else ''
+
+        with f_zip.open('xl/' + fn_ws) as file:
+            i_row = 0
+            sheetData = None
+            for event, elem in ET.iterparse(file, ('start', 'end')):
+                if event == 'start':
+                    if elem.tag == tag_prefix + 'sheetData':
+                        sheetData = elem
+                    continue
+
+                if elem.tag == tag_prefix + 'dimension' and size is not None:
+                    ref = elem.get('ref', '').replace('$', '').split(':')[-1]
+                    if ref:
+                        size['maxrow'], size['maxcol'] = utility_address2index(ref)
+
+                elif elem.tag == tag_prefix + 'row':
+                    i_row = int(elem.get('r')) if elem.get('r') else i_row + 1
+                    cells = {}
+                    i_col = 0
+                    for tag_cell in elem.findall('./default:c', ns):
+                        cell_address, cell_val, cell_formula = readxl_scrape_cell(tag_cell, ns, sharedString)
+                        if cell_address:
+                            colletters = cell_address.rstrip('0123456789')
+                            try:
+                                i_col = colnums[colletters]
+                            except KeyError:
+                                i_col = utility_columnletter2num(colletters)
+                        else:
+                            i_col += 1
+                        cells[i_col] = cell_val
+
+                    # drop the parsed row so memory stays flat
+                    elem.clear()
+                    if sheetData is not None:
+                        sheetData.remove(elem)
+
+                    if cells:
+                        yield i_row, cells
+
+
+def readxl_index(fn, ws, step=1000, index_fn=None, checkpoint=4194304):
+    """
+    Builds the row index of a worksheet for readxl_window: the decompressed byte offset of every step-th row of
+    the worksheet xml. The index is saved as a sidecar file next to the excel file and reused by readxl_window
+    while the worksheet is unchanged. Deflate checkpoints (a copy of the decompressor every checkpoint bytes) are
+    kept in the returned index so windows read with it resume decompressing near the window instead of at the
+    start of the worksheet. Checkpoints are not saved (python's zlib can not restore a decompressor from disk),
+    windows read with a loaded index decompress up to the window (without parsing it) and log checkpoints on the way
+
+    :param str fn: Excel file name
+    :param str ws: worksheet name
+    :param int step: (default=1000) rows between index entries, at most step rows are parsed outside of a window
+    :param str index_fn: (default=None) sidecar index file name, None for fn + '.sheet#.pylightxl_index',
+                         False to not save the index
+    :param int checkpoint: (default=4MB) decompressed bytes between deflate checkpoints
+    :return dict: row index {'fn_ws': str, 'member': (CRC32, size), 'step': int, 'head': bytes, 'tail': bytes,
+                  'rows': [row, ...], 'offsets': [byte offset, ...], 'end': byte offset, 'checkpoint': int,
+                  'checkpoints': [(byte offset, compressed byte offset, zlib decompressor), ...]}
+    """
+
+    fn = readxl_check_excelfile(fn)
+    fn_ws = readxl_index_fn_ws(fn, ws)
+
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+        info = f_zip.getinfo('xl/' + fn_ws)
+
+    index = {'fn_ws': fn_ws, 'member': (info.CRC, info.file_size), 'step': step, 'head': b'', 'tail': b'',
+             'rows': [], 'offsets': [], 'end': info.file_size, 'checkpoint': checkpoint, 'checkpoints': []}
+
+    re_row = re.compile(br'<(?:[\w.-]+:)?row(?=[\s/>])([^>]*)>')
+    re_r = re.compile(br'\sr="(\d+)"')
+
+    # everything before the first row (xml declaration, <worksheet ...>, <sheetData>) heads each window
+    head = b''
+    tag_end = None
+    carry = b''
+    carry_offset = 0
+    i_row = 0
+    next_row = 1
+    # offset of the last row tag read, the carried bytes may hold a row tag that was already read
+    last_row = -1
+    for offset, chunk in readxl_index_stream(fn, fn_ws, index):
+        buf = carry + chunk
+        buf_offset = carry_offset
+        if not index['rows']:
+            head += chunk
+
+        if tag_end is None:
+            match = re.search(br'<((?:[\w.-]+:)?sheetData)[\s/>]', head)
+            if match is None:
+                carry, carry_offset = b'', offset + len(chunk)
+                continue
+            tag_root = re.search(br'<([^?!\s/>][^\s/>]*)', head).group(1)
+            tag_end = b'</' + match.group(1) + b'>'
+            index['tail'] = tag_end + b'</' + tag_root + b'>'
+            buf, buf_offset = head, 0
+
+        for match in re_row.finditer(buf):
+            if buf_offset + match.start() <= last_row:
+                continue
+            last_row = buf_offset + match.start()
+            match_r = re_r.search(match.group(1))
+            i_row = int(match_r.group(1)) if match_r else i_row + 1
+            if i_row >= next_row:
+                if not index['rows']:
+                    index['head'] = head[:buf_offset + match.start()]
+                index['rows'].append(i_row)
+                index['offsets'].append(buf_offset + match.start())
+                next_row = (i_row // step + 1) * step
+
+        end = buf.rfind(tag_end)
+        if end != -1:
+            index['end'] = buf_offset + end
+            break
+
+        # a tag split between chunks (a row tag or the end of sheetData) is searched again with the next chunk
+        split = buf.rfind(b'<')
+        split = split if split != -1 and buf.find(b'>', split) == -1 else len(buf)
+        split = min(split, len(buf) - len(tag_end))
+        carry, carry_offset = buf[split:], buf_offset + split
+
+    if index_fn is None:
+        index_fn = fn + '.' + os.path.splitext(os.path.basename(fn_ws))[0] + '.pylightxl_index'
+    if index_fn is not False:
+        saved = dict([(key, val) for key, val in index.items() if key != 'checkpoints'])
+        with open(index_fn, 'wb') as f:
+            pickle.dump(('pylightxl', 1, saved), f, pickle.HIGHEST_PROTOCOL)
+
+    return index
+
+
+def readxl_index_load(fn, ws, index_fn=None):
+    """
+    Loads the sidecar row index of a worksheet saved by readxl_index
+
+    :param str fn: Excel file name
+    :param str ws: worksheet name
+    :param str index_fn: (default=None) sidecar index file name, None for fn + '.sheet#.pylightxl_index'
+    :return dict: row index (see readxl_index), or None if it is missing, unreadable or the worksheet changed
+    """
+
+    fn = readxl_check_excelfile(fn)
+    fn_ws = readxl_index_fn_ws(fn, ws)
+
+    if index_fn is None:
+        index_fn = fn + '.' + os.path.splitext(os.path.basename(fn_ws))[0] + '.pylightxl_index'
+
+    try:
+        with open(index_fn, 'rb') as f:
+            # the sidecar file sits next to the excel file, only plain data is unpickled (see utility_pickle_load)
+            tag, version, index = utility_pickle_load(f)
+    except Exception:
+        return None
+
+    if (tag, version) != ('pylightxl', 1) or index['fn_ws'] != fn_ws:
+        return None
+
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+        info = f_zip.getinfo('xl/' + fn_ws)
+    if index['member'] != (info.CRC, info.file_size):
+        return None
+
+    index['checkpoints'] = []
+
+    return index
+
+
+def readxl_index_fn_ws(fn, ws):
+    """
+    Returns the worksheet xml file name of a worksheet
+
+    :param str fn: Excel file name
+    :param str ws: worksheet name
+    :return str: file path for worksheet (ex: worksheets/sheet1.xml)
+    """
+
+    wb_rels = readxl_get_workbook(fn)
+    if ws not in wb_rels['ws']:
+        raise UserWarning('pylightxl - Sheetname ({}) is not in the workbook.'.format(ws))
+
+    return wb_rels['ws'][ws]['fn_ws']
+
+
+def readxl_index_stream(fn, fn_ws, index=None, start=0):
+    """
+    Generator of the decompressed worksheet xml from byte offset start. Deflated worksheets resume from the
+    nearest deflate checkpoint of the index before start and log new checkpoints as they are passed, stored
+    (uncompressed) worksheets are seeked to directly
+
+    :param str fn: Excel file name
+    :param str fn_ws: file path for worksheet (ex: worksheets/sheet1.xml)
+    :param dict index: (default=None) row index with the deflate checkpoints (see readxl_index)
+    :param int start: (default=0) decompressed byte offset to start from
+    :return: generator of (byte offset, bytes) chunks
+    """
+
+    with zipfile.ZipFile(fn, 'r') as f_zip:
+        info = f_zip.getinfo('xl/' + fn_ws)
+        if info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            # encrypted or other compressions are read from the start through zipfile
+            with f_zip.open(info) as file:
+                offset = 0
+                while True:
+                    chunk = file.read(65536)
+                    if not chunk:
+                        return
+                    if offset + len(chunk) > start:
+                        yield max(offset, start), chunk[max(0, start - offset):]
+                    offset += len(chunk)
+
+    with open(fn, 'rb') as f:
+        # the member data starts after its local file header (30 bytes, file name and extra field)
+        f.seek(info.header_offset)
+        len_name, len_extra = struct.unpack('<HH', f.read(30)[26:30])
+        data_start = info.header_offset + 30 + len_name + len_extra
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            offset = start
+            f.seek(data_start + offset)
+            while offset < info.file_size:
+                chunk = f.read(min(65536, info.file_size - offset))
+                if not chunk:
+                    return
+                yield offset, chunk
+                offset += len(chunk)
+            return
+
+        checkpoints = index['checkpoints'] if index is not None else []
+        spacing = index['checkpoint'] if index is not None else 0
+        offset, offset_zip, decompressor = 0, 0, None
+        for point in checkpoints:
+            if point[0] > start:
+                break
+            offset, offset_zip, decompressor = point
+        # copied so the checkpoint can be resumed again
+        decompressor = decompressor.copy() if decompressor is not None else zlib.decompressobj(-15)
+        last = checkpoints[-1][0] if checkpoints else 0
+
+        f.seek(data_start + offset_zip)
+        while offset_zip < info.compress_size:
+            chunk_zip = f.read(min(65536, info.compress_size - offset_zip))
+            if not chunk_zip:
+                return
+            offset_zip += len(chunk_zip)
+            chunk = decompressor.decompress(chunk_zip)
+            if offset + len(chunk) > start:
+                yield max(offset, start), chunk[max(0, start - offset):]
+            offset += len(chunk)
+            if index is not None and offset - last >= spacing:
+                # all input is consumed, the decompressor state is that of offset/offset_zip
+                checkpoints.append((offset, offset_zip, decompressor.copy()))
+                last = offset
+
+
+def readxl_window(fn, ws, rows, index=None, sharedString=None):
+    """
+    Reads a window of rows of a large worksheet through its row index and returns them as a pylightxl Worksheet.
+    Cells keep their addresses (ex: ws.row(3000000) of window rows=(3000000, 3000100)). Only the rows between the
+    index entries around the window are parsed
+
+    :param str fn: Excel file name
+    :param str ws: worksheet name
+    :param tuple rows: (first row, last row) of the window
+    :param dict index: (default=None) row index (see readxl_index), pass the same index to read many windows so
+                       its deflate checkpoints are reused. None loads the sidecar index or builds it if there is
+                       none (or it is stale)
+    :param dict sharedString: (default=None) shared string dict lookup table (see readxl_get_sharedStrings),
+                              None reads it from fn
+    :return: pylightxl.Worksheet class
+    """
+
+    fn = readxl_check_excelfile(fn)
+
+    if index is None:
+        index = readxl_index_load(fn, ws)
+        if index is None:
+            index = readxl_index(fn, ws)
+
+    if not index['rows']:
+        # worksheet without rows
+        return Worksheet({}, [0, 0])
+
+    if sharedString is None:
+        sharedString = readxl_get_sharedStrings(fn)
+
+    row_start, row_end = rows
+
+    # decompressed byte range from the index entry at/before the window to the entry after it
+    i_start = bisect.bisect_right(index['rows'], row_start) - 1
+    i_end = bisect.bisect_right(index['rows'], row_end)
+    start = index['offsets'][max(i_start, 0)]
+    end = index['offsets'][i_end] if i_end < len(index['rows']) else index['end']
+
+    chunks = []
+    if end > start:
+        for offset, chunk in readxl_index_stream(fn, index['fn_ws'], index, start):
+            chunks.append(chunk[:end - offset])
+            if offset + len(chunk) >= end:
+                break
+
+    text = index['head'] + b''.join(chunks) + index['tail']
+    ns = utility_xml_namespace(io.BytesIO(text))
+    root = ET.fromstring(text)
+
+    data = {}
+    maxrow = 0
+    maxcol = 0
+    i_row = 0
+    for tag_row in root.findall('./default:sheetData/default:row', ns):
+        i_row = int(tag_row.get('r')) if tag_row.get('r') else i_row + 1
+        if i_row < row_start or i_row > row_end:
+            continue
+        cell_address = None
+        for tag_cell in tag_row.findall('./default:c', ns):
+            cell_address, cell_val, cell_formula = readxl_scrape_cell(tag_cell, ns, sharedString)
+            data[cell_address] = {'v': cell_val, 'f': cell_formula, 's': ''}
+        if cell_address:
+            row, col = utility_address2index(cell_address)
+            maxrow = row if row > maxrow else maxrow
+            maxcol = col if col > maxcol else maxcol
+
+    return Worksheet(data, [maxrow, maxcol])
+
+
+def readcsv(fn, delimiter=',', ws='Sheet1', chunksize=None, workers=1, sample=100, dtypes=None, progress=None):
+    """
+    Reads a csv file and returns a pylightxl database
+
+    :param str fn: csv file name
+    :param str delimiter=',': csv file delimiter
+    :param str ws='Sheet1': worksheet name that the csv data will be stored in
+    :param int chunksize: (default=None) read the csv file in chunks of this many rows. readcsv then returns
+                          a generator of databases, each chunk is stored in its own worksheet starting at row 1
+                          (chunk i holds csv rows i*chunksize+1 to (i+1)*chunksize). This keeps large csv
+                          files from being loaded whole (ex: to write each chunk out to its own excel file)
+    :param int workers: (default=1) number of processes that parse the csv file. The file is split into byte
+                        ranges at line breaks outside of quoted fields and each range is parsed by its own
+                        process. If a range does not end at a row (ex: a literal quote in an unquoted field
+                        misleads the split), the file is read serially instead. Not used with chunksize
+    :param int sample: (default=100) number of rows sampled from the start of the file to infer the type
+                       (int, float, bool or str) of each column. Cells that do not fit their column's type
+                       are converted on their own
+    :param dict dtypes: (default=None) explicit column types that skip inference {col: type}, where col is a
+                        column index or letter and type is int, float, bool or str (ex: {1: str, 'C': float})
+    :param callable progress: (default=None) called with {'ws': str, 'sheets_done': int, 'sheets': 1, 'rows': int,
+                              'bytes': None, 'total_bytes': None} every 10000 rows read (every chunk or byte range
+                              with chunksize or workers). Returning False cancels the read with a UserWarning
+    :return: pylightxl.Database class (or a generator of pylightxl.Database if chunksize is given)
+    """
+
+    if chunksize is not None:
+        return readcsv_chunks(fn, delimiter=delimiter, ws=ws, chunksize=chunksize, sample=sample, dtypes=dtypes,
+                              progress=progress)
+
+    # declare a db
+    db = Database()
+
+    # test that file entered was a valid excel file
+    if 'pathlib' in str(type(fn)):
+        fn = str(fn)
+
+    db.add_ws(ws, {})
+
+    ranges = readcsv_ranges(fn, workers) if workers > 1 else []
+    serial = True
+
+    if len(ranges) > 1:
+        with readcsv_open(fn) as f:
+            kinds = readcsv_schema(list(itertools.islice(csv.reader(f, delimiter=delimiter), sample)), dtypes)
+        args = [(fn, start, end, delimiter, kinds, end == ranges[-1][1]) for start, end in ranges]
+        pool = multiprocessing.Pool(min(workers, len(args)))
+        try:
+            # ranges are stitched back in file order, each range starts where the previous range's rows ended
+            for rows, aligned in pool.imap(readcsv_range_worker, args):
+                if not aligned:
+                    # the range ended inside of a quoted field, the next range does not start at a row (ex: a
+                    #  literal quote in an unquoted field threw off the quote parity the file was split by)
+                    break
+                readcsv_fill(db.ws(ws), rows, start_row=db.ws(ws).maxrow + 1)
+                utility_progress(progress, ws=ws, sheets_done=0, sheets=1, rows=db.ws(ws).maxrow)
+            else:
+                serial = False
+        finally:
+            pool.terminate()
+            pool.join()
+
+    if serial:
+        # no workers, a single range or ranges that were not split at rows
+        db = Database()
+        db.add_ws(ws, {})
+        with readcsv_open(fn) as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            rows = list(itertools.islice(reader, sample))
+            converters = readcsv_converters(readcsv_schema(rows, dtypes))
+            readcsv_fill(db.ws(ws), itertools.chain(rows, reader), converters=converters,
+                         progress=utility_progress_sheet(progress, ws, 0, 1))
+
+    utility_progress(progress, ws=ws, sheets_done=1, sheets=1, rows=db.ws(ws).maxrow)
+
+    return db
+
+
+def readcsv_chunks(fn, delimiter=',', ws='Sheet1', chunksize=10000, sample=100, dtypes=None, progress=None):
+    """
+    Generator of readcsv, reads a csv file chunksize rows at a time (see readcsv)
+
+    :param str fn: csv file name
+    :param str delimiter=',': csv file delimiter
+    :param str ws='Sheet1': worksheet name that the csv data will be stored in
+    :param int chunksize: (default=10000) number of csv rows per database
+    :param int sample: (default=100) number of rows sampled to infer column types, shared by all chunks
+    :param dict dtypes: (default=None) explicit column types {col: type} (see readcsv)
+    :param callable progress: (default=None) called with the csv rows read after each chunk (see readcsv)
+    :return: generator of pylightxl.Database class
+    """
+
+    if chunksize < 1:
+        raise UserWarning('pylightxl - chunksize has to be a positive number of rows ({})'.format(chunksize))
+
+    if 'pathlib' in str(type(fn)):
+        fn = str(fn)
+
+    with readcsv_open(fn) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        rows = list(itertools.islice(reader, sample))
+        converters = readcsv_converters(readcsv_schema(rows, dtypes))
+        reader = itertools.chain(rows, reader)
+        nrows = 0
+        while True:
+            db = Database()
+            db.add_ws(ws, {})
+            nrows_chunk = readcsv_fill(db.ws(ws), reader, nrows=chunksize, converters=converters)
+            if nrows_chunk == 0:
+                break
+            nrows += nrows_chunk
+            utility_progress(progress, ws=ws, sheets_done=0, sheets=1, rows=nrows)
+            yield db
+
+
+def readcsv_open(fn):
+    """
+    Opens a csv file for the csv module (python2 csv reads bytes, python3 csv reads text with newline='')
+
+    :param str fn: csv file name
+    :return: file object
+    """
+
+    if sys.version_info[0] < 3:
+        return open(fn, 'rb')
+    else:
+        return open(fn, 'r', newline='')
+
+
+def readcsv_cell_value(item):
+    """
+    Converts a csv cell text to int, float or bool, other text is kept as str
+
+    :param str item: csv cell text
+    :return: cell value
+    """
+
+    try:
+        if '.' in item:
+            item = float(item)
+        else:
+            item = int(item)
+    except ValueError:
+        if item.strip().lower() == 'true':
+            item = True
+        elif item.strip().lower() == 'false':
+            item = False
+
+    return item
 
 
-def readxl_check_excelfile(fn):
+def readcsv_cell_kind(item):
     """
-    Takes a file-path and raises error if the file is not found/unsupported.
+    Returns the type readcsv_cell_value converts a csv cell text to
 
-    :param str fn: Excel file path
-    :return str: filename conditioned
+    :param str item: csv cell text
+    :return str: 'int', 'float', 'bool', 'str' or None for empty cells
     """
 
-    # test that file entered was a valid excel file
-    if 'pathlib' in str(type(fn)):
-        fn = str(fn)
+    if item == '':
+        return None
 
-    if type(fn) is not str:
-        raise UserWarning('pylightxl - Incorrect file entry ({}).'.format(fn))
+    val = readcsv_cell_value(item)
+    if type(val) is bool:
+        return 'bool'
+    elif type(val) is int:
+        return 'int'
+    elif type(val) is float:
+        return 'float'
+    else:
+        return 'str'
 
-    if not os.path.isfile(fn):
-        raise UserWarning('pylightxl - File ({}) does not exit.'.format(fn))
 
-    extension = fn.split('.')[-1]
+def readcsv_schema(rows, dtypes=None):
+    """
+    Infers the type of each csv column from sample rows
+
+    :param list rows: sample rows of csv cell text
+    :param dict dtypes: (default=None) explicit column types {col: type} that override the inferred ones,
+                        col is a column index or letter and type is int, float, bool or str
+    :return list: column types by column index (index 0 is unused). Inferred types are 'int', 'number' (floats,
+                  or ints and floats), 'bool', 'text' or None for columns that are empty or mixed in the sample,
+                  their converters return the same values as readcsv_cell_value. Explicit dtypes are 'int',
+                  'float', 'bool' or 'str'
+    """
 
-    if extension.lower() not in ['xlsx', 'xlsm']:
-        raise UserWarning('pylightxl - Incorrect Excel file extension ({}). '
-                         'File extension supported: .xlsx .xlsm'.format(extension))
+    if len(rows) > 1 and all([readcsv_cell_kind(item) in ['str', None] for item in rows[0]]):
+        # the first row looks like a header, its names would make every column mixed
+        rows = rows[1:]
+
+    kinds = [None]
+    for items in rows:
+        while len(kinds) <= len(items):
+            kinds.append(set())
+        for i_col, item in enumerate(items, 1):
+            kinds[i_col].add(readcsv_cell_kind(item))
+
+    for i_col in range(1, len(kinds)):
+        col_kinds = kinds[i_col] - {None}
+        if col_kinds and col_kinds <= {'int', 'float'} and col_kinds != {'int'}:
+            kinds[i_col] = 'number'
+        elif col_kinds == {'str'}:
+            kinds[i_col] = 'text'
+        elif len(col_kinds) == 1:
+            kinds[i_col] = col_kinds.pop()
+        else:
+            kinds[i_col] = None
 
-    return fn
+    names = {int: 'int', float: 'float', bool: 'bool', str: 'str'}
+    for col, dtype in (dtypes or {}).items():
+        if dtype not in names:
+            raise UserWarning('pylightxl - Unsupported csv column dtype ({}). Use int, float, bool or str'.format(dtype))
+        i_col = utility_columnletter2num(col) if type(col) is str else col
+        while len(kinds) <= i_col:
+            kinds.append(None)
+        kinds[i_col] = names[dtype]
 
+    return kinds
 
-def readxl_get_workbook(fn):
+
+def readcsv_converters(kinds):
     """
-    Takes a file-path for xl/workbook.xml and returns a list of sheetnames
+    Returns the converter function of each csv column type (see readcsv_schema)
 
-    :param str fn: Excel file path
-    :return dict: {'ws': {ws1: {'ws': str, 'rId': str, 'order': str, 'fn_ws': str}}, ...
-                   'nr': {nr1: {'nr': str, 'ws': str, 'address': str}}, ...}
+    :param list kinds: column types by column index
+    :return list: converter functions by column index
     """
 
-    # {'ws': ws1: {'ws': str, 'rId': str, 'order': str, 'fn_ws': str}, ...
-    #  'nr': {nr1: {'nr': str, 'ws': str, 'address': str}, ...}
-    rv = {'ws': {}, 'nr': {}}
+    converters = {'int': readcsv_int, 'float': readcsv_float, 'number': readcsv_cell_value,
+                  'bool': readcsv_bool, 'text': readcsv_text, 'str': readcsv_str, None: readcsv_cell_value}
 
-    # zip up the excel file to expose the xml files
-    with zipfile.ZipFile(fn, 'r') as f_zip:
+    return [converters[kind] for kind in kinds]
 
-        with f_zip.open('xl/workbook.xml') as file:
-            ns = utility_xml_namespace(file)
-            for prefix, uri in ns.items():
-                ET.register_namespace(prefix, uri)
 
-        with f_zip.open('xl/workbook.xml') as file:
-            tree = ET.parse(file)
-            root = tree.getroot()
+def readcsv_int(item):
+    """
+    Converter of int csv columns, cells that are not an int are converted by readcsv_cell_value
 
-    for tag_sheet in root.findall('./default:sheets/default:sheet', ns):
-        name = tag_sheet.get('name')
-        rId = tag_sheet.get('{' + ns['r'] + '}id')
-        sheetId = int(rId.replace('rId', ''))
-        wbrels = readxl_get_workbookxmlrels(fn)
-        rv['ws'][name] = {'ws': name, 'rId': rId, 'order': sheetId, 'fn_ws': wbrels[rId]}
+    :param str item: csv cell text
+    :return: cell value
+    """
 
-    for tag_sheet in root.findall('./default:definedNames/default:definedName', ns):
-        name = tag_sheet.get('name')
-        # for user friendly entry, the "$" for locked cell-locations are removed
-        fulladdress = tag_sheet.text.replace('$', '')
+    if item:
         try:
-            ws, address = fulladdress.split('!')
+            return int(item)
         except ValueError:
-            raise UserWarning('pylightxl - Ill formatted workbook.xml. '
-                              'NamedRange does not contain sheet reference (ex: "Sheet1!A1"): '
-                              '{name} - {fulladdress}'.format(name=name, fulladdress=fulladdress))
-
-        rv['nr'][name] = {'nr': name, 'ws': ws, 'address': address}
+            pass
 
-    return rv
+    return readcsv_cell_value(item)
 
 
-def readxl_get_workbookxmlrels(fn):
+def readcsv_float(item):
     """
-    Takes a file-path for xl/_rels/workbook.xml.rels file and gets the sheet#.xml to rId relations
+    Converter of float dtype csv columns, cells that are not a float are converted by readcsv_cell_value
 
-    :param str fn: Excel file name
-    :return dict: {rId: fn_ws,...}
+    :param str item: csv cell text
+    :return: cell value
     """
 
-    # {rId: fn_ws,...}
-    rv = {}
+    if item:
+        try:
+            return float(item)
+        except ValueError:
+            pass
 
-    # zip up the excel file to expose the xml files
-    with zipfile.ZipFile(fn, 'r') as f_zip:
+    return readcsv_cell_value(item)
 
-        with f_zip.open('xl/_rels/workbook.xml.rels') as file:
-            ns = utility_xml_namespace(file)
-            for prefix, uri in ns.items():
-                ET.register_namespace(prefix, uri)
 
-        with f_zip.open('xl/_rels/workbook.xml.rels') as file:
-            tree = ET.parse(file)
-            root = tree.getroot()
+def readcsv_bool(item):
+    """
+    Converter of bool csv columns (true/false text), other cells are converted by readcsv_cell_value
 
-    for relationship in root.findall('./default:Relationship', ns):
-        fn_ws = relationship.get('Target')
-        # openpyxl write its xl/_rels/workbook.xml.rels file differently than excel itself. It adds on /xl/ at the start of the file path
-        if fn_ws[:4] == '/xl/':
-            fn_ws = fn_ws[4:]
-        rId = relationship.get('Id')
-        rv[rId] = fn_ws
+    :param str item: csv cell text
+    :return: cell value
+    """
 
-    return rv
+    text = item.strip().lower()
+    if text == 'true':
+        return True
+    elif text == 'false':
+        return False
+    else:
+        return readcsv_cell_value(item)
 
 
-def readxl_get_sharedStrings(fn):
+def readcsv_text(item):
     """
-    Takes a file-path for xl/sharedStrings.xml and returns a dictionary of commonly used strings
+    Converter of text csv columns. Text that can not be a number or bool is kept as is without trying (int and
+    float of readcsv_cell_value only parse text that starts with a digit, sign, point or whitespace, inf/nan have
+    no point), other cells are converted by readcsv_cell_value
 
-    :param str fn: Excel file name
-    :return: dict of commonly used strings
+    :param str item: csv cell text
+    :return: cell value
     """
 
-    sharedStrings = {}
-
-    # zip up the excel file to expose the xml files
-    with zipfile.ZipFile(fn, 'r') as f_zip:
+    first = item[:1]
+    if first.isdigit() or first.isspace() or first in '+-.' or \
+            (first in 'tTfF' and item.rstrip().lower() in ['true', 'false']):
+        return readcsv_cell_value(item)
 
-        if 'xl/sharedStrings.xml' not in f_zip.NameToInfo.keys():
-            return sharedStrings
+    return item
 
-        with f_zip.open('xl/sharedStrings.xml') as file:
-            ns = utility_xml_namespace(file)
-            for prefix, uri in ns.items():
-                ET.register_namespace(prefix, uri)
 
-        with f_zip.open('xl/sharedStrings.xml') as file:
-            tree = ET.parse(file)
-            root = tree.getroot()
+def readcsv_str(item):
+    """
+    Converter of str dtype csv columns, the cell text is kept as is
 
-    for i, tag_si in enumerate(root.findall('./default:si', ns)):
-        tag_t = tag_si.findall('./default:r//default:t', ns)
-        if tag_t:
-            text = ''.join([tag.text for tag in tag_t])
-        else:
-            text = tag_si.findall('./default:t', ns)[0].text
-        sharedStrings.update({i: text})
+    :param str item: csv cell text
+    :return str: cell text
+    """
 
-    return sharedStrings
+    return item
 
 
-def readxl_scrape(fn, fn_ws, sharedString):
+def readcsv_fill(ws, reader, nrows=None, start_row=1, converters=None, progress=None):
     """
-    Takes a file-path for xl/worksheets/sheet#.xml and returns a dict of cell data
-
-    :param str fn: Excel file name
-    :param str fn_ws: file path for worksheet (ex: xl/worksheets/sheet1.xml)
-    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml for string only cell values
-    :return dict: dict of cell data {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
+    Fills a worksheet's cell data straight from the row/column position of csv reader rows
+
+    :param pylightxl.Worksheet ws: worksheet to fill
+    :param reader: csv.reader (or any iterable of lists of str)
+    :param int nrows: (default=None) max number of rows to read, None reads all rows
+    :param int start_row: (default=1) worksheet row of the first csv row
+    :param list converters: (default=None) converter function by column index (see readcsv_converters),
+                            columns past the list are converted by readcsv_cell_value. None if the rows are
+                            already converted
+    :param callable progress: (default=None) called with the worksheet row every 10000 rows (see readcsv)
+    :return int: number of rows read
     """
 
-    # {address: {'v': cell_val, 'f': cell_formula, 's': ''}}
-    data = {}
+    data = ws._data
+    # column letters are looked up by column index instead of being recalculated for every cell
+    colletters = UTILITY_COLUMNLETTERS
 
-    # zip up the excel file to expose the xml files
-    with zipfile.ZipFile(fn, 'r') as f_zip:
+    i_row = start_row - 1
+    maxcol = ws.maxcol
+    for items in reader:
+        i_row += 1
+        row = str(i_row)
 
-        with f_zip.open('xl/' + fn_ws) as file:
-            ns = utility_xml_namespace(file)
-            for prefix, uri in ns.items():
-                ET.register_namespace(prefix, uri)
+        if len(items) >= len(colletters):
+            # past column XFD
+            colletters = colletters + [utility_num2columnletters(col)
+                                       for col in range(len(colletters), len(items) + 1)]
+        if len(items) > maxcol:
+            maxcol = len(items)
 
-        with f_zip.open('xl/' + fn_ws) as file:
-            tree = ET.parse(file)
-            root = tree.getroot()
+        if converters is not None:
+            while len(converters) <= len(items):
+                converters.append(readcsv_cell_value)
+            # index 0 of converters is unused, zip lines up each cell with its column's converter
+            items = [converter(item) for converter, item in zip(converters[1:], items)]
 
-    for tag_cell in root.findall('./default:sheetData/default:row/default:c', ns):
-        cell_address = tag_cell.get('r')
-        # t="e" is for error cells "#N/A"
-        # t="s" is for common strings
-        # t="str" is for equation strings (ex: =A1 & "this")
-        # t="b" is for bool, bool is not logged as a commonString in xml, 0 == FALSE, 1 == TRUE
-        cell_type = tag_cell.get('t')
-        tag_val = tag_cell.find('./default:v', ns)
-        cell_val = tag_val.text if tag_val is not None else ''
-        tag_formula = tag_cell.find('./default:f', ns)
-        cell_formula = tag_formula.text if tag_formula is not None else ''
-
-        if cell_type == 's':
-            # commonString
-            cell_val = sharedString[int(cell_val)]
-        elif cell_type == 'b':
-            # bool
-            cell_val = True if cell_val == '1' else False
-        elif cell_val == '' or cell_type == 'str' or cell_type == 'e':
-            # cell is either empty, or is a str formula - leave cell_val as a string
-            pass
-        else:
-            # int or float
-            if cell_val.isdigit():
-                cell_val = int(cell_val)
-            else:
-                cell_val = float(cell_val)
+        for i_col, item in enumerate(items, 1):
+            data[colletters[i_col] + row] = {'v': item, 'f': None, 's': None}
 
-        data.update({cell_address: {'v': cell_val, 'f': cell_formula, 's': ''}})
+        if progress is not None and i_row % 10000 == 0:
+            utility_progress(progress, rows=i_row)
 
-    return data
+        if i_row - start_row + 1 == nrows:
+            break
 
+    # size is known from the row/column positions, no need for Worksheet._calc_size
+    ws.maxrow = max(ws.maxrow, i_row)
+    ws.maxcol = maxcol
 
-def readcsv(fn, delimiter=',', ws='Sheet1'):
-    """
-    Reads an xlsx or xlsm file and returns a pylightxl database
+    return i_row - start_row + 1
 
-    :param str fn: Excel file name
-    :param str delimiter=',': csv file delimiter
-    :param str ws='Sheet1': worksheet name that the csv data will be stored in
-    :return: pylightxl.Database class
+
+def readcsv_ranges(fn, parts, blocksize=1048576):
     """
+    Splits a csv file into byte ranges that start and end at line breaks. Quoted fields may hold line breaks,
+    so the quote count (parity) is probed from the start of the file to only split outside of quoted fields
 
-    # declare a db
-    db = Database()
+    :param str fn: csv file name
+    :param int parts: number of ranges to split the file into (may return fewer for small files)
+    :param int blocksize: (default=1048576) bytes read at a time while probing
+    :return list: list of (start, end) byte ranges
+    """
 
-    # test that file entered was a valid excel file
-    if 'pathlib' in str(type(fn)):
-        fn = str(fn)
+    size = os.path.getsize(fn)
+    targets = [size * i // parts for i in range(1, parts)]
+    bounds = [0]
 
-    # data = {'A1': data1, 'A2': data2...}
-    data = {}
+    with open(fn, 'rb') as f:
+        pos = 0
+        quotes = 0
+        while targets:
+            block = f.read(blocksize)
+            if not block:
+                break
 
-    with open(fn, 'r') as f:
-        i_row = 0
-        while True:
-            i_row += 1
+            i = 0
+            while targets and i < len(block):
+                if pos + i < targets[0]:
+                    # count the quotes up to the next target
+                    j = min(targets[0] - pos, len(block))
+                    quotes += block.count(b'"', i, j)
+                    i = j
+                    continue
+
+                # past the target: split at the first line break that is not in a quoted field
+                j = block.find(b'\n', i)
+                if j == -1:
+                    quotes += block.count(b'"', i)
+                    i = len(block)
+                    continue
+                quotes += block.count(b'"', i, j)
+                i = j + 1
+                if quotes % 2 == 0:
+                    if pos + i < size:
+                        bounds.append(pos + i)
+                    while targets and targets[0] < pos + i:
+                        targets.pop(0)
+
+            pos += len(block)
+
+    bounds.append(size)
+
+    return [(bounds[i], bounds[i+1]) for i in range(len(bounds) - 1)]
+
+
+def readcsv_range_worker(args):
+    """
+    Process pool worker of readcsv, parses the csv rows of a byte range (see readcsv_ranges)
 
-            line = f.readline()
+    :param tuple args: (fn, start, end, delimiter, column types by column index (see readcsv_schema), True if
+                       the range is the last one of the file)
+    :return tuple: (list of rows of converted cell values, False if the range did not end at a row boundary)
+    """
 
-            if not line:
-                break
+    fn, start, end, delimiter, kinds, last = args
+    converters = readcsv_converters(kinds)
 
-            line = line.replace('\n', '').replace('\r', '')
+    with open(fn, 'rb') as f:
+        f.seek(start)
+        block = f.read(end - start)
 
-            items = line.split(delimiter)
+    if sys.version_info[0] < 3:
+        f = io.BytesIO(block)
+    else:
+        # same text encoding as readcsv_open
+        f = io.StringIO(block.decode(locale.getpreferredencoding(False)), newline='')
 
-            for i_col, item in enumerate(items, 1):
-                address = utility_num2columnletters(i_col) + str(i_row)
+    # ranges other than the last end at a line break, a sentinel line after it is only read as a row of its
+    #  own if the range did not end inside of a quoted field
+    sentinel = '_pylightxl_range_end_'
+    lines = f if last else itertools.chain(f, [sentinel + '\n'])
 
-                # data conditioning
-                try:
-                    if '.' in item:
-                        item = float(item)
-                    else:
-                        item = int(item)
-                except ValueError:
-                    if 'true' in item.strip().lower():
-                        item = True
-                    elif 'false' in item.strip().lower():
-                        item = False
+    rows = []
+    for items in csv.reader(lines, delimiter=delimiter):
+        while len(converters) <= len(items):
+            converters.append(readcsv_cell_value)
+        rows.append([converter(item) for converter, item in zip(converters[1:], items)])
 
-                data[address] = {'v': item, 'f': None, 's': None}
+    if last:
+        return rows, True
+    if not rows or rows[-1] != [sentinel]:
+        return rows, False
 
-    db.add_ws(ws, data)
+    return rows[:-1], True
 
-    return db
 
 ########################################################################################################
 # SEC-04: WRITEXL FUNCTIONS
 ########################################################################################################
 
 
-def writexl(db, fn):
+def writexl(db, fn, workers=1, compression=zipfile.ZIP_DEFLATED, compresslevel=None, strings='shared', stats=None,
+            progress=None):
     """
     Writes an excel file from pylightxl.Database
 
     :param pylightxl.Database db: database contains sheetnames, and their data
-    :param str/pathlib fn: file output path
+    :param str/pathlib/io.BytesIO fn: file output path or a writable binary file object (always written as new)
+    :param int workers: (default=1) number of processes used to serialize worksheets of a new excel file,
+                        note that scripts using workers>1 on windows must be guarded by if __name__ == '__main__'
+    :param int compression: (default=zipfile.ZIP_DEFLATED) zip compression, use zipfile.ZIP_STORED for the
+                            fastest write at the cost of file size (ex: local temporary files)
+    :param int compresslevel: (default=None) ZIP_DEFLATED level 1 (fastest) to 9 (smallest), None is zlib's
+                              default level 6. Requires python 3.7+, it is ignored on older versions
+    :param str strings: (default='shared') how string cells are written: 'shared' logs all strings in one
+                        xl/sharedStrings.xml table, 'inline' writes them straight into the worksheet as
+                        t="inlineStr" cells (skips the sharedStrings pass, good for mostly unique strings),
+                        'auto' shares strings that repeat and inlines strings that occur once
+    :param dict or callable stats: (default=None) instrumentation of the write, phase records like readxl's
+                                   ('bytes' are uncompressed xml characters). Phases of a new file are 'workbook',
+                                   'sharedStrings', 'worksheet' per worksheet and 'parts', an existing file logs
+                                   'extract', 'worksheet' per worksheet and 'zip'
+    :param callable progress: (default=None) called with {'ws': str, 'sheets_done': int, 'sheets': int,
+                              'rows': int or None, 'bytes': None, 'total_bytes': None} as worksheets are written
+                              (every 10000 rows of a new file's worksheets). Returning False cancels the write with
+                              a UserWarning, a new file is not left behind and an existing file is left untouched
     :return: None
     """
 
@@ -427,39 +2147,74 @@ def writexl(db, fn):
     if 'pathlib' in str(type(fn)):
         fn = str(fn)
 
-    # cleanup existing pylightxl temp files if an error occured
-    temp_folders = [folder for folder in os.listdir('.') if '_pylightxl_' in folder]
-    for folder in temp_folders:
-        shutil.rmtree(folder)
+    if hasattr(fn, 'write'):
+        # file objects (ex: io.BytesIO, http response streams) are written in memory, never touching the disk
+        writexl_new_writer(db, fn, workers=workers, compression=compression, compresslevel=compresslevel,
+                           strings=strings, stats=stats, progress=progress)
+        return
 
     if not os.path.isfile(fn):
         # write to new excel
-        writexl_new_writer(db, fn)
+        writexl_new_writer(db, fn, workers=workers, compression=compression, compresslevel=compresslevel,
+                           strings=strings, stats=stats, progress=progress)
     else:
         # write to existing excel
-        writexl_alt_writer(db, fn)
+        writexl_alt_writer(db, fn, compression=compression, compresslevel=compresslevel, strings=strings,
+                           stats=stats, progress=progress)
 
 
-def writexl_alt_writer(db, path):
+def writexl_alt_writer(db, path, compression=zipfile.ZIP_DEFLATED, compresslevel=None, strings='shared',
+                       stats=None, progress=None):
     """
     Writes to an existing excel file. Only injects cell overwrites or new/removed sheets
 
     :param pylightxl.Database db: database contains sheetnames, and their data
     :param str path: file output path
+    :param int compression: (default=zipfile.ZIP_DEFLATED) zip compression (zipfile.ZIP_STORED or ZIP_DEFLATED)
+    :param int compresslevel: (default=None) ZIP_DEFLATED level 1-9, None is zlib's default (python 3.7+)
+    :param str strings: (default='shared') 'shared', 'inline' or 'auto' string cells (see writexl)
+    :param dict or callable stats: (default=None) phase records (see writexl)
+    :param callable progress: (default=None) progress records per worksheet (see writexl)
     :return: None
     """
 
-    filename = os.path.split(path)[-1]
-    filename = filename if filename.split('.')[-1] == 'xlsx' else '.'.join(filename.split('.')[:-1] + ['xlsx'])
-    temp_folder = '_pylightxl_' + filename
-    # cleanup old fies
-    for file in os.listdir('.'):
-        if '_pylightxl_' in file:
-            shutil.rmtree(file)
+    # the file is unzipped to a temporary folder of its own and the working directory is never changed, so
+    #  writes to other files can run at the same time on other threads
+    work_folder = tempfile.mkdtemp(prefix='_pylightxl_')
+    try:
+        temp_fn = writexl_alt_writer_folder(db, path, work_folder, compression, compresslevel, strings, stats,
+                                            progress)
+        writexl_alt_replace(db, path, temp_fn)
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+
+def writexl_alt_writer_folder(db, path, work_folder, compression=zipfile.ZIP_DEFLATED, compresslevel=None,
+                              strings='shared', stats=None, progress=None):
+    """
+    Renders the updated version of an existing excel file in a temporary work folder (see writexl_alt_writer).
+    The existing file is not touched, see writexl_alt_replace
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str path: file output path
+    :param str work_folder: empty temporary folder the file is unzipped to and zipped up in, removed by the caller
+    :param int compression: (default=zipfile.ZIP_DEFLATED) zip compression (zipfile.ZIP_STORED or ZIP_DEFLATED)
+    :param int compresslevel: (default=None) ZIP_DEFLATED level 1-9, None is zlib's default (python 3.7+)
+    :param str strings: (default='shared') 'shared', 'inline' or 'auto' string cells (see writexl)
+    :param dict or callable stats: (default=None) phase records (see writexl)
+    :param callable progress: (default=None) progress records per worksheet (see writexl)
+    :return str: path of the rendered excel file inside work_folder
+    """
+
+    t0 = time.time()
+
+    filename = os.path.basename(utility_xlsx_fn(path))
+    temp_folder = os.path.join(work_folder, 'parts')
 
     # have to extract all first to modify
     with zipfile.ZipFile(path, 'r') as f:
         f.extractall(temp_folder)
+        t0 = utility_stats(stats, 'extract', t0, nbytes=sum([info.file_size for info in f.infolist()]))
 
     text = writexl_alt_app_text(db, temp_folder + '/docProps/app.xml')
     with open(temp_folder + '/docProps/app.xml', 'w') as f:
@@ -474,39 +2229,78 @@ def writexl_alt_writer(db, path):
             try:
                 os.rename(old_name, new_name)
             except FileExistsError:
-                os.remove('./' + new_name)
+                os.remove(new_name)
                 os.rename(old_name, new_name)
     # get filename to xml rId associations
     sheetref = writexl_alt_getsheetref(path_wbrels=temp_folder + '/xl/_rels/workbook.xml.rels',
                                        path_wb=temp_folder + '/xl/workbook.xml')
     existing_sheetnames = [d['name'] for d in sheetref.values()]
 
+    # worksheets that are in sync with this file (read from it or last written to it) only get their updated
+    #  cells patched into the existing xml. Their untouched string cells still point to the existing
+    #  sharedStrings, therefore the existing table is kept in order and new strings are appended to it
+    if db._source == os.path.abspath(path):
+        patch_ws = [sheet_name for sheet_name in db.ws_names
+                    if sheet_name in existing_sheetnames and db.ws(sheet_name)._dirty is not None]
+    else:
+        patch_ws = []
+    if patch_ws:
+        sharedStrings = readxl_get_sharedStrings(path)
+        db._sharedStrings = [sharedStrings[i] if sharedStrings[i] is not None else ''
+                             for i in range(len(sharedStrings))]
+        db._sharedStrings_index = {}
+
     text = writexl_new_workbook_text(db)
     with open(temp_folder + '/xl/workbook.xml', 'w') as f:
         f.write(text)
 
+    shared = writexl_new_sharedStrings_select(db, strings)
+
     for shID, sheet_name in enumerate(db.ws_names, 1):
+        # the existing file is only replaced at the very end, a cancelled write leaves it untouched
+        utility_progress(progress, ws=sheet_name, sheets_done=shID - 1, sheets=len(db.ws_names))
+        t0 = time.time()
         if sheet_name in existing_sheetnames:
             # get the original sheet
             for subdict in sheetref.values():
                 if subdict['name'] == sheet_name:
                     fn = 'temp_' + subdict['filename']
 
-            # rewrite the sheet as if it was new
-            text = writexl_new_worksheet_text(db, sheet_name)
-            # feed altered text to new sheet based on db indexing order
-            with open(temp_folder + '/xl/worksheets/sheet{}.xml'.format(shID), 'w') as f:
-                f.write(text)
+            patched = False
+            if sheet_name in patch_ws:
+                patched = writexl_alt_patch_worksheet(db, sheet_name,
+                                                      fn_in=temp_folder + '/xl/worksheets/' + fn,
+                                                      fn_out=temp_folder + '/xl/worksheets/sheet{}.xml'.format(shID),
+                                                      shared=shared, partial=db._source_nr is not None)
+                if not patched and db._source_nr is not None:
+                    # rewriting the sheet from the cells of the named ranges would drop all other cells
+                    raise UserWarning('pylightxl - Worksheet ({}) was read with readxl nr and can not be patched '
+                                      '(ex: updated a shared formula), read the whole worksheet to update '
+                                      'it.'.format(sheet_name))
+            if not patched:
+                # rewrite the sheet as if it was new
+                text = writexl_new_worksheet_text(db, sheet_name, shared=shared)
+                # feed altered text to new sheet based on db indexing order
+                with open(temp_folder + '/xl/worksheets/sheet{}.xml'.format(shID), 'w') as f:
+                    f.write(text)
             # remove temp xml sheet file
             os.remove(temp_folder + '/xl/worksheets/{}'.format(fn))
         else:
             # this sheet is new, create a new sheet
-            text = writexl_new_worksheet_text(db, sheet_name)
+            text = writexl_new_worksheet_text(db, sheet_name, shared=shared)
             with open(temp_folder + '/xl/worksheets/sheet{shID}.xml'.format(shID=shID), 'w') as f:
                 f.write(text)
+        if stats is not None:
+            utility_stats(stats, 'worksheet', t0, ws=sheet_name, cells=len(db.ws(sheet_name)._data),
+                          nbytes=os.path.getsize(temp_folder + '/xl/worksheets/sheet{}.xml'.format(shID)))
+    t0 = time.time()
+
+    # keep the existing styles/theme linked, patched worksheets still reference their cell styles
+    styles = os.path.isfile(temp_folder + '/xl/styles.xml')
+    theme = os.path.isfile(temp_folder + '/xl/theme/theme1.xml')
 
     # this has to come after sheets for db._sharedStrings to be populated
-    text = writexl_new_workbookrels_text(db)
+    text = writexl_new_workbookrels_text(db, styles=styles, theme=theme)
     with open(temp_folder + '/xl/_rels/workbook.xml.rels', 'w') as f:
         f.write(text)
 
@@ -517,7 +2311,7 @@ def writexl_alt_writer(db, path):
     with open(temp_folder + '/xl/sharedStrings.xml', 'w') as f:
         f.write(text)
 
-    text = writexl_new_content_types_text(db)
+    text = writexl_new_content_types_text(db, styles=styles, theme=theme)
     with open(temp_folder + '/[Content_Types].xml', 'w') as f:
         f.write(text)
 
@@ -539,6 +2333,30 @@ def writexl_alt_writer(db, path):
     except (FileNotFoundError, WindowsError):
         pass
 
+    # zip up the parts next to the temp folder (archive names are relative to the temp folder)
+    temp_fn = os.path.join(work_folder, filename)
+    with utility_zipfile_writer(temp_fn, compression, compresslevel) as f:
+        for root, dirs, files in os.walk(temp_folder):
+            for file in files:
+                f.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), temp_folder))
+    utility_stats(stats, 'zip', t0)
+    utility_progress(progress, sheets_done=len(db.ws_names), sheets=len(db.ws_names))
+
+    return temp_fn
+
+
+def writexl_alt_replace(db, path, temp_fn):
+    """
+    Replaces an existing excel file with its updated version rendered by writexl_alt_writer_folder
+
+    :param pylightxl.Database db: database that was written
+    :param str path: existing excel file path
+    :param str temp_fn: rendered excel file path
+    :return: None
+    """
+
+    out_folder, filename = os.path.split(os.path.abspath(utility_xlsx_fn(path)))
+
     # remove existing file
     try:
         os.remove(path)
@@ -548,33 +2366,30 @@ def writexl_alt_writer(db, path):
         print('     New temporary file was written to <{}>'.format('new_' + filename))
         filename = 'new_' + filename
 
+    # move the zipped up file out of the temp folder
+    shutil.move(temp_fn, os.path.join(out_folder, filename))
 
+    writexl_sync(db, os.path.join(out_folder, filename))
 
-    # log old wd before changing it to temp folder for zipping
-    old_dir = os.getcwd()
-    # wd must be changed to be within the temp folder to get zipfile to prevent the top level temp folder
-    #  from being zipped as well
-    os.chdir(temp_folder)
-    with zipfile.ZipFile(filename, 'w') as f:
-        for root, dirs, files in os.walk('.'):
-            for file in files:
-                # top level "with" statement already creates a excel file that is seen by os.walk
-                #  this check skips that empty zip file from being zipped as well
-                if file != filename:
-                    f.write(os.path.join(root, file))
-    # move the zipped up file out of the temp folder
-    try:
-        shutil.move(filename, old_dir)
-    except Exception:
-        os.remove(old_dir + '\\' + filename)
-        shutil.move(filename, old_dir)
-    os.chdir(old_dir)
-    # remove temp folder
+
+def writexl_alt_app_find(root, path, ns):
+    """
+    Finds a docProps/app.xml tag, returns None if the tag or its namespaces are missing.
+    Python 2.7 caches ElementPath lookups by path only (not by namespace map), so a missing
+    namespace does not always raise SyntaxError and the result has to be checked for None.
+
+    :param xml.etree.ElementTree.Element root: app.xml root element
+    :param str path: ElementPath using the "default" and "vt" prefixes
+    :param dict ns: namespace map of app.xml
+    :return xml.etree.ElementTree.Element: found element or None
+    """
+
+    if 'default' not in ns or 'vt' not in ns:
+        return None
     try:
-        shutil.rmtree(temp_folder)
-    except PermissionError:
-        # windows sometimes messes up cleaning this up in python3
-        os.system(r'rmdir test\_pylightxl_temp_wb.xlsx /s /q')
+        return root.find(path, ns)
+    except SyntaxError:
+        return None
 
 
 def writexl_alt_app_text(db, filepath):
@@ -599,9 +2414,8 @@ def writexl_alt_app_text(db, filepath):
 
     if db.nr_names == {}:
         # does not contain namedranges
-        try:
-            tag_vt_vector = root.find('./default:HeadingPairs//vt:vector', ns)
-        except SyntaxError:
+        tag_vt_vector = writexl_alt_app_find(root, './default:HeadingPairs//vt:vector', ns)
+        if tag_vt_vector is None:
             # this occurs when excel file was created by another program like openpyxl
             # where not all information was written to docProps/app.xml
             return writexl_new_app_text(db)
@@ -623,9 +2437,8 @@ def writexl_alt_app_text(db, filepath):
 
     else:
         # contains namedranges
-        try:
-            tag_vt_vector = root.find('./default:HeadingPairs//vt:vector', ns)
-        except SyntaxError:
+        tag_vt_vector = writexl_alt_app_find(root, './default:HeadingPairs//vt:vector', ns)
+        if tag_vt_vector is None:
             # this occurs when excel file was created by another program like openpyxl
             # where not all information was written to docProps/app.xml
             return writexl_new_app_text(db)
@@ -659,7 +2472,9 @@ def writexl_alt_app_text(db, filepath):
 
     # update: number of worksheets and named ranges for the workbook under "TitlesOfParts"
     # update: remove existing worksheet names, preserve named ranges, add new worksheet names
-    tag_vt_vector = root.find('./default:TitlesOfParts//vt:vector', ns)
+    tag_vt_vector = writexl_alt_app_find(root, './default:TitlesOfParts//vt:vector', ns)
+    if tag_vt_vector is None:
+        return writexl_new_app_text(db)
     tag_vt_vector.clear()
     tag_vt_vector.set('size', str(len(db.ws_names) + len(db.nr_names)))
     tag_vt_vector.set('baseType', 'lpstr')
@@ -712,7 +2527,7 @@ def writexl_alt_getsheetref(path_wbrels, path_wb):
     for element in root.findall('./default:Relationship', ns):
         if 'worksheets/sheet' in element.get('Target'):
             rId = element.get('Id')
-            filename = element.get('Target').split('/')[1].replace('"', '')
+            filename = element.get('Target').split('/')[-1].replace('"', '')
             sheetref.update({rId: {'sheetId': None, 'name': None, 'filename': filename}})
 
     # -------------------------------------------------------------
@@ -731,48 +2546,422 @@ def writexl_alt_getsheetref(path_wbrels, path_wb):
     return sheetref
 
 
-def writexl_new_writer(db, path):
+def writexl_alt_patch_worksheet(db, sheet_name, fn_in, fn_out, shared=None, partial=False):
+    """
+    Streams an existing xl/worksheets/sheet#.xml and only swaps in the cells that were updated since the
+    worksheet was last read/written (see Worksheet._dirty), new cells/rows are inserted in order. Everything
+    else the database does not model (cell styles, column widths, merged cells, etc.) is kept as is, except
+    for references to parts the alt writer does not keep (drawings, controls, tables, printer settings and
+    linked hyperlinks) which are unlinked from the sheet.
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str sheet_name: worksheet name
+    :param str fn_in: file path of the existing sheet#.xml
+    :param str fn_out: file path of the patched sheet#.xml
+    :param set shared: (default=None) strings written to sharedStrings, others are inlined. None shares all
+    :param bool partial: (default=False) the worksheet only holds some of the sheet's cells (see readxl nr), the
+                         existing dimension is kept and only grown to the worksheet size
+    :return bool: False if the sheet can not be patched (ex: updated a shared formula) and has to be rewritten
+    """
+
+    chunk_size = 1024 * 1024
+
+    re_sheetdata = re.compile(r'<sheetData\b[^>]*?(/?)>')
+    re_dimension = re.compile(r'<dimension\b[^>]*/>')
+    re_dimension_ref = re.compile(r'\bref="([A-Z]+\d+(?::[A-Z]+\d+)?)"')
+    # a complete <row> tag or the end of sheetData
+    re_row = re.compile(r'<row\b([^>]*?)(?:/>|>(.*?)</row>)|</sheetData>', re.S)
+    re_cell = re.compile(r'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+    re_rownum = re.compile(r'\br="(\d+)"')
+    re_colletter = re.compile(r'\br="([A-Z]+)\d+"')
+    re_style = re.compile(r'\bs="(\d+)"')
+    re_sharedformula = re.compile(r'<f\b[^>]*\bref="')
+    re_unlink = re.compile(r'<(drawing|legacyDrawing|legacyDrawingHF|picture|tableParts|controls|oleObjects)\b'
+                           r'[^>]*?(?:/>|>.*?</\1>)', re.S)
+    re_hyperlink = re.compile(r'<hyperlink\b[^>]*\br:id="[^"]*"[^>]*/>')
+    re_hyperlinks = re.compile(r'<hyperlinks>\s*</hyperlinks>')
+    re_alternate = re.compile(r'<mc:AlternateContent\b[^>]*>(?:(?!<mc:AlternateContent\b).)*?</mc:AlternateContent>',
+                              re.S)
+    re_rid = re.compile(r'\s+r:id="[^"]*"')
+
+    ws = db.ws(sheet_name)
+
+    # {row: {col: address}} of the updated cells
+    patches = {}
+    for address in ws._dirty:
+        row, col = utility_address2index(address)
+        patches.setdefault(row, {})[col] = address
+    patch_rows = sorted(patches.keys())
+
+    ws_size = ws.size
+    if ws_size == [0, 0] or ws_size == [1, 1]:
+        sheet_size_address = 'A1'
+    else:
+        sheet_size_address = 'A1:' + utility_index2address(ws_size[0], ws_size[1])
+
+    def cell_text(row, col, style=''):
+        if patches[row][col] not in ws._data:
+            # removed cell
+            return ''
+        cell = ws._data[patches[row][col]]
+        return writexl_new_cell_text(db, utility_index2address(row, col), cell['v'], cell['f'], style, shared)
+
+    def new_row_text(row):
+        many_tag_cr = ''.join([cell_text(row, col) for col in sorted(patches[row].keys())])
+        return '<row r="{row}">{many_tag_cr}</row>'.format(row=row, many_tag_cr=many_tag_cr) if many_tag_cr else ''
+
+    def patched_row_text(row, attributes, content):
+        cols = patches[row]
+        many_tag_cr = ''
+        col = 0
+        for m_cell in re_cell.finditer(content or ''):
+            # the cell reference is optional, cells without one follow the previous cell
+            m_col = re_colletter.search(m_cell.group(1))
+            col = utility_columnletter2num(m_col.group(1)) if m_col else col + 1
+            # insert new cells that come before this one
+            for new_col in sorted([c for c in cols.keys() if c < col]):
+                many_tag_cr += cell_text(row, new_col)
+                del cols[new_col]
+            if col in cols:
+                if re_sharedformula.search(m_cell.group(0)):
+                    # other cells depend on this shared formula
+                    return None
+                m_style = re_style.search(m_cell.group(1))
+                many_tag_cr += cell_text(row, col, m_style.group(1) if m_style else '')
+                del cols[col]
+            else:
+                many_tag_cr += m_cell.group(0)
+        for new_col in sorted(cols.keys()):
+            many_tag_cr += cell_text(row, new_col)
+        return '<row{attributes}>{many_tag_cr}</row>'.format(attributes=attributes, many_tag_cr=many_tag_cr)
+
+    with io.open(fn_in, 'r', encoding='utf-8', newline='') as f_in, \
+            io.open(fn_out, 'w', encoding='utf-8', newline='') as f_out:
+
+        # copy everything up to sheetData with an updated dimension
+        buf = ''
+        while True:
+            m_sheetdata = re_sheetdata.search(buf)
+            if m_sheetdata:
+                break
+            chunk = f_in.read(chunk_size)
+            if not chunk:
+                return False
+            buf += chunk
+
+        head = buf[:m_sheetdata.start()]
+        m_dimension = re_dimension.search(head)
+        if partial and m_dimension:
+            # cells outside of what was read are still in the sheet, their extent is only known from the dimension
+            m_ref = re_dimension_ref.search(m_dimension.group(0))
+            if m_ref:
+                maxrow, maxcol = utility_range2bounds(m_ref.group(1))[2:]
+                maxrow, maxcol = max(maxrow, ws_size[0]), max(maxcol, ws_size[1])
+                if [maxrow, maxcol] != [1, 1]:
+                    sheet_size_address = 'A1:' + utility_index2address(maxrow, maxcol)
+        head = re_dimension.sub('<dimension ref="{}"/>'.format(sheet_size_address), head, 1)
+        f_out.write(head)
+        f_out.write(unicode('<sheetData>'))
+        pos = m_sheetdata.end()
+        i_patch = 0
+
+        if m_sheetdata.group(1) == '/':
+            # empty sheetData, all updated cells are new rows
+            for row in patch_rows:
+                f_out.write(unicode(new_row_text(row)))
+            f_out.write(unicode('</sheetData>'))
+        else:
+            row = 0
+            while True:
+                m_row = re_row.search(buf, pos)
+                if m_row is None:
+                    # row is split between chunks
+                    chunk = f_in.read(chunk_size)
+                    if not chunk:
+                        return False
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    continue
+
+                f_out.write(buf[pos:m_row.start()])
+                pos = m_row.end()
+
+                if m_row.group(0) == '</sheetData>':
+                    for row in patch_rows[i_patch:]:
+                        f_out.write(unicode(new_row_text(row)))
+                    f_out.write(unicode('</sheetData>'))
+                    break
+
+                # the row reference is optional, rows without one follow the previous row
+                m_rownum = re_rownum.search(m_row.group(1))
+                row = int(m_rownum.group(1)) if m_rownum else row + 1
+
+                while i_patch < len(patch_rows) and patch_rows[i_patch] < row:
+                    f_out.write(unicode(new_row_text(patch_rows[i_patch])))
+                    i_patch += 1
+
+                if i_patch < len(patch_rows) and patch_rows[i_patch] == row:
+                    text = patched_row_text(row, m_row.group(1), m_row.group(2))
+                    if text is None:
+                        return False
+                    f_out.write(unicode(text))
+                    i_patch += 1
+                else:
+                    f_out.write(m_row.group(0))
+
+        # everything after sheetData is small, unlink parts that are not kept by the alt writer
+        tail = buf[pos:] + f_in.read()
+        tail = re_unlink.sub('', tail)
+        tail = re_hyperlinks.sub('', re_hyperlink.sub('', tail))
+        while re_alternate.search(tail):
+            tail = re_alternate.sub('', tail)
+        tail = re_rid.sub('', tail)
+        f_out.write(tail)
+
+    return True
+
+
+def writexl_new_writer(db, path, workers=1, compression=zipfile.ZIP_DEFLATED, compresslevel=None, strings='shared',
+                       stats=None, progress=None):
     """
     Writes to a new excel file. The minimum xml parts are zipped together and converted to an .xlsx
 
     :param pylightxl.Database db: database contains sheetnames, and their data
-    :param str path: file output path
+    :param str/io.BytesIO path: file output path or a writable binary file object
+    :param int workers: (default=1) number of processes used to serialize worksheets
+    :param int compression: (default=zipfile.ZIP_DEFLATED) zip compression (zipfile.ZIP_STORED or ZIP_DEFLATED)
+    :param int compresslevel: (default=None) ZIP_DEFLATED level 1-9, None is zlib's default (python 3.7+)
+    :param str strings: (default='shared') 'shared', 'inline' or 'auto' string cells (see writexl)
+    :param dict or callable stats: (default=None) phase records (see writexl)
+    :param callable progress: (default=None) progress records (see writexl), a cancelled write removes the
+                              partly written file
     :return: None
     """
 
-    filename = os.path.split(path)[-1]
-    filename = filename if filename.split('.')[-1] == 'xlsx' else '.'.join(filename.split('.')[:-1] + ['xlsx'])
-    path = '/'.join(os.path.split(path)[:-1])
-    path = path + '/' + filename if path else filename
+    t0 = time.time()
 
-    with zipfile.ZipFile(path, 'w') as zf:
-        text_rels = writexl_new_rels_text(db)
-        zf.writestr('_rels/.rels', text_rels)
+    # file objects are written as is
+    fileobj = hasattr(path, 'write')
 
-        text_app = writexl_new_app_text(db)
-        zf.writestr('docProps/app.xml', text_app)
+    if not fileobj:
+        path = utility_xlsx_fn(path)
 
-        text_core = writexl_new_core_text(db)
-        zf.writestr('docProps/core.xml', text_core)
+    try:
+        with utility_zipfile_writer(path, compression, compresslevel) as zf:
+            text_rels = writexl_new_rels_text(db)
+            zf.writestr('_rels/.rels', text_rels)
+
+            text_app = writexl_new_app_text(db)
+            zf.writestr('docProps/app.xml', text_app)
+
+            text_core = writexl_new_core_text(db)
+            zf.writestr('docProps/core.xml', text_core)
+
+            text_workbook = writexl_new_workbook_text(db)
+            zf.writestr('xl/workbook.xml', text_workbook)
+            t0 = utility_stats(stats, 'workbook', t0,
+                               nbytes=len(text_rels) + len(text_app) + len(text_core) + len(text_workbook))
+
+            shared = writexl_new_sharedStrings_select(db, strings)
+
+            if workers > 1 and len(db.ws_names) > 1:
+                # db._sharedStrings has to be planned up front for worksheets to be serialized independently
+                sharedStrings_plan = writexl_new_sharedStrings_plan(db, shared)
+                t0 = utility_stats(stats, 'sharedStrings', t0, strings=len(db._sharedStrings))
+                args = [(sheet_name, db.ws(sheet_name), sharedStrings_plan[sheet_name]) for sheet_name in db.ws_names]
+                pool = multiprocessing.Pool(min(workers, len(args)))
+                try:
+                    # imap returns the worksheets in order as they finish
+                    for shID, text_worksheet in enumerate(pool.imap(writexl_new_worksheet_text_worker, args), 1):
+                        zf.writestr('xl/worksheets/sheet{shID}.xml'.format(shID=shID), text_worksheet)
+                        # time spent waiting on (and compressing) this worksheet
+                        t0 = utility_stats(stats, 'worksheet', t0, ws=args[shID - 1][0], nbytes=len(text_worksheet),
+                                           cells=len(args[shID - 1][1]._data))
+                        utility_progress(progress, ws=args[shID - 1][0], sheets_done=shID, sheets=len(args))
+                    pool.close()
+                except Exception:
+                    pool.terminate()
+                    raise
+                finally:
+                    pool.join()
+            else:
+                t0 = utility_stats(stats, 'sharedStrings', t0, strings=len(shared) if shared else 0)
+                for shID, sheet_name in enumerate(db.ws_names, 1):
+                    sheet_progress = utility_progress_sheet(progress, sheet_name, shID - 1, len(db.ws_names))
+                    text_worksheet = writexl_new_worksheet_text(db, sheet_name, shared=shared, progress=sheet_progress)
+                    zf.writestr('xl/worksheets/sheet{shID}.xml'.format(shID=shID), text_worksheet)
+                    t0 = utility_stats(stats, 'worksheet', t0, ws=sheet_name, nbytes=len(text_worksheet),
+                                       cells=len(db.ws(sheet_name)._data))
+                    utility_progress(progress, ws=sheet_name, sheets_done=shID, sheets=len(db.ws_names))
+
+            nbytes = 0
+            if db._sharedStrings:
+                text_sharedStrings = writexl_new_sharedStrings_text(db)
+                zf.writestr('xl/sharedStrings.xml', text_sharedStrings)
+                nbytes += len(text_sharedStrings)
+
+            # this has to come after new_worksheet_text for db._sharedStrings to be populated
+            text_workbookrels = writexl_new_workbookrels_text(db)
+            zf.writestr('xl/_rels/workbook.xml.rels', text_workbookrels)
+
+            # this has to come after new_worksheet_text for db._sharedStrings to be populated
+            text_content_types = writexl_new_content_types_text(db)
+            zf.writestr('[Content_Types].xml', text_content_types)
+    except Exception:
+        if not fileobj and os.path.isfile(path):
+            # a partly written file is not a valid excel file (ex: cancelled by the progress callback)
+            os.remove(path)
+        raise
+
+    utility_stats(stats, 'parts', t0, nbytes=nbytes + len(text_workbookrels) + len(text_content_types),
+                  strings=len(db._sharedStrings))
+    utility_progress(progress, sheets_done=len(db.ws_names), sheets=len(db.ws_names))
+
+    if not fileobj:
+        writexl_sync(db, path)
+
+
+def writexl_bytes(db, workers=1, compression=zipfile.ZIP_DEFLATED, compresslevel=None, strings='shared',
+                  stats=None, progress=None):
+    """
+    Writes an excel file from pylightxl.Database in memory and returns its content
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param int workers: (default=1) number of processes used to serialize worksheets
+    :param int compression: (default=zipfile.ZIP_DEFLATED) zip compression (zipfile.ZIP_STORED or ZIP_DEFLATED)
+    :param int compresslevel: (default=None) ZIP_DEFLATED level 1-9, None is zlib's default (python 3.7+)
+    :param str strings: (default='shared') 'shared', 'inline' or 'auto' string cells (see writexl)
+    :param dict or callable stats: (default=None) phase records (see writexl)
+    :param callable progress: (default=None) progress records (see writexl)
+    :return bytes: .xlsx file content
+    """
+
+    f = io.BytesIO()
+    writexl_new_writer(db, f, workers=workers, compression=compression, compresslevel=compresslevel,
+                       strings=strings, stats=stats, progress=progress)
+
+    return f.getvalue()
+
+
+def writexl_sync(db, path):
+    """
+    Marks a database as in sync with the excel file it was written to (see writexl_alt_patch_worksheet
+    and Database.refresh)
+
+    :param pylightxl.Database db: database that was written
+    :param str path: written excel file path
+    :return: None
+    """
+
+    # worksheets are now in sync with the written file
+    for sheet_name in db.ws_names:
+        db.ws(sheet_name)._dirty = set()
+    db._source = os.path.abspath(path)
+    db._source_members = readxl_get_members(db._source)
+    db._source_ws = None
+    db._source_sharedStrings = None
+
+
+def awritexl(db, fn, executor=None, loop=None, chunksize=1048576, **kwargs):
+    """
+    Awaitable writexl for asyncio (ex: await pylightxl.awritexl(db, 'file.xlsx')). A new excel file is rendered
+    on an executor and written to disk in chunks, each chunk is its own executor job so the event loop stays
+    responsive. An existing excel file is patched by the alt writer (see writexl) into a temporary folder next to
+    it on the executor. The file is only replaced once the future was not cancelled, cancelling the returned
+    future leaves the original file untouched.
+    The database should not be updated until the future is done. Requires python 3.4+
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str fn: file output path
+    :param concurrent.futures.Executor executor: (default=None) executor that renders, None is the loop's default
+    :param asyncio.AbstractEventLoop loop: (default=None) event loop, None is the current event loop
+    :param int chunksize: (default=1MB) bytes written to disk per executor job
+    :param kwargs: writexl options (workers, compression, compresslevel, strings)
+    :return asyncio.Future: future that is done (None) once the file is written
+    """
 
-        text_workbook = writexl_new_workbook_text(db)
-        zf.writestr('xl/workbook.xml', text_workbook)
+    loop = utility_asyncio_loop(loop)
 
-        for shID, sheet_name in enumerate(db.ws_names, 1):
-            text_worksheet = writexl_new_worksheet_text(db, sheet_name)
-            zf.writestr('xl/worksheets/sheet{shID}.xml'.format(shID=shID), text_worksheet)
+    if 'pathlib' in str(type(fn)):
+        fn = str(fn)
 
-        if db._sharedStrings:
-            text_sharedStrings = writexl_new_sharedStrings_text(db)
-            zf.writestr('xl/sharedStrings.xml', text_sharedStrings)
+    future = loop.create_future()
 
-        # this has to come after new_worksheet_text for db._sharedStrings to be populated
-        text_workbookrels = writexl_new_workbookrels_text(db)
-        zf.writestr('xl/_rels/workbook.xml.rels', text_workbookrels)
+    if os.path.isfile(fn):
+        # existing files are patched by the alt writer (see writexl). The temporary folder sits next to the
+        #  file, so replacing the file on the event loop is a rename
+        work_folder = tempfile.mkdtemp(prefix='_pylightxl_', dir=os.path.dirname(os.path.abspath(fn)))
+        alt_kwargs = dict([(key, val) for key, val in kwargs.items() if key != 'workers'])
 
-        # this has to come after new_worksheet_text for db._sharedStrings to be populated
-        text_content_types = writexl_new_content_types_text(db)
-        zf.writestr('[Content_Types].xml', text_content_types)
+        def replace(done):
+            # runs on the event loop once the patched file is rendered
+            try:
+                if future.cancelled():
+                    if not done.cancelled():
+                        done.exception()
+                    return
+                try:
+                    writexl_alt_replace(db, fn, done.result())
+                except Exception as e:
+                    future.set_exception(e)
+                    return
+                future.set_result(None)
+            finally:
+                shutil.rmtree(work_folder, ignore_errors=True)
+
+        job = loop.run_in_executor(executor, functools.partial(writexl_alt_writer_folder, db, fn, work_folder,
+                                                               **alt_kwargs))
+        job.add_done_callback(replace)
+        return future
+
+    # new files are written as .xlsx like writexl does
+    fn = utility_xlsx_fn(fn)
+
+    temp_fn = fn + '.pylightxl.tmp'
+    state = {}
+
+    def cleanup():
+        if 'f' in state:
+            state['f'].close()
+        if os.path.isfile(temp_fn):
+            os.remove(temp_fn)
+
+    def step(done=None):
+        # runs on the event loop between executor jobs
+        if future.cancelled():
+            if done is not None and not done.cancelled():
+                done.exception()
+            cleanup()
+            return
+        try:
+            if done is None:
+                job = loop.run_in_executor(executor, functools.partial(writexl_bytes, db, **kwargs))
+            else:
+                rv = done.result()
+                if 'content' not in state:
+                    state['content'] = memoryview(rv)
+                    state['pos'] = 0
+                    state['f'] = open(temp_fn, 'wb')
+                content = state['content']
+                if state['pos'] >= len(content):
+                    state['f'].close()
+                    del state['f']
+                    utility_replace(temp_fn, fn)
+                    writexl_sync(db, fn)
+                    future.set_result(None)
+                    return
+                chunk = content[state['pos']:state['pos'] + chunksize]
+                state['pos'] += chunksize
+                job = loop.run_in_executor(executor, state['f'].write, chunk)
+        except Exception as e:
+            cleanup()
+            future.set_exception(e)
+            return
+        job.add_done_callback(step)
+
+    step()
+
+    return future
 
 
 def writexl_new_rels_text(db):
@@ -878,11 +3067,13 @@ def writexl_new_core_text(db):
     return xml_base
 
 
-def writexl_new_workbookrels_text(db):
+def writexl_new_workbookrels_text(db, styles=False, theme=False):
     """
     Returns /xl/_rels/workbook.xml.rels text
 
     :param pylightxl.Database db: database contains sheetnames, and their data
+    :param bool styles: (default=False) link an existing xl/styles.xml (used when writing to an existing file)
+    :param bool theme: (default=False) link an existing xl/theme/theme1.xml (used when writing to an existing file)
     :return str: /xl/_rels/workbook.xml.rels text
     """
 
@@ -893,7 +3084,7 @@ def writexl_new_workbookrels_text(db):
     xml_base =  '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n' \
                 '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\r\n' \
                     '{many_tag_sheets}\r\n' \
-                    '{tag_sharedStrings}\r\n' \
+                    '{tag_sharedStrings}{tag_styles}\r\n' \
                 '</Relationships>'
 
     # location: single tag_sheet insert for xml_base
@@ -905,6 +3096,11 @@ def writexl_new_workbookrels_text(db):
     # inserts: ID
     xml_tag_sharedStrings = '<Relationship Target="sharedStrings.xml" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Id="rId{ID}"/>\r\n'
 
+    # location: styles/theme insert for xml_base
+    # inserts: ID
+    xml_tag_styles = '<Relationship Target="styles.xml" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Id="rId{ID}"/>\r\n'
+    xml_tag_theme = '<Relationship Target="theme/theme1.xml" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/theme" Id="rId{ID}"/>\r\n'
+
     many_tag_sheets = ''
     for wsID, _ in enumerate(db.ws_names, 1):
         many_tag_sheets += xml_tag_sheet.format(sheet_num=wsID)
@@ -913,9 +3109,13 @@ def writexl_new_workbookrels_text(db):
         tag_sharedStrings = xml_tag_sharedStrings.format(ID=len(db.ws_names)+1)
     else:
         tag_sharedStrings = ''
+    # +2/+3 to stay clear of the sheet and sharedStrings IDs
+    tag_styles = xml_tag_styles.format(ID=len(db.ws_names)+2) if styles else ''
+    tag_styles += xml_tag_theme.format(ID=len(db.ws_names)+3) if theme else ''
 
     rv = xml_base.format(many_tag_sheets=many_tag_sheets,
-                         tag_sharedStrings=tag_sharedStrings)
+                         tag_sharedStrings=tag_sharedStrings,
+                         tag_styles=tag_styles)
     return rv
 
 
@@ -964,11 +3164,14 @@ def writexl_new_workbook_text(db):
     return rv
 
 
-def writexl_new_worksheet_text(db, sheet_name):
+def writexl_new_worksheet_text(db, sheet_name, shared=None, progress=None):
     """
     Returns xl/worksheets/sheet#.xml text
 
     :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str sheet_name: worksheet name
+    :param set shared: (default=None) strings written to sharedStrings, others are inlined. None shares all
+    :param callable progress: (default=None) called with the rows written every 10000 rows (see writexl)
     :return str: xl/worksheets/sheet#.xml text
     """
 
@@ -996,10 +3199,6 @@ def writexl_new_worksheet_text(db, sheet_name):
     # inserts: row_num (ex: 1), num_of_cr_tags (ex: 1:5), many_tag_cr
     xml_tag_row = '<row r="{row_num}" x14ac:dyDescent="0.25" spans="1:{num_of_cr_tags}">{many_tag_cr}</row>\r\n'
 
-    # location: c r tag for xml_tag_row
-    # inserts: address, str_option (t="s" for sharedStrings), val
-    xml_tag_cr = '<c r="{address}" {str_option}><v>{val}</v></c>'
-
     ws_size = db.ws(sheet_name).size
     if ws_size == [0,0] or ws_size == [1,1]:
         sheet_size_address = 'A1'
@@ -1009,11 +3208,9 @@ def writexl_new_worksheet_text(db, sheet_name):
     many_tag_row = ''
     for rowID, row in enumerate(db.ws(sheet_name).rows, 1):
         many_tag_cr = ''
-        tag_cr = False
         num_of_cr_tags_counter = 0
         for colID, val in enumerate(row, 1):
             address = utility_index2address(rowID, colID)
-            str_option = ''
             cell_formula = ''
 
             # empty cells are not stored in _data
@@ -1022,42 +3219,18 @@ def writexl_new_worksheet_text(db, sheet_name):
             except KeyError:
                 pass
 
-            # cell contains a formula
-            if cell_formula:
-                # cells containing formula must not have a type declaration or a <v> tag
-                #   to calculate properly when excel is opened
-                tag_formula = '<f>{f}</f>'.format(f=cell_formula)
-                tag_formula = tag_formula.replace('&', '&amp;')
-                tag_cr = True
-                num_of_cr_tags_counter += 1
-                many_tag_cr += '<c r="{address}">{tag_formula}</c>'.format(address=address,
-                                                                           tag_formula=tag_formula)
-
-            # cell value is string
-            elif type(val) is str and val != '':
-                str_option = 't="s"'
-                try:
-                    # replace val with its sharedStrings index,
-                    #   note sharedString index does start at 0
-                    val = db._sharedStrings.index(val)
-                except ValueError:
-                    db._sharedStrings.append(val.replace('&', '&amp;'))
-                    val = db._sharedStrings.index(val.replace('&', '&amp;'))
-                tag_cr = True
-                num_of_cr_tags_counter += 1
-                many_tag_cr += xml_tag_cr.format(address=address, str_option=str_option, val=val)
-
-            # cell does not contain a formula, it is numeric
-            elif val != '':
-                # val is numeric
-                tag_cr = True
+            tag_cr = writexl_new_cell_text(db, address, val, cell_formula, shared=shared)
+            if tag_cr:
                 num_of_cr_tags_counter += 1
-                many_tag_cr += xml_tag_cr.format(address=address, str_option=str_option, val=val)
+                many_tag_cr += tag_cr
 
-        if tag_cr:
+        if many_tag_cr:
             many_tag_row += xml_tag_row.format(row_num=rowID, num_of_cr_tags=str(num_of_cr_tags_counter),
                                                many_tag_cr=many_tag_cr)
 
+        if progress is not None and rowID % 10000 == 0:
+            utility_progress(progress, ws=sheet_name, sheets_done=0, sheets=1, rows=rowID)
+
     # not 100% what uid does, but it is required for excel to open
     rv = xml_base.format(sizeAddress=sheet_size_address,
                          uid='2C7EE24B-C535-494D-AA97-0A61EE84BA40',
@@ -1065,6 +3238,157 @@ def writexl_new_worksheet_text(db, sheet_name):
     return rv
 
 
+def writexl_new_cell_text(db, address, val, formula='', style='', shared=None):
+    """
+    Returns a single xl/worksheets/sheet#.xml cell tag text. Shared string cell values are logged
+    in db._sharedStrings and the tag points to their sharedStrings index, other strings are written inline
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str address: excel address of the cell (ex: "A1")
+    :param val: cell value
+    :param str formula: cell formula without the leading "=" (formulas take priority over values)
+    :param str style: (default='') cell style index to keep (ex: "3" for s="3")
+    :param set shared: (default=None) strings written to sharedStrings, others are inlined. None shares all
+    :return str: cell tag text, or '' if the cell is empty
+    """
+
+    # location: c r tag for xml_tag_row
+    # inserts: address, style_option (s="#" to keep an existing style), str_option (t="s" for sharedStrings), val
+    xml_tag_cr = '<c r="{address}"{style_option} {str_option}><v>{val}</v></c>'
+
+    # location: c r tag for inline strings
+    # inserts: address, style_option, space_preserve (xml:space="preserve"), val
+    xml_tag_inlineStr = '<c r="{address}"{style_option} t="inlineStr"><is><t{space_preserve}>{val}</t></is></c>'
+
+    style_option = ' s="{}"'.format(style) if style else ''
+
+    # cell contains a formula
+    if formula:
+        # cells containing formula must not have a type declaration or a <v> tag
+        #   to calculate properly when excel is opened
+        tag_formula = '<f>{f}</f>'.format(f=formula)
+        tag_formula = tag_formula.replace('&', '&amp;')
+        return '<c r="{address}"{style_option}>{tag_formula}</c>'.format(address=address,
+                                                                         style_option=style_option,
+                                                                         tag_formula=tag_formula)
+
+    # cell value is string that is not shared, write it straight into the cell
+    elif type(val) is str and val != '' and shared is not None and val not in shared:
+        space_preserve = ' xml:space="preserve"' if val[0] == ' ' or val[-1] == ' ' else ''
+        return xml_tag_inlineStr.format(address=address, style_option=style_option, space_preserve=space_preserve,
+                                        val=html.escape(val))
+
+    # cell value is string
+    elif type(val) is str and val != '':
+        # replace val with its sharedStrings index,
+        #   note sharedString index does start at 0
+        val = writexl_new_sharedStrings_index(db, val)
+        return xml_tag_cr.format(address=address, style_option=style_option, str_option='t="s"', val=val)
+
+    # cell does not contain a formula, it is numeric
+    elif val != '':
+        return xml_tag_cr.format(address=address, style_option=style_option, str_option='', val=val)
+
+    return ''
+
+
+def writexl_new_sharedStrings_index(db, val):
+    """
+    Returns the db._sharedStrings index of a string cell value, new strings are appended to db._sharedStrings
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str val: string cell value
+    :return int: sharedStrings index (starting at 0)
+    """
+
+    if not db._sharedStrings_index and db._sharedStrings:
+        # db._sharedStrings was set directly, index its existing entries
+        for i, text in enumerate(db._sharedStrings):
+            db._sharedStrings_index.setdefault(text, i)
+
+    try:
+        return db._sharedStrings_index[val]
+    except KeyError:
+        db._sharedStrings_index[val] = len(db._sharedStrings)
+        db._sharedStrings.append(val.replace('&', '&amp;'))
+        return db._sharedStrings_index[val]
+
+
+def writexl_new_sharedStrings_select(db, strings='shared'):
+    """
+    Selects which string cell values are written to xl/sharedStrings.xml, the rest are written inline
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param str strings: (default='shared') 'shared' all strings, 'inline' none of them,
+                        'auto' strings that occur more than once in the database
+    :return: None to share all strings, otherwise a set of the strings to share
+    """
+
+    if strings == 'shared':
+        return None
+    elif strings == 'inline':
+        return set()
+    elif strings == 'auto':
+        seen = set()
+        rv = set()
+        for sheet_name in db.ws_names:
+            for cell in db.ws(sheet_name)._data.values():
+                val = cell['v']
+                if type(val) is str and val != '' and not cell['f']:
+                    if val in seen:
+                        rv.add(val)
+                    else:
+                        seen.add(val)
+        return rv
+    else:
+        raise UserWarning('pylightxl - Unsupported strings option ({}). '
+                          'Use "shared", "inline" or "auto"'.format(strings))
+
+
+def writexl_new_sharedStrings_plan(db, shared=None):
+    """
+    Logs every shared string cell value of the database in db._sharedStrings up front, which is otherwise done
+    as a side effect of writexl_new_worksheet_text. This lets worksheets be serialized independently (in parallel)
+
+    :param pylightxl.Database db: database contains sheetnames, and their data
+    :param set shared: (default=None) strings written to sharedStrings, others are inlined. None shares all
+    :return dict: sharedStrings index of each worksheet's strings {ws: {val: index, ...}, ...}
+    """
+
+    rv = {}
+
+    for sheet_name in db.ws_names:
+        ws = db.ws(sheet_name)
+        rv[sheet_name] = {}
+        vals = [cell['v'] for cell in ws._data.values() if not cell['f']]
+        # empty cells are written as the worksheet's empty cell value
+        vals.append(ws._emptycell)
+        for val in vals:
+            if type(val) is str and val != '' and val not in rv[sheet_name] and (shared is None or val in shared):
+                rv[sheet_name][val] = writexl_new_sharedStrings_index(db, val)
+
+    return rv
+
+
+def writexl_new_worksheet_text_worker(args):
+    """
+    Process pool worker of writexl_new_worksheet_text, the worksheet's shared strings must be planned up front
+    (see writexl_new_sharedStrings_plan), all other strings are written inline
+
+    :param tuple args: (sheet_name, pylightxl.Worksheet, {val: sharedStrings index, ...})
+    :return str: xl/worksheets/sheet#.xml text
+    """
+
+    sheet_name, ws, sharedStrings_index = args
+
+    db = Database()
+    db._ws[sheet_name] = ws
+    db._wsorder[1] = sheet_name
+    db._sharedStrings_index = sharedStrings_index
+
+    return writexl_new_worksheet_text(db, sheet_name, shared=sharedStrings_index)
+
+
 def writexl_new_sharedStrings_text(db):
     """
     Returns xl/sharedStrings.xml text
@@ -1089,7 +3413,7 @@ def writexl_new_sharedStrings_text(db):
 
     many_tag_si = ''
     for val in db._sharedStrings:
-        if val[0] == ' ' or val[-1] == ' ':
+        if val[:1] == ' ' or val[-1:] == ' ':
             space_preserve = 'xml:space="preserve"'
         else:
             space_preserve = ''
@@ -1099,11 +3423,13 @@ def writexl_new_sharedStrings_text(db):
     return rv
 
 
-def writexl_new_content_types_text(db):
+def writexl_new_content_types_text(db, styles=False, theme=False):
     """
     Returns [Content_Types].xml text
 
     :param pylightxl.Database db: database contains sheetnames, and their data
+    :param bool styles: (default=False) register an existing xl/styles.xml (used when writing to an existing file)
+    :param bool theme: (default=False) register an existing xl/theme/theme1.xml (used when writing to an existing file)
     :return str: [Content_Types].xml text
     """
 
@@ -1116,7 +3442,7 @@ def writexl_new_content_types_text(db):
                     '<Default Extension="xml" ContentType="application/xml"/>\r\n' \
                     '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>\r\n' \
                     '{many_tag_sheets}\r\n' \
-                    '{tag_sharedStrings}\r\n' \
+                    '{tag_sharedStrings}{tag_styles}\r\n' \
                     '<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>\r\n' \
                     '<Override PartName="/docProps/app.xml" ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>\r\n' \
                 '</Types>'
@@ -1126,6 +3452,9 @@ def writexl_new_content_types_text(db):
 
     xml_tag_sharedStrings = '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>\r\n'
 
+    xml_tag_styles = '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>\r\n'
+    xml_tag_theme = '<Override PartName="/xl/theme/theme1.xml" ContentType="application/vnd.openxmlformats-officedocument.theme+xml"/>\r\n'
+
     many_tag_sheets = ''
     for sheet_id, _ in enumerate(db.ws_names, 1):
         many_tag_sheets += xml_tag_sheet.format(sheet_id=sheet_id)
@@ -1134,22 +3463,31 @@ def writexl_new_content_types_text(db):
         tag_sharedStrings = xml_tag_sharedStrings
     else:
         tag_sharedStrings = ''
+    tag_styles = xml_tag_styles if styles else ''
+    tag_styles += xml_tag_theme if theme else ''
 
     rv = xml_base.format(many_tag_sheets=many_tag_sheets,
-                         tag_sharedStrings=tag_sharedStrings)
+                         tag_sharedStrings=tag_sharedStrings,
+                         tag_styles=tag_styles)
 
     return rv
 
 
-def writecsv(db, fn, ws=(), delimiter=','):
+def writecsv(db, fn, ws=(), delimiter=',', workers=1, progress=None):
     """
     Writes a csv file from pylightxl database. For db that have more than one sheet, will write out,
     multiple files with the sheetname tagged on the end (ex: "fn_sh2.csv")
 
     :param pylightxl.Database db:
-    :param str/pathlib/io.StringIO fn: output file name (without extension; ie. no '.csv')
+    :param str/pathlib/io.StringIO fn: output file name (without extension; ie. no '.csv'), or a writable text
+                                       file object that all worksheets are written to one after the other
     :param str or tuple ws=(): sheetname(s) to read into the database, if not specified - all sheets are read
     :param delimiter=',': csv delimiter
+    :param int workers: (default=1) number of processes that write worksheets to their own csv files in parallel
+    :param callable progress: (default=None) called with {'ws': str, 'sheets_done': int, 'sheets': int,
+                              'rows': int or None, 'bytes': None, 'total_bytes': None} every 10000 rows and
+                              worksheet written (every worksheet with workers). Returning False cancels the write
+                              with a UserWarning, the csv file being written is removed
     :return: None
     """
 
@@ -1164,39 +3502,259 @@ def writecsv(db, fn, ws=(), delimiter=','):
         # write only specified worksheets
         worksheets = (ws,) if type(ws) is str else ws
 
-    for sheet in worksheets:
-            # StringIO will keep on appending each worksheet to the same StringIO
-            if '_io.StringIO' not in str(type(fn)):
-                new_fn = fn + '_' + sheet + '.csv'
+    if hasattr(fn, 'write'):
+        # file objects (ex: io.StringIO) will keep on appending each worksheet to the same file object
+        for sheets_done, sheet in enumerate(worksheets):
+            writecsv_worksheet(db.ws(sheet), fn, delimiter,
+                               progress=utility_progress_sheet(progress, sheet, sheets_done, len(worksheets)))
+            utility_progress(progress, ws=sheet, sheets_done=sheets_done + 1, sheets=len(worksheets))
+        return
+
+    args = [(db.ws(sheet), fn + '_' + sheet + '.csv', delimiter) for sheet in worksheets]
+
+    if workers > 1 and len(args) > 1:
+        pool = multiprocessing.Pool(min(workers, len(args)))
+        try:
+            # imap returns the worksheets in order as they finish
+            for sheets_done, _ in enumerate(pool.imap(writecsv_file_worker, args), 1):
+                utility_progress(progress, ws=worksheets[sheets_done - 1], sheets_done=sheets_done,
+                                 sheets=len(args))
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    else:
+        for sheets_done, arg in enumerate(args):
+            sheet = worksheets[sheets_done]
+            writecsv_file_worker(arg, progress=utility_progress_sheet(progress, sheet, sheets_done, len(args)))
+            utility_progress(progress, ws=sheet, sheets_done=sheets_done + 1, sheets=len(args))
+
+
+def writecsv_file_worker(args, progress=None):
+    """
+    Writes a worksheet to its own csv file (process pool worker of writecsv)
+
+    :param tuple args: (pylightxl.Worksheet, csv file name, delimiter)
+    :param callable progress: (default=None) progress records (see writecsv), a cancelled write removes the file
+    :return: None
+    """
+
+    ws, new_fn, delimiter = args
+
+    f = writecsv_open(new_fn)
+    try:
+        with f:
+            writecsv_worksheet(ws, f, delimiter, progress)
+    except UserWarning:
+        os.remove(f.name)
+        raise
+
+
+def writecsv_open(new_fn):
+    """
+    Opens a buffered csv file for writing, files that are open in excel are written to "new_" + filename
+
+    :param str new_fn: csv file name
+    :return: file object
+    """
+
+    try:
+        f = io.open(new_fn, 'w', buffering=1048576)
+    except PermissionError:
+        # file is open, adjust name and print warning
+        print('pylightxl - Cannot write to existing file <{}> that is open in excel.'.format(new_fn))
+        print('     New temporary file was written to <{}>'.format('new_' + new_fn))
+        new_fn = 'new_' + new_fn
+        f = io.open(new_fn, 'w', buffering=1048576)
+
+    return f
+
+
+def writecsv_worksheet(ws, f, delimiter=',', progress=None):
+    """
+    Streams the rows of a worksheet through csv.writer (see writecsv_writerows)
+
+    :param pylightxl.Worksheet ws: worksheet to write
+    :param f: writable text file object
+    :param str delimiter: (default=',') csv delimiter
+    :param callable progress: (default=None) called with the rows written every 10000 rows (see writecsv)
+    :return: None
+    """
+
+    writecsv_writerows(writecsv_rows(ws, progress), f, delimiter)
 
+
+def writecsv_writerows(rows, f, delimiter=','):
+    """
+    Streams rows through csv.writer (quotes cells that contain the delimiter, quotes or line breaks)
+
+    :param rows: iterable of rows-lists
+    :param f: writable text file object
+    :param str delimiter: (default=',') csv delimiter
+    :return: None
+    """
+
+    if sys.version_info[0] < 3:
+        # python2 csv.writer writes bytes, text file objects take unicode
+        buffer = io.BytesIO()
+        writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\n')
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() > 1048576:
+                f.write(unicode(buffer.getvalue()))
+                buffer.seek(0)
+                buffer.truncate()
+        f.write(unicode(buffer.getvalue()))
+    else:
+        csv.writer(f, delimiter=delimiter, lineterminator='\n').writerows(rows)
+
+
+def writecsv_rows(ws, progress=None):
+    """
+    Generator of the rows of a worksheet. Populated cells are grouped by row in one pass over the worksheet data
+    instead of looking up every cell by address, empty cells are filled in with the worksheet's empty cell value
+
+    :param pylightxl.Worksheet ws: worksheet
+    :param callable progress: (default=None) called with the rows yielded every 10000 rows (see writecsv)
+    :return: generator of rows-lists
+    """
+
+    max_row, max_col = ws.size
+
+    if isinstance(ws._data, SqliteCells):
+        # rows are streamed from disk in order, the cells are not grouped in memory (see Worksheet.rows)
+        for r, row in enumerate(ws.rows, 1):
+            yield row
+            if progress is not None and r % 10000 == 0:
+                utility_progress(progress, rows=r)
+        return
+
+    if max_col <= 16384 and len(ws._data) * 2 >= max_row * max_col:
+        # dense worksheets: looking up each address is cheaper than parsing every populated address
+        data = ws._data
+        emptycell = {'v': ws._emptycell}
+        colletters = UTILITY_COLUMNLETTERS[1:max_col + 1]
+        for r in range(1, max_row + 1):
+            str_r = str(r)
+            yield [data.get(letters + str_r, emptycell)['v'] for letters in colletters]
+            if progress is not None and r % 10000 == 0:
+                utility_progress(progress, rows=r)
+        return
+
+    # {row index: {column index: value}}
+    rows = {}
+
+    for (row, col), cell in zip(utility_addresses2indexes(ws._data.keys()), ws._data.values()):
+        rows.setdefault(row, {})[col] = cell['v']
+
+    for r in range(1, max_row + 1):
+        row = [ws._emptycell] * max_col
+        for c, val in rows.get(r, {}).items():
+            if c <= max_col:
+                row[c - 1] = val
+        yield row
+        if progress is not None and r % 10000 == 0:
+            utility_progress(progress, rows=r)
+
+
+def xlsx2csv(src, dst, ws=None, delimiter=',', progress=None):
+    """
+    Converts the worksheets of an excel file straight to csv files without building a pylightxl database.
+    Worksheet rows are streamed from the xml one at a time, only the sharedStrings table is kept in memory.
+    The csv output matches readxl followed by writecsv (gaps in sparse rows and missing rows are left empty)
+
+    :param str src: Excel file name
+    :param str/pathlib/io.StringIO dst: output file name (without extension; ie. no '.csv'), each worksheet is
+                                        written to dst + "_" + sheetname + ".csv", or a writable text file object
+                                        that all worksheets are written to one after the other
+    :param str or list ws: (default=None) sheetnames to convert, if not specified - all sheets are converted
+    :param str delimiter: (default=',') csv delimiter
+    :param callable progress: (default=None) progress records as worksheet rows are streamed (see writecsv),
+                              returning False cancels with a UserWarning and removes the csv file being written
+    :return: None
+    """
+
+    if type(ws) is str:
+        ws = (ws,)
+
+    src = readxl_check_excelfile(src)
+
+    if 'pathlib' in str(type(dst)):
+        dst = str(dst)
+
+    wb_rels = readxl_get_workbook(src)
+
+    if ws is None:
+        worksheets = sorted(wb_rels['ws'].keys(), key=lambda worksheet: wb_rels['ws'][worksheet]['order'])
+    else:
+        for worksheet in ws:
+            if worksheet not in wb_rels['ws'].keys():
+                raise UserWarning('pylightxl - Sheetname ({}) is not in the workbook.'.format(worksheet))
+        worksheets = ws
+
+    sharedString = readxl_get_sharedStrings(src)
+
+    for sheets_done, worksheet in enumerate(worksheets):
+        fn_ws = wb_rels['ws'][worksheet]['fn_ws']
+        rows = xlsx2csv_rows(src, fn_ws, sharedString,
+                             progress=utility_progress_sheet(progress, worksheet, sheets_done, len(worksheets)))
+        if hasattr(dst, 'write'):
+            writecsv_writerows(rows, dst, delimiter)
+        else:
+            f = writecsv_open(dst + '_' + worksheet + '.csv')
             try:
-                if '_io.StringIO' not in str(type(fn)):
-                    f = open(new_fn, 'w')
-                else:
-                    f = fn
-            except PermissionError:
-                # file is open, adjust name and print warning
-                print('pylightxl - Cannot write to existing file <{}> that is open in excel.'.format(new_fn))
-                print('     New temporary file was written to <{}>'.format('new_' + new_fn))
-                new_fn = 'new_' + new_fn
-                f = open(new_fn, 'w')
-            finally:
-                max_row, max_col = db.ws(sheet).size
-                for r in range(1, max_row + 1):
-                    row = []
-                    for c in range(1, max_col + 1):
-                        val = db.ws(sheet).index(r, c)
-                        row.append(str(val))
-
-                    if sys.version_info[0] < 3:
-                        f.write(unicode(delimiter.join(row)))
-                        f.write(unicode('\n'))
-                    else:
-                        f.write(delimiter.join(row))
-                        f.write('\n')
-                # dont close StringIO thats passed in by the user
-                if '_io.StringIO' not in str(type(fn)):
-                    f.close()
+                with f:
+                    writecsv_writerows(rows, f, delimiter)
+            except UserWarning:
+                os.remove(f.name)
+                raise
+        utility_progress(progress, ws=worksheet, sheets_done=sheets_done + 1, sheets=len(worksheets))
+
+
+def xlsx2csv_rows(fn, fn_ws, sharedString, progress=None):
+    """
+    Generator of the padded csv rows of a worksheet (see xlsx2csv). The row width comes from the worksheet's
+    <dimension> tag, worksheets without one are scanned once up front for their widest row
+
+    :param str fn: Excel file name
+    :param str fn_ws: file path for worksheet (ex: xl/worksheets/sheet1.xml)
+    :param dict sharedString: shared string dict lookup table from xl/sharedStrings.xml
+    :param callable progress: (default=None) called with the worksheet row every 10000 rows (see xlsx2csv)
+    :return: generator of rows-lists
+    """
+
+    size = {}
+    rows = readxl_scrape_rows(fn, fn_ws, sharedString, size)
+
+    # parse up to the first row, by then the <dimension> tag has been read
+    first = next(rows, None)
+    if first is None:
+        return
+
+    if 'maxcol' in size:
+        maxcol = size['maxcol']
+    else:
+        maxcol = max([max(cells.keys()) for _, cells in readxl_scrape_rows(fn, fn_ws, sharedString)])
+
+    i_row = 0
+    for row, cells in itertools.chain([first], rows):
+        # worksheet rows without cells are written as empty rows
+        while i_row < row - 1:
+            i_row += 1
+            yield [''] * maxcol
+        i_row = row
+
+        if max(cells.keys()) > maxcol:
+            # <dimension> was out of date
+            maxcol = max(cells.keys())
+        rv = [''] * maxcol
+        for col, val in cells.items():
+            rv[col - 1] = val
+        yield rv
+        if progress is not None and row % 10000 == 0:
+            utility_progress(progress, rows=row)
 
 
 ########################################################################################################
@@ -1210,6 +3768,8 @@ class Database:
         # keys are worksheet names, values are Workbook classes
         self._ws = {}
         self._sharedStrings = []
+        # {string cell value: index in _sharedStrings}
+        self._sharedStrings_index = {}
         # {order: ws}
         self._wsorder = {}
 
@@ -1217,9 +3777,38 @@ class Database:
         # {unique_name: unique_address, ...}
         self._NamedRange = {}
 
+        # absolute path of the excel file this database was last read from or written to, worksheets that are
+        #  in sync with this file only log their updated cells (Worksheet._dirty) so they can be patched in-place
+        self._source = None
+        # state of _source used by refresh: {zip member: (CRC32, size)}, the sheetnames read (None for all),
+        #  the named ranges read (None if whole worksheets were read) and the sharedStrings table it was read
+        #  with (None if unknown)
+        self._source_members = {}
+        self._source_ws = None
+        self._source_nr = None
+        self._source_sharedStrings = None
+
     def __repr__(self):
         return 'pylightxl.Database'
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the sqlite storage of worksheets (see Worksheet.set_storage), temporary sqlite files are removed.
+        Worksheets in sqlite storage can not be used after. Also called at the end of a "with" block
+
+        :return: None
+        """
+
+        for ws in self._ws.values():
+            if isinstance(ws, Worksheet) and isinstance(ws._data, SqliteCells):
+                ws._data.close()
+
     def ws(self, ws):
         """
         Indexes worksheets within the database
@@ -1229,10 +3818,16 @@ class Database:
         """
 
         try:
-            return self._ws[ws]
+            rv = self._ws[ws]
         except KeyError:
             raise UserWarning('pylightxl - Sheetname ({}) is not in the database'.format(ws))
 
+        if not isinstance(rv, Worksheet):
+            # worksheet of a snapshot that is loaded on first use (see load_snapshot)
+            rv = self._ws[ws] = rv()
+
+        return rv
+
     @property
     def ws_names(self):
         """
@@ -1248,18 +3843,20 @@ class Database:
 
         return rv
 
-    def add_ws(self, ws, data=None):
+    def add_ws(self, ws, data=None, size=None):
         """
         Logs worksheet name and its data in the database
 
         :param str ws: worksheet name
         :param data: dictionary of worksheet cell values (ex: {'A1': {'v':10,'f':'','s':''}, 'A2': {'v':20,'f':'','s':''}})
+        :param list size: (default=None) [maxrow, maxcol] of data if it is already known, None calculates it
         :return: None
         """
 
         if data is None:
             data = {'A1': {'v': '', 'f': '', 's': ''}}
-        self._ws[ws] = Worksheet(data)
+            size = None
+        self._ws[ws] = Worksheet(data, size)
         if ws not in self._wsorder.values():
             self._wsorder[len(self._wsorder) + 1] = ws
 
@@ -1322,6 +3919,379 @@ class Database:
         except KeyError:
             pass
 
+    def refresh(self):
+        """
+        Reloads the worksheets that changed in the excel file the database was read from (or last written to).
+        The CRC32 and size of each zip member is compared with the file's state when it was last read, only
+        changed worksheets are parsed again. The whole file is read again if its sheets changed
+        (added/renamed/removed). Caution, updates made to a refreshed worksheet in the database are lost
+
+        :return list: sheetnames that were refreshed
+        """
+
+        if self._source is None:
+            raise UserWarning('pylightxl - Database was not read from an excel file, there is nothing to refresh.')
+
+        fn = self._source
+        members = readxl_get_members(fn)
+        changed = set([name for name in set(members.keys()) | set(self._source_members.keys())
+                       if members.get(name) != self._source_members.get(name)])
+
+        if not changed:
+            return []
+
+        if self._source_nr is not None:
+            # only named ranges were read, reading them again is cheap
+            db = readxl(fn, nr=self._source_nr)
+            self.__dict__.update(db.__dict__)
+            return self.ws_names
+
+        if 'xl/workbook.xml' in changed or 'xl/_rels/workbook.xml.rels' in changed:
+            # worksheets may have been added, renamed or removed
+            storage = dict([(worksheet, self.ws(worksheet).storage) for worksheet in self.ws_names
+                            if isinstance(self._ws[worksheet], Worksheet)])
+            db = readxl(fn, ws=self._source_ws, storage=storage)
+            self.close()
+            self.__dict__.update(db.__dict__)
+            return self.ws_names
+
+        wb_rels = readxl_get_workbook(fn)
+
+        sharedString = None
+        rescrape_all = False
+        if 'xl/sharedStrings.xml' in changed:
+            sharedString = readxl_get_sharedStrings(fn)
+            old = self._source_sharedStrings
+            # strings appended to the table keep the index of existing strings, unchanged worksheets stay valid
+            rescrape_all = old is None or any([sharedString.get(i) != text for i, text in old.items()])
+
+        refreshed = []
+        for worksheet in self.ws_names:
+            if worksheet not in wb_rels['ws']:
+                # added to the database, not read from the file
+                continue
+            fn_ws = wb_rels['ws'][worksheet]['fn_ws']
+            if rescrape_all or 'xl/' + fn_ws in changed:
+                if sharedString is None:
+                    sharedString = readxl_get_sharedStrings(fn)
+                emptycell = self.ws(worksheet)._emptycell
+                size = {}
+                if self.ws(worksheet).storage == 'sqlite':
+                    data = readxl_scrape_store(fn, fn_ws, sharedString, size=size)
+                    self.ws(worksheet)._data.close()
+                else:
+                    data = readxl_scrape(fn, fn_ws, sharedString, size=size)
+                self.add_ws(ws=worksheet, data=data, size=[size['maxrow'], size['maxcol']])
+                self.ws(worksheet).set_emptycell(emptycell)
+                self.ws(worksheet)._dirty = set()
+                refreshed.append(worksheet)
+
+        self._source_members = members
+        if sharedString is not None:
+            self._source_sharedStrings = sharedString
+
+        return refreshed
+
+    def to_sqlite(self, conn, ws=None, header=False, if_exists='fail', sample=100, batchsize=10000, progress=None):
+        """
+        Exports worksheets to a sqlite3 database, one table per worksheet named after it. Column types are inferred
+        from the first sample rows (INTEGER, REAL or TEXT). Rows are streamed in batches of batchsize with
+        executemany inside one transaction, empty cells are NULL. Worksheets without cells are skipped (sqlite has no
+        tables without columns)
+
+        :param conn: sqlite3.Connection, or a sqlite database file name (opened and closed here)
+        :param str or list ws: (default=None) worksheets to export, if not specified - all worksheets are exported
+        :param bool header: (default=False) name the columns after the first row of the worksheet (the row is not
+                            exported), otherwise columns are named after their letters (A, B, ...)
+        :param str if_exists: (default='fail') existing table: 'fail' raises a UserWarning, 'replace' drops it,
+                              'append' inserts the rows into it
+        :param int sample: (default=100) number of rows the column types are inferred from
+        :param int batchsize: (default=10000) number of rows per executemany
+        :param callable progress: (default=None) called with {'ws': str, 'sheets_done': int, 'sheets': int,
+                                  'rows': int, ...} after each batch, returning False cancels the export with a
+                                  UserWarning (the transaction is rolled back)
+        :return: None
+
+        If the connection already has a transaction open, the export runs in a savepoint of it and the caller's
+        transaction is neither committed nor rolled back. Python 2 can not tell if a transaction is open, there
+        the export always runs in its own transaction (python 2 commits open transactions before DDL anyway)
+        """
+
+        if if_exists not in ['fail', 'replace', 'append']:
+            raise UserWarning('pylightxl - Incorrect if_exists ({}), use "fail", "replace" or "append".'.format(
+                if_exists))
+
+        if sqlite3 is None:
+            raise UserWarning('pylightxl - sqlite3 is not available in this python build.')
+
+        if ws is None:
+            ws = self.ws_names
+        elif type(ws) is str:
+            ws = [ws]
+
+        fn = None
+        if not isinstance(conn, sqlite3.Connection):
+            fn = conn
+            conn = sqlite3.connect(fn)
+
+        def quote(name):
+            return '"' + str(name).replace('"', '""') + '"'
+
+        # transactions are issued explicitly, sqlite3's implicit ones commit before DDL on python 2 (and before
+        #  python 3.6) which would commit a dropped table before the export could be rolled back
+        outer = getattr(conn, 'in_transaction', False)
+        isolation_level = conn.isolation_level
+        if outer:
+            conn.execute('SAVEPOINT pylightxl_to_sqlite')
+        else:
+            conn.isolation_level = None
+            conn.execute('BEGIN')
+
+        try:
+            for sheets_done, worksheet in enumerate(ws):
+                sheet = self.ws(worksheet)
+                emptycell = sheet._emptycell
+                maxcol = sheet.maxcol
+                if maxcol == 0:
+                    # sqlite has no tables without columns, empty worksheets are not exported
+                    continue
+
+                def nulls(row):
+                    # empty cells (and empty strings) are NULL
+                    return tuple([None if (type(val) is type(emptycell) and val == emptycell) or
+                                  (type(val) is str and val == '') else val for val in row])
+
+                rows = (nulls(row) for row in writecsv_rows(sheet))
+
+                names = UTILITY_COLUMNLETTERS[1:maxcol + 1] if maxcol <= 16384 else \
+                    [utility_num2columnletters(col) for col in range(1, maxcol + 1)]
+                if header:
+                    row = next(rows, None)
+                    if row is not None:
+                        # empty headers keep the column letter, repeated headers are numbered
+                        names = [name if val is None else str(val) for name, val in zip(names, row)]
+                        seen = {}
+                        for i, name in enumerate(names):
+                            seen[name.lower()] = seen.get(name.lower(), 0) + 1
+                            if seen[name.lower()] > 1:
+                                names[i] = '{}_{}'.format(name, seen[name.lower()])
+
+                # infer the column types from the first sample rows
+                sampled = list(itertools.islice(rows, sample))
+                types = []
+                for i_col in range(maxcol):
+                    kinds = set([type(row[i_col]) for row in sampled if row[i_col] is not None])
+                    if not kinds:
+                        types.append('')
+                    elif kinds <= set([int, bool]):
+                        types.append(' INTEGER')
+                    elif kinds <= set([int, bool, float]):
+                        types.append(' REAL')
+                    else:
+                        types.append(' TEXT')
+
+                table = quote(worksheet)
+                if if_exists == 'replace':
+                    conn.execute('DROP TABLE IF EXISTS ' + table)
+                elif if_exists == 'fail' and conn.execute('SELECT name FROM sqlite_master WHERE type = ? AND '
+                                                          'name = ?', ('table', worksheet)).fetchone():
+                    raise UserWarning('pylightxl - Table ({}) already exists in the sqlite database.'.format(
+                        worksheet))
+                conn.execute('CREATE TABLE IF NOT EXISTS {} ({})'.format(
+                    table, ', '.join([quote(name) + kind for name, kind in zip(names, types)])))
+
+                sql = 'INSERT INTO {} VALUES ({})'.format(table, ', '.join(['?'] * maxcol))
+                rows = itertools.chain(sampled, rows)
+                n_rows = 0
+                while True:
+                    batch = list(itertools.islice(rows, batchsize))
+                    if not batch:
+                        break
+                    conn.executemany(sql, batch)
+                    n_rows += len(batch)
+                    utility_progress(progress, ws=worksheet, sheets_done=sheets_done, sheets=len(ws), rows=n_rows)
+
+            conn.execute('RELEASE pylightxl_to_sqlite' if outer else 'COMMIT')
+        except:
+            if outer:
+                conn.execute('ROLLBACK TO pylightxl_to_sqlite')
+                conn.execute('RELEASE pylightxl_to_sqlite')
+            else:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            if not outer:
+                conn.isolation_level = isolation_level
+            if fn is not None:
+                conn.close()
+
+
+    def save_snapshot(self, fn):
+        """
+        Saves the database to a binary snapshot file (see load_snapshot). Worksheets are stored column-wise:
+        fixed-width arrays of cell rows, cols, types and numeric values, and a string table shared by all
+        worksheets for string cell values and formulas. Other cell values must be plain python data (ex: large
+        ints), values like datetime raise a UserWarning since snapshots are only loaded as plain data
+
+        :param str fn: snapshot file name
+        :return: None
+        """
+
+        if 'pathlib' in str(type(fn)):
+            fn = str(fn)
+
+        typecode_int = utility_snapshot_typecode_int()
+
+        # {(kind, val): index in strings}
+        strings_index = {}
+        strings = []
+
+        def string_index(kind, val):
+            try:
+                return strings_index[(kind, val)]
+            except KeyError:
+                if kind == 0:
+                    strings.append(val.encode('utf-8'))
+                else:
+                    strings.append(pickle.dumps(val, 2))
+                    # snapshots are only loaded as plain data (see load_snapshot)
+                    try:
+                        utility_pickle_load(io.BytesIO(strings[-1]))
+                    except pickle.UnpicklingError:
+                        raise UserWarning('pylightxl - Cell value ({}) of type {} can not be saved to a snapshot, '
+                                          'snapshots only hold plain python data.'.format(val, type(val).__name__))
+                strings_index[(kind, val)] = len(strings) - 1
+                return len(strings) - 1
+
+        sheets = {}
+
+        with open(fn, 'wb') as f:
+            # header: magic, version, byteorder, index offset, index length (filled in last)
+            f.write(b'\0' * 32)
+
+            for worksheet in self.ws_names:
+                ws = self.ws(worksheet)
+                rows = array.array('I')
+                cols = array.array('I')
+                kinds = array.array('B')
+                ints = array.array(typecode_int)
+                floats = array.array('d')
+                formulas = array.array(typecode_int)
+
+                for (row, col), cell in zip(utility_addresses2indexes(ws._data.keys()), ws._data.values()):
+                    rows.append(row)
+                    cols.append(col)
+                    val = cell['v']
+                    # kind: 0 str, 1 int, 2 float, 3 bool, 4 other (pickled into the string table)
+                    if type(val) is str:
+                        kinds.append(0)
+                        ints.append(string_index(0, val))
+                        floats.append(0.0)
+                    elif type(val) is bool:
+                        kinds.append(3)
+                        ints.append(int(val))
+                        floats.append(0.0)
+                    elif type(val) is float:
+                        kinds.append(2)
+                        ints.append(0)
+                        floats.append(val)
+                    else:
+                        try:
+                            if type(val) is not int:
+                                raise OverflowError
+                            ints.append(val)
+                            kinds.append(1)
+                        except OverflowError:
+                            kinds.append(4)
+                            ints.append(string_index(4, val))
+                        floats.append(0.0)
+                    # formula: -1 for '', -2 for None
+                    formula = cell['f']
+                    if formula == '':
+                        formulas.append(-1)
+                    elif formula is None:
+                        formulas.append(-2)
+                    else:
+                        formulas.append(string_index(0, formula))
+
+                sheet = {'maxrow': ws.maxrow, 'maxcol': ws.maxcol, 'n': len(rows), 'emptycell': ws._emptycell}
+                for name, arr in [('rows', rows), ('cols', cols), ('kinds', kinds), ('ints', ints),
+                                  ('floats', floats), ('formulas', formulas)]:
+                    sheet[name] = utility_snapshot_write_array(f, arr)
+                sheets[worksheet] = sheet
+
+            offsets = array.array(typecode_int, [0])
+            for string in strings:
+                offsets.append(offsets[-1] + len(string))
+            strings_meta = {'n': len(strings), 'offsets': utility_snapshot_write_array(f, offsets),
+                            'data': f.tell()}
+            for string in strings:
+                f.write(string)
+
+            index = pickle.dumps({'wsorder': self.ws_names, 'nr': self._NamedRange, 'sheets': sheets,
+                                  'strings': strings_meta, 'typecode_int': typecode_int}, 2)
+            index_offset = f.tell()
+            f.write(index)
+
+            f.seek(0)
+            f.write(struct.pack('<8sHBxxxxxQQ', b'PYLXSNAP', 1, sys.byteorder == 'big', index_offset,
+                                len(index)))
+
+    @staticmethod
+    def load_snapshot(fn):
+        """
+        Loads a database from a snapshot file (see save_snapshot). The file is memory-mapped, numeric arrays are
+        read straight from the mapped file without copies and each worksheet is only read when it is first
+        used, so opening a large snapshot is instant and only the worksheets that are touched are paged in.
+        Pickled parts of the file are only loaded as plain data (see utility_pickle_load)
+
+        :param str fn: snapshot file name
+        :return: pylightxl.Database class
+        """
+
+        if 'pathlib' in str(type(fn)):
+            fn = str(fn)
+
+        with open(fn, 'rb') as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                buf = b''
+
+        try:
+            magic, version, bigendian, index_offset, index_length = struct.unpack('<8sHBxxxxxQQ', buf[:32])
+        except struct.error:
+            magic = version = None
+        if magic != b'PYLXSNAP' or version != 1:
+            raise UserWarning('pylightxl - File ({}) is not a pylightxl snapshot.'.format(fn))
+        if bool(bigendian) != (sys.byteorder == 'big'):
+            raise UserWarning('pylightxl - Snapshot ({}) was saved on a machine with a different '
+                              'byteorder.'.format(fn))
+
+        # snapshots are meant to be shared with other processes, only plain data is unpickled
+        #  (see utility_pickle_load)
+        try:
+            index = utility_pickle_load(io.BytesIO(buf[index_offset:index_offset + index_length]))
+        except pickle.UnpicklingError:
+            raise UserWarning('pylightxl - Snapshot ({}) index is not plain python data.'.format(fn))
+        strings_meta = index['strings']
+        strings = {'buf': buf,
+                   'offsets': utility_snapshot_array(buf, index['typecode_int'], strings_meta['offsets'],
+                                                     strings_meta['n'] + 1),
+                   'data': strings_meta['data'],
+                   # {index: decoded string}
+                   'cache': {}}
+
+        db = Database()
+        for worksheet in index['wsorder']:
+            db._wsorder[len(db._wsorder) + 1] = worksheet
+            db._ws[worksheet] = functools.partial(utility_snapshot_ws, buf, index['sheets'][worksheet],
+                                                  index['typecode_int'], strings)
+        db._NamedRange = index['nr']
+
+        return db
+
     def set_emptycell(self, val):
         """
         Custom definition for how pylightxl returns an empty cell
@@ -1394,51 +4364,128 @@ class Database:
         except KeyError:
             return [[]]
 
-        ws, address = full_address.split('!')
+        ws, address = full_address.rsplit('!', 1)
         return self.ws(ws).range(address, formula=formula)
 
 
 class Worksheet():
 
-    def __init__(self, data=None):
+    def __init__(self, data=None, size=None):
         """
         Takes a data dict of worksheet cell data (ex: {'A1': 1})
 
         :param dict data: worksheet cell data (ex: {'A1': 1})
+        :param list size: (default=None) [maxrow, maxcol] of data if it is already known (ex: tracked while the
+                          worksheet was parsed), None calculates it
         """
         self._data = data if data != None else {}
         self.maxrow = 0
         self.maxcol = 0
-        self._calc_size()
+        if size is None:
+            self._calc_size()
+        else:
+            self.maxrow, self.maxcol = size
         self._emptycell = ''
+        # set of addresses updated since the worksheet was last read/written from/to Database._source
+        #  None means the worksheet is not in sync with any excel file and has to be fully written
+        self._dirty = None
+        # ({row: cell count}, {col: cell count}) to shrink the size when cells are removed, only counted once the
+        #  first cell is removed. None until then
+        self._counts = None
 
     def __repr__(self):
         return 'pylightxl.Database.Worksheet'
 
     def _calc_size(self):
         """
-        Calculates the size of the worksheet row/col. This only occurs on initialization
+        Calculates the size of the worksheet row/col in one pass over the cell addresses. This only occurs on
+        initialization of data with an unknown size, maxrow/maxcol are kept up to date as cells are updated/removed
 
         :return: None (but this creates instance attributes maxrow/maxcol)
         """
 
-        if self._data != {}:
-            list_of_addresses = list(self._data.keys())
-
-            list_of_chars = []
-            list_of_nums = []
-            for address in list_of_addresses:
-                list_of_chars.append(''.join(filter(lambda x: x.isalpha(), address)))
-                list_of_nums.append(int(''.join(filter(lambda x: unicode(x).isnumeric(), address))))
-            self.maxrow = int(max(list_of_nums))
-            # if all chars are the same length
-            list_of_chars.sort(reverse=True)
-            # if chars are different length
-            list_of_chars.sort(key=len, reverse=True)
-            self.maxcol = utility_address2index(list_of_chars[0]+"1")[1]
+        if isinstance(self._data, SqliteCells):
+            self.maxrow, self.maxcol = self._data.size()
+            return
+
+        maxrow = 0
+        maxcol = 0
+        # column letters are only converted once per column
+        colletters = set()
+        match = UTILITY_RE_ADDRESS.match
+
+        for address in self._data:
+            m = match(address)
+            if m is not None:
+                colletters.add(m.group(1))
+                row = int(m.group(2))
+            else:
+                row, col = utility_address2index(address)
+                maxcol = col if col > maxcol else maxcol
+            maxrow = row if row > maxrow else maxrow
+
+        for letters in colletters:
+            col = utility_columnletter2num(letters)
+            maxcol = col if col > maxcol else maxcol
+
+        self.maxrow = maxrow
+        self.maxcol = maxcol
+
+    def _count(self, row, col, n):
+        """
+        Updates the cell count of a row/col (see Worksheet._counts), counts that drop to 0 are removed
+
+        :param int row: row index
+        :param int col: col index
+        :param int n: +1 for an added cell, -1 for a removed cell
+        :return: None
+        """
+
+        rowcounts, colcounts = self._counts
+        for counts, i in [(rowcounts, row), (colcounts, col)]:
+            counts[i] = counts.get(i, 0) + n
+            if counts[i] == 0:
+                del counts[i]
+
+    @property
+    def storage(self):
+        """
+        Returns the storage of the worksheet cells (see set_storage)
+
+        :return str: 'memory' or 'sqlite'
+        """
+
+        return 'sqlite' if isinstance(self._data, SqliteCells) else 'memory'
+
+    def set_storage(self, storage='sqlite', path=None):
+        """
+        Moves the worksheet cells to another storage. 'sqlite' stores them in a sqlite3 database on disk indexed by
+        row/col (see SqliteCells) for worksheets that do not fit in memory, cells are read from disk as they are
+        accessed. 'memory' moves them back into a dict
+
+        :param str storage: (default='sqlite') 'sqlite' or 'memory'
+        :param str path: (default=None) sqlite database file, None for a temporary file that is removed when the
+                         database is closed (see Database.close)
+        :return: None
+        """
+
+        if storage not in ['sqlite', 'memory']:
+            raise UserWarning('pylightxl - Incorrect storage ({}), use "sqlite" or "memory".'.format(storage))
+
+        if storage == self.storage:
+            return
+
+        if storage == 'sqlite':
+            cells = SqliteCells(path)
+            cells.update(self._data)
+            cells.commit()
+            self._data = cells
+            # sqlite storage queries the size when cells are removed
+            self._counts = None
         else:
-            self.maxrow = 0
-            self.maxcol = 0
+            cells = self._data
+            self._data = dict(cells.items())
+            cells.close()
 
     def set_emptycell(self, val):
         """
@@ -1494,22 +4541,9 @@ class Worksheet():
         rv = []
 
         if ':' in address:
-            address_start, address_end = address.split(':')
-            row_start, col_start = utility_address2index(address_start)
-            row_end, col_end = utility_address2index(address_end)
-
-            # +1 to include the end
-            for n_row in range(row_start, row_end + 1):
-                # -1 to drop index count from excel (start start at 1 to python at 0)
-                # +1 to include the end
-                if col_end <= self.size[1]:
-                    row = self.row(n_row, formula)[(col_start - 1):(col_end - 1 + 1)]
-                else:
-                    # add extra empty cells on since self.row will only return up to the size of ws data
-                    row = self.row(n_row, formula)[col_start - 1:]
-                    while len(row) < col_end - (col_start - 1):
-                        row.append(self._emptycell)
-                rv.append(row)
+            # only the cells of the range are looked up, not the full worksheet rows
+            for addresses in utility_range2addresses(address):
+                rv.append([self.address(cell_address, formula) for cell_address in addresses])
         else:
             rv.append([self.address(address, formula)])
 
@@ -1549,6 +4583,10 @@ class Worksheet():
         address = utility_index2address(row, col)
         self.maxcol = col if col > self.maxcol else self.maxcol
         self.maxrow = row if row > self.maxrow else self.maxrow
+        if self._counts is not None and address not in self._data:
+            self._count(row, col, 1)
+        if self._dirty is not None:
+            self._dirty.add(address)
         # log formulas under formulas and trim off the '='
         if type(val) is str and len(val) != 0 and val[0] == '=':
             # overwrite existing cell val to be empty (it will calc when excel is opened)
@@ -1567,6 +4605,10 @@ class Worksheet():
         row, col = utility_address2index(address)
         self.maxcol = col if col > self.maxcol else self.maxcol
         self.maxrow = row if row > self.maxrow else self.maxrow
+        if self._counts is not None and address not in self._data:
+            self._count(row, col, 1)
+        if self._dirty is not None:
+            self._dirty.add(address)
         # log formulas under formulas and trim off the '='
         if type(val) is str and len(val) != 0 and val[0] == '=':
             # overwrite existing cell val to be empty (it will calc when excel is opened)
@@ -1574,6 +4616,67 @@ class Worksheet():
         else:
             self._data.update({address: {'v': val, 'f': '', 's': ''}})
 
+    def remove_index(self, row, col):
+        """
+        Removes a cell via index, the worksheet size shrinks if it was the last cell of the last row/col
+
+        :param int row: row index
+        :param int col: column index
+        :return: None
+        """
+
+        self._remove(utility_index2address(row, col), row, col)
+
+    def remove_address(self, address):
+        """
+        Removes a cell via address, the worksheet size shrinks if it was the last cell of the last row/col
+
+        :param str address: excel address (ex: "A1")
+        :return: None
+        """
+
+        address = address.replace('$', '')
+        row, col = utility_address2index(address)
+        self._remove(address, row, col)
+
+    def _remove(self, address, row, col):
+        """
+        Removes a cell and shrinks maxrow/maxcol to the remaining cells (see remove_index and remove_address)
+
+        :param str address: excel address
+        :param int row: row index of address
+        :param int col: col index of address
+        :return: None
+        """
+
+        if address not in self._data:
+            return
+
+        if isinstance(self._data, SqliteCells):
+            # the max row/col of the remaining cells are queried instead of counted
+            del self._data[address]
+            if self._dirty is not None:
+                self._dirty.add(address)
+            if row == self.maxrow or col == self.maxcol:
+                self.maxrow, self.maxcol = self._data.size()
+            return
+
+        if self._counts is None:
+            self._counts = ({}, {})
+            for cell_row, cell_col in utility_addresses2indexes(self._data.keys()):
+                self._count(cell_row, cell_col, 1)
+
+        del self._data[address]
+        self._count(row, col, -1)
+        if self._dirty is not None:
+            self._dirty.add(address)
+
+        rowcounts, colcounts = self._counts
+        if row == self.maxrow and row not in rowcounts:
+            self.maxrow = max(rowcounts) if rowcounts else 0
+        if col == self.maxcol and col not in colcounts:
+            self.maxcol = max(colcounts) if colcounts else 0
+
     def row(self, row, formula=False):
         """
         Takes a row index input and returns a list of cell data
@@ -1600,6 +4703,9 @@ class Worksheet():
         :return: list of cell data
         """
 
+        if isinstance(self._data, SqliteCells):
+            return self._data.col(col, self.maxrow, self._emptycell, formula)
+
         rv = []
 
         for r in range(1, self.maxrow + 1):
@@ -1616,6 +4722,10 @@ class Worksheet():
         :return: list of rows-lists (ex: [[11,12,13],[21,22,23]] for 2 rows with 3 columns of data
         """
 
+        if isinstance(self._data, SqliteCells):
+            # streamed from disk one row at a time
+            return self._data.iter_rows(self.maxrow, self.maxcol, self._emptycell)
+
         rv = []
 
         for r in range(1, self.maxrow + 1):
@@ -1756,11 +4866,308 @@ class Worksheet():
         return datas
 
 
+class SqliteCells():
+
+    def __init__(self, path=None):
+        """
+        Disk backed cell storage of a worksheet (see Worksheet.set_storage). Mirrors the dict of Worksheet._data
+        ({address: {'v': cell_val, 'f': cell_formula, 's': ''}}) on a sqlite3 table of cells keyed by (row, col),
+        so the worksheet accessors and writers run on top of it. Cells are iterated in row/col order and the
+        cells of the last row looked up are kept in memory, so cell by cell access along a row is one query
+
+        :param str path: (default=None) sqlite database file, None for a temporary file that is removed on close
+        """
+
+        if sqlite3 is None:
+            raise UserWarning('pylightxl - sqlite3 is not available in this python build.')
+
+        self._temp = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='pylightxl_', suffix='.sqlite')
+            os.close(fd)
+        self.path = path
+        self._connect()
+        self._conn.execute('DROP TABLE IF EXISTS cells')
+        # v has no declared type so values keep their type, k is the kind of v: 0 as is, 1 bool, 2 pickled
+        self._conn.execute('CREATE TABLE cells (row INTEGER, col INTEGER, v, f, k INTEGER, '
+                           'PRIMARY KEY (row, col)) WITHOUT ROWID')
+
+    def __repr__(self):
+        return 'pylightxl.SqliteCells'
+
+    def _connect(self):
+        """
+        Opens the sqlite database file. It is scratch storage, it is not journaled or synced to disk
+
+        :return: None
+        """
+
+        # worksheets read on a thread (ex: readxl_many) are used on another thread, never at the same time
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if sys.version_info[0] < 3:
+            self._conn.text_factory = SqliteCells._text
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._col_index = False
+        # (row, {col: cell}) of the last row looked up
+        self._row = None
+        self._row_cells = {}
+
+    def __getstate__(self):
+        # worksheets sent to other processes (ex: writexl workers) open the same file, they do not own it
+        self._conn.commit()
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._temp = False
+        self._connect()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            # interpreter shutdown
+            pass
+
+    def close(self):
+        """
+        Closes the sqlite database, a temporary file is removed
+
+        :return: None
+        """
+
+        if self._conn is None:
+            return
+        self._conn.close()
+        self._conn = None
+        if self._temp and os.path.isfile(self.path):
+            os.remove(self.path)
+
+    def commit(self):
+        """
+        Commits inserted cells so other connections to the file (ex: writexl workers) see them
+
+        :return: None
+        """
+
+        self._conn.commit()
+
+    @staticmethod
+    def _text(data):
+        """
+        Python 2 text factory, returns TEXT as str like the xml parser does (unicode only for non-ascii text),
+        the writers tell strings from numbers by type(val) is str
+
+        :param str data: utf-8 text
+        :return: str or unicode
+        """
+
+        try:
+            data.decode('ascii')
+            return data
+        except UnicodeDecodeError:
+            return data.decode('utf-8')
+
+    @staticmethod
+    def _encode(val):
+        """
+        Returns the stored value and kind of a cell value
+
+        :param val: cell value
+        :return tuple: (stored value, kind)
+        """
+
+        if type(val) is bool:
+            return int(val), 1
+        if val is None or type(val) in (float, str, unicode) or (type(val) is int and -2**63 <= val < 2**63):
+            return val, 0
+        return sqlite3.Binary(pickle.dumps(val, pickle.HIGHEST_PROTOCOL)), 2
+
+    @staticmethod
+    def _decode(val, kind):
+        """
+        Returns the cell value of a stored value and kind (see _encode)
+
+        :param val: stored value
+        :param int kind: 0 as is, 1 bool, 2 pickled
+        :return: cell value
+        """
+
+        if kind == 0:
+            return val
+        if kind == 1:
+            return bool(val)
+        return pickle.loads(bytes(val))
+
+    def _load_row(self, row):
+        """
+        Reads the cells of a row into the row cache
+
+        :param int row: row index
+        :return: None
+        """
+
+        decode = self._decode
+        self._row_cells = dict([(col, {'v': decode(v, k), 'f': f, 's': ''}) for col, v, f, k in
+                                self._conn.execute('SELECT col, v, f, k FROM cells WHERE row = ?', (row,))])
+        self._row = row
+
+    def _index_col(self):
+        """
+        Creates the (col, row) index for column queries on first use, bulk inserts are faster without it
+
+        :return: None
+        """
+
+        if not self._col_index:
+            self._conn.execute('CREATE INDEX IF NOT EXISTS cells_col ON cells (col, row)')
+            self._col_index = True
+
+    def __getitem__(self, address):
+        row, col = utility_address2index(address)
+        if row != self._row:
+            self._load_row(row)
+        try:
+            return self._row_cells[col]
+        except KeyError:
+            raise KeyError(address)
+
+    def __contains__(self, address):
+        try:
+            self[address]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, address, default=None):
+        try:
+            return self[address]
+        except KeyError:
+            return default
+
+    def __setitem__(self, address, cell):
+        self.update({address: cell})
+
+    def __delitem__(self, address):
+        row, col = utility_address2index(address)
+        if self._conn.execute('DELETE FROM cells WHERE row = ? AND col = ?', (row, col)).rowcount == 0:
+            raise KeyError(address)
+        if row == self._row:
+            self._row_cells.pop(col, None)
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM cells').fetchone()[0]
+
+    def __iter__(self):
+        return self.keys()
+
+    def update(self, cells):
+        """
+        Bulk inserts cells, existing cells are replaced
+
+        :param dict cells: {address: {'v': cell_val, 'f': cell_formula, 's': ''}, ...}
+        :return: None
+        """
+
+        encode = self._encode
+        addresses = list(cells.keys())
+
+        def records():
+            for (row, col), address in zip(utility_addresses2indexes(addresses), addresses):
+                cell = cells[address]
+                val, kind = encode(cell['v'])
+                yield row, col, val, cell['f'], kind
+
+        self._conn.executemany('INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?)', records())
+        self._row = None
+
+    def keys(self):
+        colletters = UTILITY_COLUMNLETTERS
+        for row, col in self._conn.execute('SELECT row, col FROM cells ORDER BY row, col'):
+            yield (colletters[col] if col <= 16384 else utility_num2columnletters(col)) + str(row)
+
+    def values(self):
+        decode = self._decode
+        for v, f, k in self._conn.execute('SELECT v, f, k FROM cells ORDER BY row, col'):
+            yield {'v': decode(v, k), 'f': f, 's': ''}
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def size(self):
+        """
+        Returns the max row and col of the stored cells
+
+        :return list: [maxrow, maxcol]
+        """
+
+        self._index_col()
+        maxrow, maxcol = self._conn.execute('SELECT MAX(row), MAX(col) FROM cells').fetchone()
+        return [maxrow or 0, maxcol or 0]
+
+    def iter_rows(self, maxrow, maxcol, emptycell=''):
+        """
+        Generator of worksheet rows read from disk in one ordered query, only one row is kept in memory
+
+        :param int maxrow: number of rows
+        :param int maxcol: number of cols of each row
+        :param emptycell: (default='') empty cell value
+        :return: generator of rows-lists
+        """
+
+        decode = self._decode
+        i_row = 1
+        row = [emptycell] * maxcol
+        for cell_row, cell_col, v, k in self._conn.execute('SELECT row, col, v, k FROM cells WHERE row <= ? AND '
+                                                           'col <= ? ORDER BY row, col', (maxrow, maxcol)):
+            while i_row < cell_row:
+                yield row
+                row = [emptycell] * maxcol
+                i_row += 1
+            row[cell_col - 1] = decode(v, k)
+        while i_row <= maxrow:
+            yield row
+            row = [emptycell] * maxcol
+            i_row += 1
+
+    def col(self, col, maxrow, emptycell='', formula=False):
+        """
+        Returns a worksheet column read from disk in one query
+
+        :param int col: col index
+        :param int maxrow: number of rows
+        :param emptycell: (default='') empty cell value
+        :param bool formula: (default=False) return the formulas of the cells
+        :return list: column values (or formulas)
+        """
+
+        self._index_col()
+        decode = self._decode
+        rv = [emptycell] * maxrow
+        for row, v, f, k in self._conn.execute('SELECT row, v, f, k FROM cells WHERE col = ? AND row <= ?',
+                                               (col, maxrow)):
+            rv[row - 1] = '=' + f if formula else decode(v, k)
+        return rv
+
+
 ########################################################################################################
 # SEC-06: UTILITY FUNCTIONS
 ########################################################################################################
 
 
+# excel columns "A" to "XFD" (16384) are precomputed so cell address conversions are a lookup
+#  UTILITY_COLUMNLETTERS[col] are the letters of column col (index 0 is unused), UTILITY_COLUMNNUMS the reverse
+UTILITY_COLUMNLETTERS = [''] + [''.join(letters) for n in (1, 2, 3)
+                                for letters in itertools.product('ABCDEFGHIJKLMNOPQRSTUVWXYZ', repeat=n)][:16384]
+UTILITY_COLUMNNUMS = dict([(letters, col) for col, letters in enumerate(UTILITY_COLUMNLETTERS) if letters])
+# uppercase cell address (ex: "AB12") split into column letters and row
+UTILITY_RE_ADDRESS = re.compile(r'([A-Z]+)(\d+)$')
+UTILITY_RE_LETTERS = re.compile(r'[A-Z]+')
+# one side of a range, column letters or row can be left out of whole column/row ranges (ex: "A", "12")
+UTILITY_RE_RANGEPART = re.compile(r'([A-Z]*)(\d*)$')
+
+
 def utility_address2index(address):
     """
     Convert excel address to row/col index
@@ -1770,14 +5177,24 @@ def utility_address2index(address):
     """
     if type(address) is not str:
         raise UserWarning('pylightxl - Address ({}) must be a string.'.format(address))
+
+    match = UTILITY_RE_ADDRESS.match(address)
+    if match is not None:
+        colstr, row = match.groups()
+        try:
+            return [int(row), UTILITY_COLUMNNUMS[colstr]]
+        except KeyError:
+            # past column XFD
+            return [int(row), utility_columnletter2num(colstr)]
+
+    # lowercase or incorrect addresses
     if address == '':
         raise UserWarning('pylightxl - Address ({}) cannot be an empty str.'.format(address))
 
     address = address.upper()
 
-    strVSnum = re.compile(r'[A-Z]+')
     try:
-        colstr = strVSnum.findall(address)[0]
+        colstr = UTILITY_RE_LETTERS.findall(address)[0]
     except IndexError:
         raise UserWarning('pylightxl - Incorrect address ({}) entry. Address must be an alphanumeric '
                          'where the starting character(s) are alpha characters a-z'.format(address))
@@ -1789,7 +5206,7 @@ def utility_address2index(address):
     col = utility_columnletter2num(colstr)
 
     try:
-        row = int(strVSnum.split(address)[1])
+        row = int(UTILITY_RE_LETTERS.split(address)[1])
     except (IndexError, ValueError):
         raise UserWarning('pylightxl - Incorrect address ({}) entry. Address must be an alphanumeric '
                          'where the trailing character(s) are numeric characters 1-9'.format(address))
@@ -1812,10 +5229,96 @@ def utility_index2address(row, col):
     if row <= 0 or col <= 0:
         raise UserWarning('pylightxl - Row ({}) and Col ({}) entry cannot be less than 1'.format(row, col))
 
-    # values over 26 are outside the A-Z range, reduce them
-    colname = utility_num2columnletters(col)
+    try:
+        return UTILITY_COLUMNLETTERS[col] + str(row)
+    except (IndexError, TypeError):
+        # past column XFD, or float col
+        return utility_num2columnletters(col) + str(row)
+
+
+def utility_addresses2indexes(addresses):
+    """
+    Converts many excel addresses to row/col indexes in one call
+
+    :param list addresses: excel addresses (ex: ["A1", "B2"])
+    :return list: [[row, col], ...] in the order of addresses
+    """
+
+    rv = []
+    match = UTILITY_RE_ADDRESS.match
+    colnums = UTILITY_COLUMNNUMS
+
+    for address in addresses:
+        m = match(address) if type(address) is str else None
+        if m is not None and m.group(1) in colnums:
+            rv.append([int(m.group(2)), colnums[m.group(1)]])
+        else:
+            rv.append(utility_address2index(address))
+
+    return rv
+
+
+def utility_indexes2addresses(indexes):
+    """
+    Converts many row/col indexes to excel addresses in one call
+
+    :param list indexes: row/col indexes (ex: [(1, 1), (2, 2)])
+    :return list: excel addresses in the order of indexes (ex: ["A1", "B2"])
+    """
+
+    rv = []
+    colletters = UTILITY_COLUMNLETTERS
 
-    return colname + str(row)
+    for row, col in indexes:
+        if type(row) is int and type(col) is int and row > 0 and 0 < col <= 16384:
+            rv.append(colletters[col] + str(row))
+        else:
+            rv.append(utility_index2address(row, col))
+
+    return rv
+
+
+def utility_range2addresses(address):
+    """
+    Takes an excel range and returns the addresses it spans
+
+    :param str address: excel range (ex: "A1:C3", or "A1")
+    :return list: nested list of addresses [row][col] (ex: [["A1", "B1"], ["A2", "B2"]] for "A1:B2")
+    """
+
+    address = address.replace('$', '')
+    address_start, _, address_end = address.partition(':')
+    row_start, col_start = utility_address2index(address_start)
+    row_end, col_end = utility_address2index(address_end) if address_end else [row_start, col_start]
+
+    colletters = [UTILITY_COLUMNLETTERS[col] if col <= 16384 else utility_num2columnletters(col)
+                  for col in range(col_start, col_end + 1)]
+
+    return [[letters + str(row) for letters in colletters] for row in range(row_start, row_end + 1)]
+
+
+def utility_range2bounds(address):
+    """
+    Takes an excel range and returns its bounds, whole columns (ex: "A:C") and whole rows (ex: "1:3") span to
+    the last row/col of a worksheet
+
+    :param str address: excel range (ex: "A1:C3", "A1", "A:C" or "1:3")
+    :return tuple: (minrow, mincol, maxrow, maxcol)
+    """
+
+    address = address.replace('$', '').upper()
+    address_start, _, address_end = address.partition(':')
+    bounds = []
+    for part, row_default, col_default in [(address_start, 1, 1),
+                                           (address_end or address_start, 1048576, 16384)]:
+        match = UTILITY_RE_RANGEPART.match(part)
+        if not part or match is None:
+            raise UserWarning('pylightxl - Incorrect range address ({}).'.format(address))
+        letters, digits = match.groups()
+        bounds.append((int(digits) if digits else row_default,
+                       utility_columnletter2num(letters) if letters else col_default))
+
+    return bounds[0][0], bounds[0][1], bounds[1][0], bounds[1][1]
 
 
 def utility_columnletter2num(text):
@@ -1825,14 +5328,16 @@ def utility_columnletter2num(text):
     :param str text: excel column (ex: 'AAA' will return 703)
     :return: int of column count
     """
-    letter_pos = len(text) - 1
-    val = 0
+
     try:
-        val = (ord(text[0].upper())-64) * 26 ** letter_pos
-        next_val = utility_columnletter2num(text[1:])
-        val = val + next_val
-    except IndexError:
-        return val
+        return UTILITY_COLUMNNUMS[text]
+    except KeyError:
+        pass
+
+    # lowercase letters or past column XFD
+    val = 0
+    for letter in text.upper():
+        val = val * 26 + ord(letter) - 64
     return val
 
 
@@ -1844,20 +5349,304 @@ def utility_num2columnletters(num):
     :return str: excel column letters
     """
 
-    def pre_num2alpha(num):
-        if num % 26 != 0:
-            num = [num // 26, num % 26]
-        else:
-            num = [(num - 1) // 26, 26]
+    if type(num) is int and 0 < num <= 16384:
+        return UTILITY_COLUMNLETTERS[num]
+
+    # past column XFD
+    letters = ''
+    while num > 0:
+        num, remainder = divmod(num - 1, 26)
+        letters = chr(remainder + 65) + letters
+    return letters
+
+
+def utility_snapshot_typecode_int():
+    """
+    Returns the 8 byte signed int array typecode ('q', python2 arrays only have 'l')
+
+    :return str: array typecode
+    """
+
+    try:
+        array.array('q')
+        return 'q'
+    except ValueError:
+        return 'l'
+
+
+def utility_snapshot_write_array(f, arr):
+    """
+    Writes an array to a snapshot file aligned to 8 bytes
+
+    :param f: binary file object
+    :param array.array arr: array to write
+    :return int: file offset of the array
+    """
+
+    f.write(b'\0' * (-f.tell() % 8))
+    offset = f.tell()
+    f.write(arr.tostring() if sys.version_info[0] < 3 else arr.tobytes())
+
+    return offset
+
+
+def utility_snapshot_array(buf, typecode, offset, n):
+    """
+    Returns an array of a memory-mapped snapshot, python3 returns a zero-copy view of the mapped file
+
+    :param mmap.mmap buf: memory-mapped snapshot
+    :param str typecode: array typecode
+    :param int offset: file offset of the array
+    :param int n: number of items
+    :return: memoryview (python3) or array.array (python2)
+    """
+
+    size = array.array(typecode).itemsize * n
+
+    if sys.version_info[0] < 3:
+        return array.array(typecode, buf[offset:offset + size])
+    else:
+        return memoryview(buf)[offset:offset + size].cast(typecode)
 
-        if num[0] > 26:
-            num = pre_num2alpha(num[0]) + [num[1]]
+
+def utility_snapshot_ws(buf, sheet, typecode_int, strings):
+    """
+    Reads a worksheet of a memory-mapped snapshot (see Database.load_snapshot)
+
+    :param mmap.mmap buf: memory-mapped snapshot
+    :param dict sheet: worksheet index of the snapshot (array offsets, size, empty cell value)
+    :param str typecode_int: 8 byte int array typecode the snapshot was saved with
+    :param dict strings: string table {'buf', 'offsets', 'data', 'cache'}
+    :return: pylightxl.Worksheet class
+    """
+
+    n = sheet['n']
+    rows = utility_snapshot_array(buf, 'I', sheet['rows'], n)
+    cols = utility_snapshot_array(buf, 'I', sheet['cols'], n)
+    kinds = utility_snapshot_array(buf, 'B', sheet['kinds'], n)
+    ints = utility_snapshot_array(buf, typecode_int, sheet['ints'], n)
+    floats = utility_snapshot_array(buf, 'd', sheet['floats'], n)
+    formulas = utility_snapshot_array(buf, typecode_int, sheet['formulas'], n)
+
+    offsets = strings['offsets']
+    data = strings['data']
+    cache = strings['cache']
+
+    def string(kind, i):
+        try:
+            return cache[i]
+        except KeyError:
+            raw = buf[data + offsets[i]:data + offsets[i + 1]]
+            cache[i] = raw.decode('utf-8') if kind == 0 else utility_pickle_load(io.BytesIO(raw))
+            if kind == 0 and sys.version_info[0] < 3:
+                cache[i] = cache[i].encode('utf-8')
+            return cache[i]
+
+    # column letters are looked up by column index instead of being recalculated for every cell
+    colletters = UTILITY_COLUMNLETTERS
+
+    cells = {}
+    for i in range(n):
+        kind = kinds[i]
+        if kind == 0:
+            val = string(0, ints[i])
+        elif kind == 1:
+            val = ints[i]
+        elif kind == 2:
+            val = floats[i]
+        elif kind == 3:
+            val = bool(ints[i])
         else:
-            num = list(filter(lambda x: False if x == 0 else True, num))
+            val = string(4, ints[i])
+
+        formula = formulas[i]
+        formula = '' if formula == -1 else None if formula == -2 else string(0, formula)
+
+        col = cols[i]
+        colletter = colletters[col] if col < len(colletters) else utility_num2columnletters(col)
+        cells[colletter + str(rows[i])] = {'v': val, 'f': formula, 's': ''}
+
+    ws = Worksheet({})
+    ws._data = cells
+    ws.maxrow = sheet['maxrow']
+    ws.maxcol = sheet['maxcol']
+    ws._emptycell = sheet['emptycell']
+
+    return ws
+
+
+def utility_asyncio_loop(loop=None):
+    """
+    Returns the asyncio event loop for the awaitable API (areadxl/awritexl)
 
-        return num
+    :param asyncio.AbstractEventLoop loop: (default=None) event loop, None is the current event loop
+    :return asyncio.AbstractEventLoop: event loop
+    """
+
+    try:
+        import asyncio
+    except ImportError:
+        raise UserWarning('pylightxl - areadxl/awritexl require python 3.4+ (asyncio)')
+
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except (AttributeError, RuntimeError):
+            loop = asyncio.get_event_loop()
+
+    return loop
+
+
+def utility_stats(stats, phase, t0, ws=None, nbytes=0, cells=0, strings=0):
+    """
+    Logs the record of a finished read/write phase (see readxl and writexl stats)
+
+    :param dict or callable stats: records are appended to stats['phases'] (dict) or passed to stats(record),
+                                   None skips logging
+    :param str phase: phase name
+    :param float t0: time.time() the phase started at
+    :param str ws: (default=None) worksheet name of per worksheet phases
+    :param int nbytes: (default=0) bytes decompressed (read) or xml characters rendered (write)
+    :param int cells: (default=0) cells parsed/written
+    :param int strings: (default=0) shared strings resolved/written
+    :return float: time.time() the record was logged at (start of the next phase), None if stats is None
+    """
+
+    if stats is None:
+        return None
+
+    t1 = time.time()
+
+    peak = None
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        peak = tracemalloc.get_traced_memory()[1]
+        if hasattr(tracemalloc, 'reset_peak'):
+            # python 3.9+, otherwise peak is the peak since tracing started
+            tracemalloc.reset_peak()
+
+    record = {'phase': phase, 'ws': ws, 'time': t1 - t0, 'bytes': nbytes, 'cells': cells, 'strings': strings,
+              'peak': peak}
+    if callable(stats):
+        stats(record)
+    else:
+        stats.setdefault('phases', []).append(record)
+
+    return time.time()
+
+
+def utility_progress(progress, **record):
+    """
+    Reports a progress record to a progress callback (see readxl, writexl, readcsv and writecsv progress)
+
+    :param callable progress: progress callback, None skips reporting
+    :param record: record items (ws, sheets_done, sheets, rows, bytes, total_bytes), items not given are None
+    :return: None
+    """
+
+    if progress is None:
+        return
+
+    rv = {'ws': None, 'sheets_done': None, 'sheets': None, 'rows': None, 'bytes': None, 'total_bytes': None}
+    rv.update(record)
+
+    if progress(rv) is False:
+        raise UserWarning('pylightxl - Cancelled by the progress callback.')
+
+
+def utility_progress_sheet(progress, ws, sheets_done, sheets):
+    """
+    Returns a progress callback that reports the records of a worksheet of a multi-worksheet read/write
+
+    :param callable progress: progress callback, None skips reporting
+    :param str ws: worksheet name
+    :param int sheets_done: number of worksheets done before this one
+    :param int sheets: number of worksheets
+    :return callable: progress callback (None if progress is None)
+    """
+
+    if progress is None:
+        return None
+
+    def report(record):
+        record.update({'ws': ws, 'sheets_done': sheets_done, 'sheets': sheets})
+        return progress(record)
 
-    return "".join(list(map(lambda x: chr(x + 64), pre_num2alpha(num))))
+    return report
+
+
+def utility_replace(src, dst):
+    """
+    Renames src to dst, replacing dst if it exists (os.replace is python 3.3+)
+
+    :param str src: file path
+    :param str dst: file path
+    :return: None
+    """
+
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        if os.path.isfile(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def utility_pickle_load(f):
+    """
+    Unpickles plain python data (str, numbers, bool, None, lists, tuples and dicts) from a binary file. Pickles
+    that reference classes or functions are refused, so a file planted by someone else (ex: in a shared cache
+    directory) can not run code when it is loaded
+
+    :param file f: binary file object
+    :return: unpickled data
+    """
+
+    if sys.version_info[0] < 3:
+        # cPickle refuses globals when find_global is None
+        unpickler = pickle.Unpickler(f)
+        unpickler.find_global = None
+        return unpickler.load()
+
+    class DataUnpickler(pickle.Unpickler):
+        def find_class(self, module, name):
+            raise pickle.UnpicklingError('pylightxl - Refused to unpickle {}.{}'.format(module, name))
+
+    return DataUnpickler(f).load()
+
+
+def utility_xlsx_fn(path):
+    """
+    Returns the file path writexl writes to, the file name's extension is replaced with .xlsx
+
+    :param str path: file path
+    :return str: file path ending in .xlsx
+    """
+
+    folder, filename = os.path.split(path)
+    filename = filename if filename.split('.')[-1] == 'xlsx' else '.'.join(filename.split('.')[:-1] + ['xlsx'])
+
+    return folder + '/' + filename if folder else filename
+
+
+def utility_zipfile_writer(file, compression=zipfile.ZIP_DEFLATED, compresslevel=None):
+    """
+    Opens a zip file for writing with the given compression
+
+    :param str/io.BytesIO file: zip file path or writable binary file object
+    :param int compression: (default=zipfile.ZIP_DEFLATED) zipfile.ZIP_STORED or zipfile.ZIP_DEFLATED
+    :param int compresslevel: (default=None) ZIP_DEFLATED level 1-9, None is zlib's default.
+                              Only supported by python 3.7+, older versions use zlib's default
+    :return: zipfile.ZipFile
+    """
+
+    if compression not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        raise UserWarning('pylightxl - Unsupported compression ({}). '
+                          'Use zipfile.ZIP_STORED or zipfile.ZIP_DEFLATED'.format(compression))
+
+    if compresslevel is not None and sys.version_info[:2] >= (3, 7):
+        return zipfile.ZipFile(file, 'w', compression=compression, compresslevel=compresslevel)
+    else:
+        return zipfile.ZipFile(file, 'w', compression=compression)
 
 
 def utility_xml_namespace(file):
@@ -0,0 +1,286 @@
+"""
+pylightxl benchmark harness
+
+Times and memory-profiles the main read/write paths on deterministic synthetic workbooks of different shapes,
+and compares the results with a stored baseline so slow downs can be caught.
+
+usage (from the repo top level or the test folder):
+    python test/benchmark.py                    # run all benchmarks and compare with the baseline
+    python test/benchmark.py --save             # run all benchmarks and store them as the new baseline
+    python test/benchmark.py --shape tall wide  # only run some workbook shapes
+    python test/benchmark.py --scale 1.0        # full size workbooks (default scale=0.25, the baseline's scale)
+    python test/benchmark.py --threshold 1.5    # fail if a benchmark is 1.5x slower than the baseline
+
+Results are printed and written to bench_output.txt (top level), the exit code is 1 if any benchmark is slower
+(or uses more memory) than baseline * threshold. Timings depend on the machine, the baseline has to be saved on
+the machine that runs the comparison (ex: once on a branch point, then on each change).
+"""
+
+# standard lib imports
+import os, sys, json, time, random, shutil, argparse, tempfile, platform
+
+try:
+    import tracemalloc
+except ImportError:
+    # python2
+    tracemalloc = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pylightxl import pylightxl as xl
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bench_output.txt')
+
+timer = time.perf_counter if hasattr(time, 'perf_counter') else time.time
+
+
+########################################################################################################
+# WORKBOOK GENERATOR
+########################################################################################################
+
+
+# shape: (sheets, rows, cols, fill ratio, cell kind)
+SHAPES = {'tall': (1, 20000, 8, 1.0, 'mixed'),
+          'wide': (1, 200, 800, 1.0, 'mixed'),
+          'sparse': (1, 5000, 300, 0.02, 'mixed'),
+          'strings': (1, 10000, 10, 1.0, 'strings'),
+          'formulas': (1, 10000, 10, 1.0, 'formulas'),
+          'many_sheets': (100, 40, 20, 1.0, 'mixed')}
+
+
+def generate_db(shape, scale=1.0, seed=0):
+    """
+    Returns a deterministic pylightxl database of a workbook shape
+
+    :param str shape: key of SHAPES
+    :param float scale: (default=1.0) scales the number of rows
+    :param int seed: (default=0) random seed
+    :return: pylightxl.Database class
+    """
+
+    sheets, rows, cols, fill, kind = SHAPES[shape]
+    rows = max(1, int(rows * scale))
+    rnd = random.Random(seed)
+
+    db = xl.Database()
+    for i_sheet in range(1, sheets + 1):
+        data = {}
+        colletters = [''] + [xl.utility_num2columnletters(col) for col in range(1, cols + 1)]
+        for row in range(1, rows + 1):
+            for col in range(1, cols + 1):
+                if fill < 1.0 and rnd.random() > fill:
+                    continue
+                if kind == 'strings':
+                    # half repeated strings, half unique strings
+                    val = 'repeated {}'.format(rnd.randint(0, 99)) if col % 2 else 'unique {} {}'.format(row, col)
+                    formula = ''
+                elif kind == 'formulas' and col > 1:
+                    val = ''
+                    formula = '{}{}*2+1'.format(colletters[col - 1], row)
+                else:
+                    # ints, floats and strings
+                    val = [rnd.randint(0, 100000), rnd.random() * 1000, 'text {}'.format(rnd.randint(0, 999))][col % 3]
+                    formula = ''
+                data[colletters[col] + str(row)] = {'v': val, 'f': formula, 's': ''}
+        db.add_ws('Sheet{}'.format(i_sheet), data)
+
+    return db
+
+
+########################################################################################################
+# BENCHMARKS
+########################################################################################################
+
+
+def measure(func, repeat=3, memory=True):
+    """
+    Returns the best wall time of a function over repeat runs and its peak python memory allocation
+
+    :param func: function without arguments
+    :param int repeat: (default=3) number of timed runs
+    :param bool memory: (default=True) make one more run with tracemalloc for the peak allocation
+    :return dict: {'time': seconds, 'peak': bytes or None}
+    """
+
+    times = []
+    for _ in range(repeat):
+        t0 = timer()
+        func()
+        times.append(timer() - t0)
+
+    peak = None
+    if memory and tracemalloc is not None:
+        # tracing slows the run down, so it is not timed
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {'time': min(times), 'peak': peak}
+
+
+def accessors(ws):
+    """
+    Exercises the Worksheet accessors over the whole worksheet
+
+    :param pylightxl.Worksheet ws: worksheet
+    :return: None
+    """
+
+    maxrow, maxcol = ws.size
+    for row in range(1, maxrow + 1, max(1, maxrow // 200)):
+        for col in range(1, maxcol + 1):
+            ws.index(row, col)
+            ws.address(xl.utility_index2address(row, col))
+    for row in range(1, maxrow + 1, max(1, maxrow // 50)):
+        ws.row(row)
+    for col in range(1, maxcol + 1, max(1, maxcol // 50)):
+        ws.col(col)
+    for _ in ws.rows:
+        pass
+
+
+def run_shape(shape, folder, scale=1.0, repeat=3, memory=True):
+    """
+    Runs every benchmark of a workbook shape
+
+    :param str shape: key of SHAPES
+    :param str folder: temporary folder for the benchmark files
+    :param float scale: (default=1.0) scales the number of rows
+    :param int repeat: (default=3) number of timed runs
+    :param bool memory: (default=True) measure peak allocations
+    :return dict: {'shape/benchmark': {'time': seconds, 'peak': bytes}, ...}
+    """
+
+    db = generate_db(shape, scale)
+    fn = os.path.join(folder, shape + '.xlsx')
+    fn_csv = os.path.join(folder, shape)
+
+    def run_writexl():
+        if os.path.isfile(fn):
+            os.remove(fn)
+        xl.writexl(db, fn)
+
+    run_writexl()
+    db_read = xl.readxl(fn)
+    ws_name = db_read.ws_names[0]
+    fn_ws = xl.readxl_get_workbook(fn)['ws'][ws_name]['fn_ws']
+    sharedString = xl.readxl_get_sharedStrings(fn)
+    xl.writecsv(db, fn_csv, ws=ws_name)
+
+    benchmarks = [('writexl', run_writexl),
+                  ('readxl', lambda: xl.readxl(fn)),
+                  ('readxl_scrape', lambda: xl.readxl_scrape(fn, fn_ws, sharedString)),
+                  ('readxl_get_sharedStrings', lambda: xl.readxl_get_sharedStrings(fn)),
+                  ('writecsv', lambda: xl.writecsv(db, fn_csv, ws=ws_name)),
+                  ('readcsv', lambda: xl.readcsv(fn_csv + '_' + ws_name + '.csv')),
+                  ('accessors', lambda: accessors(db_read.ws(ws_name)))]
+
+    rv = {}
+    for name, func in benchmarks:
+        rv[shape + '/' + name] = measure(func, repeat, memory)
+
+    return rv
+
+
+########################################################################################################
+# BASELINE
+########################################################################################################
+
+
+def compare(results, baseline, threshold, min_time=0.02, min_peak=262144):
+    """
+    Compares benchmark results with a baseline
+
+    :param dict results: {'shape/benchmark': {'time': seconds, 'peak': bytes}, ...}
+    :param dict baseline: stored results
+    :param float threshold: allowed ratio of result / baseline
+    :param float min_time: (default=0.02) time differences below this are timer noise, not regressions
+    :param int min_peak: (default=256KB) peak allocation differences below this are not regressions
+    :return tuple: (lines of the report, list of regressed benchmarks)
+    """
+
+    lines = ['{:<40} {:>10} {:>10} {:>7} {:>12} {:>7}'.format('benchmark', 'time [s]', 'base [s]', 'ratio',
+                                                              'peak [KB]', 'ratio')]
+    regressions = []
+
+    for name in sorted(results.keys()):
+        result = results[name]
+        base = baseline.get(name)
+        time_ratio = result['time'] / base['time'] if base and base['time'] else None
+        peak_ratio = result['peak'] / float(base['peak']) if base and base['peak'] and result['peak'] else None
+
+        flag = ''
+        slower = time_ratio and time_ratio > threshold and result['time'] - base['time'] > min_time
+        larger = peak_ratio and peak_ratio > threshold and result['peak'] - base['peak'] > min_peak
+        if slower or larger:
+            flag = '  << REGRESSION'
+            regressions.append(name)
+
+        lines.append('{:<40} {:>10.4f} {:>10} {:>7} {:>12} {:>7}{}'.format(
+            name, result['time'],
+            '{:.4f}'.format(base['time']) if base else '-',
+            '{:.2f}'.format(time_ratio) if time_ratio else '-',
+            '{:.0f}'.format(result['peak'] / 1024.0) if result['peak'] else '-',
+            '{:.2f}'.format(peak_ratio) if peak_ratio else '-',
+            flag))
+
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pylightxl benchmark harness')
+    parser.add_argument('--shape', nargs='+', choices=sorted(SHAPES.keys()), default=sorted(SHAPES.keys()))
+    parser.add_argument('--scale', type=float, default=0.25, help='scales the number of rows of SHAPES')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE)
+    args = parser.parse_args(argv)
+
+    folder = tempfile.mkdtemp(prefix='pylightxl_bench_')
+    results = {}
+    try:
+        for shape in args.shape:
+            results.update(run_shape(shape, folder, args.scale, args.repeat, not args.no_memory))
+    finally:
+        shutil.rmtree(folder)
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as f:
+            stored = json.load(f)
+        if stored.get('scale') == args.scale:
+            baseline = stored['results']
+        else:
+            print('baseline was saved with scale {}, not compared'.format(stored.get('scale')))
+
+    lines, regressions = compare(results, baseline, args.threshold)
+    lines.insert(0, 'python {} on {} (scale {}, threshold {})'.format(platform.python_version(), platform.platform(),
+                                                                      args.scale, args.threshold))
+    report = '\n'.join(lines)
+    print(report)
+    with open(OUTPUT, 'w') as f:
+        f.write(report + '\n')
+
+    if args.save:
+        if os.path.isfile(args.baseline):
+            with open(args.baseline, 'r') as f:
+                stored = json.load(f)
+            if stored.get('scale') == args.scale:
+                # keep the baseline of shapes that were not run
+                stored['results'].update(results)
+                results = stored['results']
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'scale': args.scale, 'results': results}, f,
+                      indent=1, sort_keys=True)
+        print('baseline saved to {}'.format(args.baseline))
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,6 @@
 # standard lib imports
 from unittest import TestCase
-import os, sys
+import os, sys, zipfile, threading
 
 # 3rd party lib support
 
@@ -84,6 +84,93 @@ class TestReadCSV(TestCase):
 
         self.assertEqual([5, 6], db.ws('sh2').size)
 
+    def test_readcsv_quoted(self):
+        with open('temp_quoted.csv', 'w') as f:
+            f.write('a,"b,c",1\n"multi\nline",2.5,true\n')
+
+        db = xl.readcsv(fn='temp_quoted.csv')
+        os.remove('temp_quoted.csv')
+
+        self.assertEqual(['a', 'b,c', 1], db.ws('Sheet1').row(1))
+        self.assertEqual(['multi\nline', 2.5, True], db.ws('Sheet1').row(2))
+        self.assertEqual([2, 3], db.ws('Sheet1').size)
+
+    def test_readcsv_chunksize(self):
+        dbs = list(xl.readcsv(fn='input.csv', delimiter='\t', ws='sh2', chunksize=2))
+
+        self.assertEqual(3, len(dbs))
+        self.assertEqual([11, 12.0, 0.13, "'14'", " ", 16], dbs[0].ws('sh2').row(1))
+        self.assertEqual([31, '', False, '', True, ''], dbs[1].ws('sh2').row(2))
+        self.assertEqual(['', 42, '', ' ', '', ''], dbs[2].ws('sh2').row(1))
+        self.assertEqual([1, 6], dbs[2].ws('sh2').size)
+
+    def test_readcsv_dtypes(self):
+        self.assertEqual('untrue', xl.readcsv_cell_value('untrue'))
+        self.assertEqual(True, xl.readcsv_cell_value(' TRUE '))
+        self.assertEqual([None, 'int', 'number', 'text', 'bool', None],
+                         xl.readcsv_schema([['1', '2.5', 'x', 'true', ''],
+                                            ['2', '3', 'y', ' false ', '4'],
+                                            ['', '', '', '', 'z']]))
+        # header rows are not sampled
+        self.assertEqual([None, 'int', 'number', 'text', 'bool'],
+                         xl.readcsv_schema([['id', 'price', 'name', 'flag'], ['1', '2.5', 'x', 'true']]))
+        # inferred column converters give the same values as readcsv_cell_value
+        for kind in ['int', 'number', 'bool', 'text', None]:
+            converter = xl.readcsv_converters([kind])[0]
+            for item in ['7', '7.5', '1e3', 'nan', 'inf', ' 8 ', 'true', 'untrue', '12" pipe', '']:
+                self.assertEqual(repr(xl.readcsv_cell_value(item)), repr(converter(item)))
+        self.assertEqual([None, 'str', 'int', 'float'],
+                         xl.readcsv_schema([['1', '2.5']], dtypes={1: str, 'B': int, 3: float}))
+        with self.assertRaises(UserWarning) as context:
+            xl.readcsv_schema([['1']], dtypes={1: list})
+
+        with open('temp_dtypes.csv', 'w') as f:
+            f.write('1,2.5,true,007\n2,3,false,010\nx,,untrue,\n')
+
+        db = xl.readcsv(fn='temp_dtypes.csv', sample=2, dtypes={'D': str})
+        os.remove('temp_dtypes.csv')
+
+        self.assertEqual([1, 2, 'x'], db.ws('Sheet1').col(1))
+        self.assertEqual([2.5, 3, ''], db.ws('Sheet1').col(2))
+        self.assertEqual([True, False, 'untrue'], db.ws('Sheet1').col(3))
+        self.assertEqual(['007', '010', ''], db.ws('Sheet1').col(4))
+
+    def test_readcsv_workers(self):
+        with open('temp_workers.csv', 'w') as f:
+            for i in range(200):
+                f.write('{},"quoted\nline {}",text\n'.format(i, i))
+
+        ranges = xl.readcsv_ranges('temp_workers.csv', 4)
+        self.assertEqual(4, len(ranges))
+        # every range starts at a row, not inside of a quoted field
+        with open('temp_workers.csv', 'rb') as f:
+            for start, end in ranges:
+                f.seek(start)
+                self.assertTrue(f.read(end - start).split(b',')[0].isdigit())
+
+        db = xl.readcsv(fn='temp_workers.csv', workers=4)
+        db_serial = xl.readcsv(fn='temp_workers.csv')
+        os.remove('temp_workers.csv')
+
+        self.assertEqual([200, 3], db.ws('Sheet1').size)
+        self.assertEqual([150, 'quoted\nline 150', 'text'], db.ws('Sheet1').row(151))
+        self.assertEqual(db_serial.ws('Sheet1')._data, db.ws('Sheet1')._data)
+
+        # a literal quote in an unquoted field throws off the quote parity, ranges that do not end at a row
+        #  are caught and the file is read serially
+        with open('temp_workers.csv', 'w') as f:
+            for i in range(200):
+                f.write('{},"quoted\nline {}",text\n'.format(i, i) if i != 10 else '10,12" pipe,text\n')
+        ranges = xl.readcsv_ranges('temp_workers.csv', 4)
+        self.assertEqual(False, xl.readcsv_range_worker(('temp_workers.csv', ranges[0][0], ranges[0][1], ',', [],
+                                                         False))[1])
+        db = xl.readcsv(fn='temp_workers.csv', workers=4)
+        db_serial = xl.readcsv(fn='temp_workers.csv')
+        os.remove('temp_workers.csv')
+
+        self.assertEqual([200, 3], db.ws('Sheet1').size)
+        self.assertEqual(db_serial.ws('Sheet1')._data, db.ws('Sheet1')._data)
+
 
 class TestIntegration(TestCase):
 
@@ -265,6 +352,329 @@ class TestIntegration(TestCase):
         DB.set_emptycell(val='')
 
 
+    def test_readxl_many(self):
+        paths = ['openpyxl.xlsx', 'missing.xlsx', 'openpyxl.xlsx']
+
+        results = list(xl.readxl_many(paths, workers=2))
+        self.assertEqual(paths, [path for path, _ in results])
+        self.assertTrue(isinstance(results[0][1], xl.Database))
+        self.assertTrue(isinstance(results[1][1], UserWarning))
+
+        results = list(xl.readxl_many(paths, workers=2, ordered=False, on_error='skip'))
+        self.assertEqual(['openpyxl.xlsx', 'openpyxl.xlsx'], [path for path, _ in results])
+
+        errors = []
+        results = list(xl.readxl_many(paths, on_error=lambda path, e: errors.append(path)))
+        self.assertEqual(2, len(results))
+        self.assertEqual(['missing.xlsx'], errors)
+
+        with self.assertRaises(UserWarning) as context:
+            list(xl.readxl_many(paths, workers=2, pool='process', on_error='raise'))
+
+        # worker results that fail to reach the parent are yielded as errors instead of blocking forever
+        def failing_worker(args):
+            if args[0] == 'missing.xlsx':
+                raise RuntimeError('result lost')
+            return worker(args)
+        worker = xl.readxl_many_worker
+        xl.readxl_many_worker = failing_worker
+        results = []
+        try:
+            reader = threading.Thread(target=lambda: results.extend(
+                xl.readxl_many(paths, workers=2, ordered=False)))
+            reader.daemon = True
+            reader.start()
+            reader.join(10)
+        finally:
+            xl.readxl_many_worker = worker
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(sorted(paths), sorted([path for path, _ in results]))
+        self.assertEqual(['missing.xlsx'], [path for path, e in results if isinstance(e, RuntimeError)])
+
+    def test_readxl_cache(self):
+        if os.path.isdir('temp_cache'):
+            for name in os.listdir('temp_cache'):
+                os.remove(os.path.join('temp_cache', name))
+
+        db = xl.readxl('openpyxl.xlsx', cache='temp_cache')
+        self.assertEqual(1, len(os.listdir('temp_cache')))
+        db_cached = xl.readxl('openpyxl.xlsx', cache='temp_cache')
+        self.assertEqual(db.ws_names, db_cached.ws_names)
+        self.assertEqual(db.ws(db.ws_names[0])._data, db_cached.ws(db.ws_names[0])._data)
+        self.assertEqual(db.ws(db.ws_names[0]).size, db_cached.ws(db.ws_names[0]).size)
+        self.assertEqual(db._source, db_cached._source)
+        self.assertEqual(db._source_sharedStrings, db_cached._source_sharedStrings)
+
+        # cache hits are moved to the storage that was asked for
+        db_cached = xl.readxl('openpyxl.xlsx', cache='temp_cache', storage='sqlite')
+        self.assertEqual('sqlite', db_cached.ws(db.ws_names[0]).storage)
+        self.assertEqual(dict(db.ws(db.ws_names[0])._data.items()), dict(db_cached.ws(db.ws_names[0])._data.items()))
+        db_cached.close()
+
+        # cache entries that would run code when unpickled are refused
+        class Planted(object):
+            def __reduce__(self):
+                return os.mkdir, ('temp_cache_planted',)
+        key = xl.readxl_cache_key(os.path.abspath('openpyxl.xlsx'), None)
+        with open(os.path.join('temp_cache', key + '.pylightxl'), 'wb') as f:
+            xl.pickle.dump(('pylightxl', 2, Planted()), f, 2)
+        self.assertEqual(None, xl.readxl_cache_load(os.path.join('temp_cache', key + '.pylightxl')))
+        self.assertFalse(os.path.isdir('temp_cache_planted'))
+
+        # a different key for a content hashed read, the older entry is evicted past the cache size
+        _ = xl.readxl('openpyxl.xlsx', cache='temp_cache', cache_hash=True)
+        self.assertEqual(2, len(os.listdir('temp_cache')))
+        xl.readxl_cache_evict('temp_cache', cache_size=0)
+        self.assertEqual(0, len(os.listdir('temp_cache')))
+
+        # unreadable cache entries are parsed again
+        key = xl.readxl_cache_key(os.path.abspath('openpyxl.xlsx'), None)
+        with open(os.path.join('temp_cache', key + '.pylightxl'), 'wb') as f:
+            f.write(b'corrupt')
+        self.assertEqual(None, xl.readxl_cache_load(os.path.join('temp_cache', key + '.pylightxl')))
+        db_cached = xl.readxl('openpyxl.xlsx', cache='temp_cache')
+        self.assertEqual(db.ws_names, db_cached.ws_names)
+
+        for name in os.listdir('temp_cache'):
+            os.remove(os.path.join('temp_cache', name))
+        os.rmdir('temp_cache')
+
+    def test_prefetch(self):
+        db = xl.Database()
+        for i_sheet in range(1, 6):
+            db.add_ws('sh{}'.format(i_sheet), {})
+            for row in range(1, 101):
+                db.ws('sh{}'.format(i_sheet)).update_index(row, i_sheet, 'text{}'.format(row))
+
+        if 'temp_prefetch.xlsx' in os.listdir('.'):
+            os.remove('temp_prefetch.xlsx')
+        xl.writexl(db, 'temp_prefetch.xlsx')
+
+        db_plain = xl.readxl('temp_prefetch.xlsx')
+        for depth in [1, 2, 10]:
+            db_prefetch = xl.readxl('temp_prefetch.xlsx', prefetch=depth)
+            self.assertEqual(db_plain.ws_names, db_prefetch.ws_names)
+            for ws in db_plain.ws_names:
+                self.assertEqual(db_plain.ws(ws)._data, db_prefetch.ws(ws)._data)
+                self.assertEqual(db_plain.ws(ws).size, db_prefetch.ws(ws).size)
+
+        # cancelling stops the prefetch thread
+        threads = threading.active_count()
+        with self.assertRaises(UserWarning) as context:
+            xl.readxl('temp_prefetch.xlsx', prefetch=1, progress=lambda record: record['ws'] != 'sh2')
+        self.assertEqual(threads, threading.active_count())
+        os.remove('temp_prefetch.xlsx')
+
+    def test_nr_read(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.add_ws('sh2', {})
+        db.add_ws('sh3', {})
+        for row in range(1, 51):
+            for col in range(1, 6):
+                db.ws('sh1').update_index(row, col, row * 10 + col)
+                db.ws('sh2').update_index(row, col, 'text{}'.format(row))
+        db.ws('sh3').update_address('A1', 'not read')
+        db.add_nr('table1', 'sh1', 'B2:C3')
+        db.add_nr('cell1', 'sh1', '$E$10')
+        db.add_nr('col2', 'sh2', 'B:B')
+
+        if 'temp_nr.xlsx' in os.listdir('.'):
+            os.remove('temp_nr.xlsx')
+        xl.writexl(db, 'temp_nr.xlsx')
+
+        db_nr = xl.readxl('temp_nr.xlsx', nr='table1')
+        self.assertEqual(['sh1'], db_nr.ws_names)
+        self.assertEqual(['B2', 'B3', 'C2', 'C3'], sorted(db_nr.ws('sh1')._data.keys()))
+        self.assertEqual([[22, 23], [32, 33]], db_nr.nr('table1'))
+        self.assertEqual([3, 3], db_nr.ws('sh1').size)
+        # all named ranges are still listed
+        self.assertEqual(3, len(db_nr.nr_names))
+
+        db_nr = xl.readxl('temp_nr.xlsx', nr=True)
+        self.assertEqual(['sh1', 'sh2'], db_nr.ws_names)
+        self.assertEqual(5, len(db_nr.ws('sh1')._data))
+        self.assertEqual([[105]], db_nr.nr('cell1'))
+        self.assertEqual(['text{}'.format(row) for row in range(1, 51)], db_nr.ws('sh2').col(2))
+        self.assertEqual(50, len(db_nr.ws('sh2')._data))
+
+        self.assertEqual((1, 1, 1048576, 3), xl.utility_range2bounds('A:C'))
+        self.assertEqual((2, 1, 4, 16384), xl.utility_range2bounds('2:4'))
+        self.assertEqual((10, 5, 10, 5), xl.utility_range2bounds('$E$10'))
+
+        with self.assertRaises(UserWarning) as context:
+            xl.readxl('temp_nr.xlsx', nr='table2')
+        self.assertEqual('pylightxl - Named range (table2) is not in the workbook.', str(context.exception))
+        with self.assertRaises(UserWarning) as context:
+            xl.readxl('temp_nr.xlsx', ws='sh1', nr='table1')
+
+        # writing back patches the updated cells, cells outside the named ranges are kept
+        db_nr = xl.readxl('temp_nr.xlsx', nr='table1')
+        db_nr.ws('sh1').update_address('B2', 'new')
+        xl.writexl(db_nr, 'temp_nr.xlsx')
+        db_full = xl.readxl('temp_nr.xlsx')
+        self.assertEqual('new', db_full.ws('sh1').address('B2'))
+        self.assertEqual(505, db_full.ws('sh1').address('E50'))
+        # the dimension still spans the cells that were not read
+        self.assertEqual([50, 5], db_full.ws('sh1').size)
+        with zipfile.ZipFile('temp_nr.xlsx') as f:
+            self.assertTrue('<dimension ref="A1:E50"/>' in f.read('xl/worksheets/sheet1.xml').decode('utf-8'))
+
+        # sheets read with nr are never rewritten from the named range cells (ex: updated shared formula)
+        with zipfile.ZipFile('temp_nr.xlsx') as f:
+            parts = dict([(name, f.read(name)) for name in f.namelist()])
+        parts['xl/worksheets/sheet1.xml'] = parts['xl/worksheets/sheet1.xml'].replace(
+            b'<c r="C2"', b'<c r="C2"><f t="shared" ref="C2:C3" si="0">B2+1</f></c><c r="X1"', 1)
+        os.remove('temp_nr.xlsx')
+        with zipfile.ZipFile('temp_nr.xlsx', 'w') as f:
+            for name, content in parts.items():
+                f.writestr(name, content)
+        db_nr = xl.readxl('temp_nr.xlsx', nr='table1')
+        db_nr.ws('sh1').update_address('C2', 'new')
+        with self.assertRaises(UserWarning) as context:
+            xl.writexl(db_nr, 'temp_nr.xlsx')
+        self.assertTrue('was read with readxl nr' in str(context.exception))
+        self.assertEqual(505, xl.readxl('temp_nr.xlsx').ws('sh1').address('E50'))
+        os.remove('temp_nr.xlsx')
+
+        # sheetnames with "!" and quotes
+        db = xl.Database()
+        db.add_ws("it's!")
+        db.ws("it's!").update_address('B2', 'bang')
+        db.add_nr('bang', "it's!", 'A1:B2')
+        xl.writexl(db, 'temp_nr.xlsx')
+        self.assertEqual([['', ''], ['', 'bang']], xl.readxl('temp_nr.xlsx', nr='bang').nr('bang'))
+        os.remove('temp_nr.xlsx')
+
+
+    def test_window(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.add_ws('sh2', {})
+        for row in range(1, 3001):
+            if row % 7 == 3:
+                continue
+            db.ws('sh1').update_index(row, 1, row)
+            db.ws('sh1').update_index(row, 2, 'text{}'.format(row % 10))
+
+        for compression in [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED]:
+            for fn in ['temp_window.xlsx', 'temp_window.xlsx.sheet1.pylightxl_index']:
+                if fn in os.listdir('.'):
+                    os.remove(fn)
+            xl.writexl(db, 'temp_window.xlsx', compression=compression)
+
+            index = xl.readxl_index('temp_window.xlsx', 'sh1', step=100, checkpoint=4096)
+            # first row at/after each step of 100 rows (row 500 is empty)
+            self.assertEqual([1, 100, 200, 300, 400, 501, 600], index['rows'][:7])
+            self.assertEqual(31, len(index['rows']))
+            self.assertTrue(os.path.isfile('temp_window.xlsx.sheet1.pylightxl_index'))
+
+            for rows in [(1, 5), (1500, 1600), (2990, 3100), (95, 205)]:
+                ws = xl.readxl_window('temp_window.xlsx', 'sh1', rows, index=index)
+                for row in range(rows[0], rows[1] + 1):
+                    self.assertEqual(db.ws('sh1').row(row), ws.row(row))
+                self.assertEqual([min(rows[1], 3000), 2], ws.size)
+
+            # sidecar index
+            ws = xl.readxl_window('temp_window.xlsx', 'sh1', (1000, 1010))
+            self.assertEqual(db.ws('sh1').col(1)[999:1010], ws.col(1)[999:1010])
+            self.assertEqual({}, xl.readxl_window('temp_window.xlsx', 'sh2', (1, 10))._data)
+
+        # stale sidecar index
+        db.ws('sh1').update_index(1, 1, 'new')
+        os.remove('temp_window.xlsx')
+        xl.writexl(db, 'temp_window.xlsx')
+        self.assertEqual(None, xl.readxl_index_load('temp_window.xlsx', 'sh1'))
+        self.assertEqual('new', xl.readxl_window('temp_window.xlsx', 'sh1', (1, 1)).index(1, 1))
+
+        for fn in ['temp_window.xlsx', 'temp_window.xlsx.sheet1.pylightxl_index',
+                   'temp_window.xlsx.sheet2.pylightxl_index']:
+            os.remove(fn)
+
+        # a row tag that is split between the 64KB chunks of a stored worksheet is still indexed
+        xl.writexl(db, 'temp_window.xlsx', compression=zipfile.ZIP_STORED)
+        with zipfile.ZipFile('temp_window.xlsx') as f:
+            parts = dict([(name, f.read(name)) for name in f.namelist()])
+        os.remove('temp_window.xlsx')
+        text = parts['xl/worksheets/sheet1.xml'].replace(b'<row ', b'<row ht="15.75" customHeight="1" ')
+        i_row = text.find(b'<row ', 60000)
+        i_sheetdata = text.find(b'<sheetData')
+        parts['xl/worksheets/sheet1.xml'] = text[:i_sheetdata] + b' ' * (65536 - 20 - i_row) + text[i_sheetdata:]
+        with zipfile.ZipFile('temp_window.xlsx', 'w') as f:
+            for name, content in parts.items():
+                f.writestr(name, content)
+        index = xl.readxl_index('temp_window.xlsx', 'sh1', step=1, index_fn=False)
+        self.assertEqual([row for row in range(1, 3001) if row % 7 != 3], index['rows'])
+        os.remove('temp_window.xlsx')
+
+    def test_sqlite_storage(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.add_ws('sh2', {})
+        for row in range(1, 201):
+            if row % 5 == 2:
+                continue
+            db.ws('sh1').update_index(row, 1, row)
+            db.ws('sh1').update_index(row, 2, 'text{}'.format(row % 3))
+            db.ws('sh1').update_index(row, 3, row * 0.5)
+        db.ws('sh1').update_address('D7', '=A1+1')
+        db.ws('sh2').update_address('B2', 'text')
+
+        if 'temp_sqlite.xlsx' in os.listdir('.'):
+            os.remove('temp_sqlite.xlsx')
+        xl.writexl(db, 'temp_sqlite.xlsx')
+
+        db_memory = xl.readxl('temp_sqlite.xlsx')
+        db_sqlite = xl.readxl('temp_sqlite.xlsx', storage={'sh1': 'sqlite'})
+        self.assertEqual(['sqlite', 'memory'], [db_sqlite.ws(ws).storage for ws in ['sh1', 'sh2']])
+        self.assertEqual(['sqlite', 'memory'],
+                         [xl.readxl('temp_sqlite.xlsx', storage_threshold=10).ws(ws).storage for ws in ['sh1', 'sh2']])
+
+        ws_memory = db_memory.ws('sh1')
+        ws_sqlite = db_sqlite.ws('sh1')
+        self.assertEqual(ws_memory.size, ws_sqlite.size)
+        self.assertEqual(list(ws_memory.rows), list(ws_sqlite.rows))
+        self.assertEqual(list(ws_memory.cols), list(ws_sqlite.cols))
+        self.assertEqual(ws_memory.col(4, formula=True), ws_sqlite.col(4, formula=True))
+        self.assertEqual(ws_memory.range('A1:D8'), ws_sqlite.range('A1:D8'))
+        self.assertEqual(ws_memory.keycol(1), ws_sqlite.keycol(1))
+        self.assertEqual(dict(ws_memory._data.items()), dict(ws_sqlite._data.items()))
+        # text comes back as str (python 2 sqlite3 returns unicode), the writers tell strings apart by type
+        self.assertEqual([str, int, float], [type(ws_sqlite.index(1, col)) for col in [2, 1, 3]])
+
+        ws_sqlite.update_index(300, 2, 'new')
+        self.assertEqual(([300, 4], 'new'), (ws_sqlite.size, ws_sqlite.index(300, 2)))
+        ws_sqlite.remove_index(300, 2)
+        self.assertEqual([200, 4], ws_sqlite.size)
+
+        # writers run on top of sqlite storage
+        xl.writecsv(db_sqlite, 'temp_sqlite', ws='sh1')
+        xl.writecsv(db_memory, 'temp_memory', ws='sh1')
+        with open('temp_sqlite_sh1.csv', 'r') as f_sqlite, open('temp_memory_sh1.csv', 'r') as f_memory:
+            self.assertEqual(f_memory.read(), f_sqlite.read())
+        os.remove('temp_sqlite_sh1.csv')
+        os.remove('temp_memory_sh1.csv')
+        content = xl.writexl_bytes(db_sqlite)
+        with open('temp_sqlite2.xlsx', 'wb') as f:
+            f.write(content)
+        self.assertEqual(ws_memory._data, xl.readxl('temp_sqlite2.xlsx').ws('sh1')._data)
+        os.remove('temp_sqlite2.xlsx')
+
+        # values of any type are kept
+        ws_sqlite.set_storage('memory')
+        self.assertEqual('memory', ws_sqlite.storage)
+        ws_sqlite.update_address('A1', True)
+        ws_sqlite.update_address('A2', 2 ** 70)
+        ws_sqlite.set_storage('sqlite')
+        self.assertEqual([True, 2 ** 70], [ws_sqlite.address('A1'), ws_sqlite.address('A2')])
+
+        # closing removes the temporary sqlite files
+        path = ws_sqlite._data.path
+        with db_sqlite:
+            self.assertTrue(os.path.isfile(path))
+        self.assertFalse(os.path.isfile(path))
+        os.remove('temp_sqlite.xlsx')
+
 class TestDatabase(TestCase):
     db = xl.Database()
 
@@ -375,6 +785,158 @@ class TestDatabase(TestCase):
         db.rename_ws('three', 'four')
         self.assertEqual(['two', 'four'], db.ws_names)
 
+    def test_snapshot(self):
+        db = xl.Database()
+        db.add_ws('sh1')
+        db.add_ws('sh2')
+        db.ws('sh1').update_address('A1', 'text')
+        db.ws('sh1').update_address('B1', 12)
+        db.ws('sh1').update_address('C1', 1.5)
+        db.ws('sh1').update_address('A2', True)
+        db.ws('sh1').update_address('B2', 2**70)
+        db.ws('sh1').update_address('C3', '=A1')
+        db.ws('sh2').set_emptycell(0)
+        db.add_nr('table1', 'sh1', 'A1:B2')
+
+        db.save_snapshot('temp_snapshot.pylightxl')
+        db_snap = xl.Database.load_snapshot('temp_snapshot.pylightxl')
+
+        self.assertEqual(['sh1', 'sh2'], db_snap.ws_names)
+        # worksheets are only read on first use
+        self.assertFalse(isinstance(db_snap._ws['sh2'], xl.Worksheet))
+        self.assertEqual(db.ws('sh1')._data, db_snap.ws('sh1')._data)
+        self.assertEqual([3, 3], db_snap.ws('sh1').size)
+        self.assertEqual('=A1', db_snap.ws('sh1').address('C3', formula=True))
+        self.assertEqual([['text', 12], [True, 2**70]], db_snap.nr('table1'))
+        self.assertEqual(0, db_snap.ws('sh2').address('B5'))
+
+        db_snap.remove_ws('sh1')
+        self.assertEqual(['sh2'], db_snap.ws_names)
+        del db_snap
+
+        # snapshot indexes that would run code when unpickled are refused
+        class Planted(object):
+            def __reduce__(self):
+                return os.mkdir, ('temp_snapshot_planted',)
+        with open('temp_snapshot.pylightxl', 'r+b') as f:
+            header = f.read(32)
+            f.seek(0, 2)
+            index_offset = f.tell()
+            index = xl.pickle.dumps(Planted(), 2)
+            f.write(index)
+            f.seek(0)
+            f.write(header[:16] + xl.struct.pack('<QQ', index_offset, len(index)))
+        with self.assertRaises(UserWarning) as context:
+            xl.Database.load_snapshot('temp_snapshot.pylightxl')
+        self.assertFalse(os.path.isdir('temp_snapshot_planted'))
+        os.remove('temp_snapshot.pylightxl')
+
+        # cell values that are not plain data can not be saved
+        import datetime
+        db.ws('sh2').update_address('A1', datetime.date(2020, 1, 1))
+        with self.assertRaises(UserWarning) as context:
+            db.save_snapshot('temp_snapshot.pylightxl')
+        os.remove('temp_snapshot.pylightxl')
+
+        with self.assertRaises(UserWarning) as context:
+            xl.Database.load_snapshot('input.csv')
+
+    def test_refresh(self):
+        db = xl.Database()
+        for ws in ['sh1', 'sh2', 'sh3']:
+            db.add_ws(ws)
+            db.ws(ws).update_address('A1', 'text ' + ws)
+        if 'temp_refresh.xlsx' in os.listdir('.'):
+            os.remove('temp_refresh.xlsx')
+        xl.writexl(db, 'temp_refresh.xlsx')
+
+        db_read = xl.readxl('temp_refresh.xlsx')
+        self.assertEqual([], db_read.refresh())
+
+        # one worksheet edited, new string appended to sharedStrings
+        db.ws('sh2').update_address('B2', 'new text')
+        xl.writexl(db, 'temp_refresh.xlsx')
+        self.assertEqual(['sh2'], db_read.refresh())
+        self.assertEqual('new text', db_read.ws('sh2').address('B2'))
+        self.assertEqual([], db_read.refresh())
+
+        # worksheet added
+        db.add_ws('sh4')
+        xl.writexl(db, 'temp_refresh.xlsx')
+        self.assertEqual(['sh1', 'sh2', 'sh3', 'sh4'], db_read.refresh())
+
+        # sharedStrings rewritten in a different order, every worksheet is read again
+        db_new = xl.Database()
+        for ws in ['sh1', 'sh2', 'sh3', 'sh4']:
+            db_new.add_ws(ws)
+        db_new.ws('sh4').update_address('A1', 'first')
+        db_new.ws('sh1').update_address('A1', 'text sh1')
+        os.remove('temp_refresh.xlsx')
+        xl.writexl(db_new, 'temp_refresh.xlsx')
+        self.assertEqual(['sh1', 'sh2', 'sh3', 'sh4'], db_read.refresh())
+        self.assertEqual('text sh1', db_read.ws('sh1').address('A1'))
+        self.assertEqual('first', db_read.ws('sh4').address('A1'))
+        os.remove('temp_refresh.xlsx')
+
+        with self.assertRaises(UserWarning) as context:
+            xl.Database().refresh()
+
+    def test_to_sqlite(self):
+        import sqlite3
+        db = xl.Database()
+        db.add_ws('sh1')
+        db.ws('sh1').update_address('A1', 'id')
+        db.ws('sh1').update_address('B1', 'name')
+        db.ws('sh1').update_address('C1', 'name')
+        for row in range(2, 6):
+            db.ws('sh1').update_index(row, 1, row)
+            db.ws('sh1').update_index(row, 2, 'text {}'.format(row))
+            db.ws('sh1').update_index(row, 3, row * 0.5)
+        db.ws('sh1').update_address('B3', '')
+        db.add_ws('sh "2"')
+        db.ws('sh "2"').update_address('B2', 1)
+
+        conn = sqlite3.connect(':memory:')
+        db.to_sqlite(conn, ws='sh1', header=True, batchsize=2)
+        self.assertEqual([(2, 'text 2', 1.0), (3, None, 1.5), (4, 'text 4', 2.0), (5, 'text 5', 2.5)],
+                         conn.execute('SELECT * FROM sh1').fetchall())
+        self.assertEqual(['id', 'name', 'name_2'],
+                         [col[1] for col in conn.execute('PRAGMA table_info(sh1)').fetchall()])
+        self.assertEqual(['INTEGER', 'TEXT', 'REAL'],
+                         [col[2] for col in conn.execute('PRAGMA table_info(sh1)').fetchall()])
+
+        with self.assertRaises(UserWarning) as context:
+            db.to_sqlite(conn, ws='sh1')
+        db.to_sqlite(conn, ws='sh1', header=True, if_exists='append')
+        self.assertEqual(8, conn.execute('SELECT COUNT(*) FROM sh1').fetchone()[0])
+        db.to_sqlite(conn, header=False, if_exists='replace')
+        self.assertEqual(5, conn.execute('SELECT COUNT(*) FROM sh1').fetchone()[0])
+        self.assertEqual([(None, None), (None, 1)], conn.execute('SELECT A, B FROM "sh ""2"""').fetchall())
+
+        # cancelled exports are rolled back
+        with self.assertRaises(UserWarning) as context:
+            db.to_sqlite(conn, if_exists='replace', progress=lambda record: False)
+        self.assertEqual(5, conn.execute('SELECT COUNT(*) FROM sh1').fetchone()[0])
+        self.assertEqual('', conn.isolation_level)
+
+        # a transaction the caller has open is neither committed nor rolled back
+        if hasattr(conn, 'in_transaction'):
+            conn.execute('DELETE FROM sh1')
+            with self.assertRaises(UserWarning) as context:
+                db.to_sqlite(conn, ws='sh "2"', if_exists='replace', progress=lambda record: False)
+            self.assertTrue(conn.in_transaction)
+            db.to_sqlite(conn, ws='sh "2"', if_exists='replace')
+            self.assertTrue(conn.in_transaction)
+            conn.rollback()
+            self.assertEqual(5, conn.execute('SELECT COUNT(*) FROM sh1').fetchone()[0])
+
+        # empty worksheets are skipped, the rest of the export is kept
+        db.add_ws('e', {})
+        db.to_sqlite(conn, ws=['e', 'sh1'], if_exists='replace')
+        self.assertEqual(None, conn.execute('SELECT name FROM sqlite_master WHERE name = ?', ('e',)).fetchone())
+        self.assertEqual(5, conn.execute('SELECT COUNT(*) FROM sh1').fetchone()[0])
+        conn.close()
+
 class TestWorksheet(TestCase):
 
     def test_ws_init(self):
@@ -430,6 +992,29 @@ class TestWorksheet(TestCase):
         self.assertEqual(1048576, ws.maxrow)
         self.assertEqual(16384, ws.maxcol)
 
+    def test_ws_remove(self):
+        ws = xl.Worksheet({'A1': {'v': 11, 'f': '', 's': ''}, 'C1': {'v': 13, 'f': '', 's': ''},
+                           'B3': {'v': 32, 'f': '', 's': ''}})
+        self.assertEqual([3, 3], ws.size)
+
+        ws.remove_address('B2')
+        self.assertEqual([3, 3], ws.size)
+        ws.remove_address('B3')
+        self.assertEqual([1, 3], ws.size)
+        ws.update_address('D5', 45)
+        self.assertEqual([5, 4], ws.size)
+        ws.remove_index(5, 4)
+        self.assertEqual([1, 3], ws.size)
+        ws.remove_address('$C$1')
+        self.assertEqual([1, 1], ws.size)
+        self.assertEqual('', ws.address('C1'))
+        ws.remove_index(1, 1)
+        self.assertEqual([0, 0], ws.size)
+
+        # size is known up front
+        ws = xl.Worksheet({'A1': {'v': 11, 'f': '', 's': ''}}, size=[1, 1])
+        self.assertEqual([1, 1], ws.size)
+
     def test_ws_size(self):
         ws = xl.Worksheet()
         self.assertEqual([0, 0], ws.size)
@@ -677,3 +1262,22 @@ class TestConversion(TestCase):
         self.assertEqual('PZD', xl.utility_num2columnletters(11496))
         self.assertEqual('QGK', xl.utility_num2columnletters(11685))
         self.assertEqual('XFD', xl.utility_num2columnletters(16384))
+
+    def test_batch_conversion(self):
+        self.assertEqual(16385, len(xl.UTILITY_COLUMNLETTERS))
+        self.assertEqual('XFD', xl.UTILITY_COLUMNLETTERS[16384])
+        self.assertEqual(16384, xl.UTILITY_COLUMNNUMS['XFD'])
+
+        # past column XFD and lowercase letters are calculated
+        self.assertEqual('XFE', xl.utility_num2columnletters(16385))
+        self.assertEqual(16385, xl.utility_columnletter2num('XFE'))
+        self.assertEqual(28, xl.utility_columnletter2num('ab'))
+        self.assertEqual([3, 28], xl.utility_address2index('ab3'))
+
+        self.assertEqual([[1, 1], [3, 16384], [2, 28]], xl.utility_addresses2indexes(['A1', 'XFD3', 'ab2']))
+        self.assertEqual(['A1', 'XFD3', 'XFE2'], xl.utility_indexes2addresses([(1, 1), (3, 16384), (2, 16385)]))
+        with self.assertRaises(UserWarning) as e:
+            xl.utility_addresses2indexes(['A1', '1A'])
+
+        self.assertEqual([['B1', 'C1'], ['B2', 'C2']], xl.utility_range2addresses('B1:C2'))
+        self.assertEqual([['A1']], xl.utility_range2addresses('$A$1'))
@@ -1,6 +1,6 @@
 # standard lib imports
 from unittest import TestCase
-import os, sys, shutil, io
+import os, sys, shutil, io, zipfile
 
 from pylightxl import pylightxl as xl
 
@@ -333,6 +333,197 @@ class TestWritexlNew(TestCase):
         db._sharedStrings = ['text']
         self.assertEqual(xl.writexl_new_content_types_text(db), xml_base.format(many_tag_sheets=many_tag_sheets, tag_sharedStrings=xml_tag_sharedStrings))
 
+    def test_sharedStrings_plan(self):
+        db = xl.Database()
+        db.add_ws('Sheet1', {'A1': {'v': 'text1', 'f': '', 's': ''},
+                             'A2': {'v': 10, 'f': '', 's': ''},
+                             'A3': {'v': '', 'f': 'A1', 's': ''},
+                             })
+        db.add_ws('Sheet2', {'A1': {'v': 'text2', 'f': '', 's': ''},
+                             'A2': {'v': 'text1', 'f': '', 's': ''},
+                             })
+
+        plan = xl.writexl_new_sharedStrings_plan(db)
+
+        self.assertEqual(['text1', 'text2'], db._sharedStrings)
+        self.assertEqual({'Sheet1': {'text1': 0}, 'Sheet2': {'text2': 1, 'text1': 0}}, plan)
+
+    def test_parallel_writer(self):
+        if 'temp_parallel.xlsx' in os.listdir('.'):
+            os.remove('temp_parallel.xlsx')
+
+        db = xl.Database()
+        for sheet_name in ['sh1', 'sh2', 'sh3']:
+            db.add_ws(sheet_name, {})
+            db.ws(sheet_name).update_address('A1', sheet_name)
+            db.ws(sheet_name).update_address('B2', 'shared')
+            db.ws(sheet_name).update_address('C3', 33)
+            db.ws(sheet_name).update_address('D4', '=C3+1')
+
+        xl.writexl(db, 'temp_parallel.xlsx', workers=2)
+
+        db_parallel = xl.readxl('temp_parallel.xlsx')
+        self.assertEqual(['sh1', 'sh2', 'sh3'], db_parallel.ws_names)
+        for sheet_name in ['sh1', 'sh2', 'sh3']:
+            self.assertEqual([4, 4], db_parallel.ws(sheet_name).size)
+            self.assertEqual(sheet_name, db_parallel.ws(sheet_name).address('A1'))
+            self.assertEqual('shared', db_parallel.ws(sheet_name).address('B2'))
+            self.assertEqual(33, db_parallel.ws(sheet_name).address('C3'))
+            self.assertEqual('C3+1', db_parallel.ws(sheet_name)._data['D4']['f'])
+
+        os.remove('temp_parallel.xlsx')
+
+    def test_compression(self):
+        if 'temp_compression.xlsx' in os.listdir('.'):
+            os.remove('temp_compression.xlsx')
+
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.ws('sh1').update_address('A1', 'text')
+
+        # default is deflated like excel writes its files
+        xl.writexl(db, 'temp_compression.xlsx')
+        with zipfile.ZipFile('temp_compression.xlsx', 'r') as f:
+            self.assertEqual({zipfile.ZIP_DEFLATED}, set([info.compress_type for info in f.infolist()]))
+        os.remove('temp_compression.xlsx')
+
+        xl.writexl(db, 'temp_compression.xlsx', compression=zipfile.ZIP_STORED)
+        with zipfile.ZipFile('temp_compression.xlsx', 'r') as f:
+            self.assertEqual({zipfile.ZIP_STORED}, set([info.compress_type for info in f.infolist()]))
+        self.assertEqual('text', xl.readxl('temp_compression.xlsx').ws('sh1').address('A1'))
+        os.remove('temp_compression.xlsx')
+
+        xl.writexl(db, 'temp_compression.xlsx', compresslevel=1)
+        self.assertEqual('text', xl.readxl('temp_compression.xlsx').ws('sh1').address('A1'))
+        os.remove('temp_compression.xlsx')
+
+        with self.assertRaises(UserWarning):
+            xl.writexl(db, 'temp_compression.xlsx', compression=99)
+
+    def test_fileobj_writer(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.ws('sh1').update_address('A1', 'text')
+        db.ws('sh1').update_address('B2', 22)
+
+        f = io.BytesIO()
+        xl.writexl(db, f)
+        self.assertEqual(None, db._source)
+        with zipfile.ZipFile(f, 'r') as f_zip:
+            self.assertTrue('xl/worksheets/sheet1.xml' in f_zip.namelist())
+
+        content = xl.writexl_bytes(db, compression=zipfile.ZIP_STORED)
+        self.assertEqual(b'PK', content[:2])
+
+        if 'temp_bytes.xlsx' in os.listdir('.'):
+            os.remove('temp_bytes.xlsx')
+        with open('temp_bytes.xlsx', 'wb') as f:
+            f.write(content)
+        db_bytes = xl.readxl('temp_bytes.xlsx')
+        self.assertEqual('text', db_bytes.ws('sh1').address('A1'))
+        self.assertEqual(22, db_bytes.ws('sh1').address('B2'))
+        os.remove('temp_bytes.xlsx')
+
+    def test_inline_strings(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.ws('sh1').update_address('A1', 'once')
+        db.ws('sh1').update_address('A2', 'twice')
+        db.ws('sh1').update_address('A3', ' twice')
+        db.ws('sh1').update_address('A4', 'twice')
+        db.ws('sh1').update_address('A5', 5)
+
+        text = xl.writexl_new_cell_text(db, 'A1', ' a & b', shared=set())
+        self.assertEqual('<c r="A1" t="inlineStr"><is><t xml:space="preserve"> a &amp; b</t></is></c>', text)
+
+        self.assertEqual(None, xl.writexl_new_sharedStrings_select(db, 'shared'))
+        self.assertEqual(set(), xl.writexl_new_sharedStrings_select(db, 'inline'))
+        self.assertEqual({'twice'}, xl.writexl_new_sharedStrings_select(db, 'auto'))
+        with self.assertRaises(UserWarning) as context:
+            xl.writexl_new_sharedStrings_select(db, 'other')
+
+        for strings in ['inline', 'auto']:
+            db._sharedStrings = []
+            db._sharedStrings_index = {}
+            content = xl.writexl_bytes(db, strings=strings)
+            if 'temp_inline.xlsx' in os.listdir('.'):
+                os.remove('temp_inline.xlsx')
+            with open('temp_inline.xlsx', 'wb') as f:
+                f.write(content)
+            db_inline = xl.readxl('temp_inline.xlsx')
+            self.assertEqual(['once', 'twice', ' twice', 'twice', 5], db_inline.ws('sh1').col(1))
+            self.assertEqual([] if strings == 'inline' else ['twice'], db._sharedStrings)
+            os.remove('temp_inline.xlsx')
+
+    def test_stats(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.add_ws('sh2', {})
+        db.ws('sh1').update_address('A1', 'text')
+        db.ws('sh1').update_address('B2', 'text')
+        db.ws('sh2').update_address('A1', 10)
+
+        if 'temp_stats.xlsx' in os.listdir('.'):
+            os.remove('temp_stats.xlsx')
+        stats = {}
+        xl.writexl(db, 'temp_stats.xlsx', stats=stats)
+        self.assertEqual(['workbook', 'sharedStrings', 'worksheet', 'worksheet', 'parts'],
+                         [record['phase'] for record in stats['phases']])
+        self.assertEqual([('sh1', 2), ('sh2', 1)],
+                         [(record['ws'], record['cells']) for record in stats['phases']
+                          if record['phase'] == 'worksheet'])
+        self.assertEqual(1, stats['phases'][-1]['strings'])
+
+        records = []
+        xl.readxl('temp_stats.xlsx', stats=records.append)
+        self.assertEqual(['zip', 'workbook', 'sharedStrings',
+                          'namespace', 'worksheet', 'size', 'namespace', 'worksheet', 'size'],
+                         [record['phase'] for record in records])
+        self.assertEqual([('sh1', 2, 2), ('sh2', 1, 0)],
+                         [(record['ws'], record['cells'], record['strings']) for record in records
+                          if record['phase'] == 'worksheet'])
+        self.assertEqual(1, records[2]['strings'])
+        for record in records:
+            self.assertTrue(record['time'] >= 0)
+            self.assertTrue(record['bytes'] > 0 or record['phase'] in ['zip', 'namespace', 'size'])
+        os.remove('temp_stats.xlsx')
+
+    def test_progress(self):
+        db = xl.Database()
+        db.add_ws('sh1', {})
+        db.add_ws('sh2', {})
+        for row in range(1, 20001):
+            db.ws('sh1').update_index(row, 1, row)
+        db.ws('sh2').update_address('A1', 'text')
+
+        if 'temp_progress.xlsx' in os.listdir('.'):
+            os.remove('temp_progress.xlsx')
+        records = []
+        xl.writexl(db, 'temp_progress.xlsx', progress=records.append)
+        self.assertEqual([('sh1', 0, 10000), ('sh1', 0, 20000), ('sh1', 1, None), ('sh2', 2, None), (None, 2, None)],
+                         [(record['ws'], record['sheets_done'], record['rows']) for record in records])
+
+        records = []
+        db_progress = xl.readxl('temp_progress.xlsx', progress=records.append)
+        self.assertEqual(20000, db_progress.ws('sh1').size[0])
+        self.assertEqual(records[-2]['bytes'], records[-2]['total_bytes'])
+        self.assertEqual((2, 2), (records[-1]['sheets_done'], records[-1]['sheets']))
+        self.assertEqual(['sh1', 'sh2'], sorted(set([record['ws'] for record in records[:-1]])))
+
+        # returning False cancels
+        with self.assertRaises(UserWarning) as context:
+            xl.readxl('temp_progress.xlsx', progress=lambda record: record['ws'] != 'sh2')
+        self.assertEqual('pylightxl - Cancelled by the progress callback.', str(context.exception))
+        os.remove('temp_progress.xlsx')
+
+        with self.assertRaises(UserWarning) as context:
+            xl.writexl(db, 'temp_progress.xlsx', progress=lambda record: record['rows'] != 10000)
+        self.assertFalse(os.path.isfile('temp_progress.xlsx'))
+
+        with self.assertRaises(UserWarning) as context:
+            xl.writecsv(db, 'temp_progress', progress=lambda record: record['rows'] != 10000)
+        self.assertFalse(os.path.isfile('temp_progress_sh1.csv'))
+
     def test_openpyxl(self):
         # test that pylightxl is able to write to a openpyxl output excel file (docProps/app.xml) is different than expected
         db = xl.readxl('openpyxl.xlsx')
@@ -467,6 +658,43 @@ class TestWritexlExisting(TestCase):
         if 'temp_wb.xlsx' in os.listdir('.'):
             os.remove('temp_wb.xlsx')
 
+    def test_integration_alt_writer_patch(self):
+        # cleanup failed test workbook
+        if 'temp_patch.xlsx' in os.listdir('.'):
+            os.remove('temp_patch.xlsx')
+        shutil.copy('openpyxl.xlsx', 'temp_patch.xlsx')
+
+        db = xl.readxl('temp_patch.xlsx')
+        self.assertEqual(set(), db.ws('Sheet')._dirty)
+
+        db.ws('Sheet').update_address('B2', 'new')
+        db.ws('Sheet').update_index(3, 1, '=A1+1')
+        self.assertEqual({'B2', 'A3'}, db.ws('Sheet')._dirty)
+
+        xl.writexl(db, 'temp_patch.xlsx')
+        self.assertEqual(set(), db.ws('Sheet')._dirty)
+
+        with zipfile.ZipFile('temp_patch.xlsx', 'r') as f:
+            text = f.read('xl/worksheets/sheet1.xml').decode()
+        # untouched cells and xml the db does not model are kept as is
+        self.assertTrue('<c r="A1" t="n"><v>42</v></c>' in text)
+        self.assertTrue('<outlinePr summaryBelow="1" summaryRight="1" />' in text)
+        self.assertTrue('<dimension ref="A1:B3"/>' in text)
+        self.assertTrue('<row r="2"><c r="B2" t="s"><v>0</v></c></row>' in text)
+        self.assertTrue('<row r="3"><c r="A3"><f>A1+1</f></c></row>' in text)
+
+        # updating the same cell again replaces it in-place
+        db.ws('Sheet').update_address('A1', 43)
+        xl.writexl(db, 'temp_patch.xlsx')
+
+        db_alt = xl.readxl('temp_patch.xlsx')
+        self.assertEqual([3, 2], db_alt.ws('Sheet').size)
+        self.assertEqual(43, db_alt.ws('Sheet').address('A1'))
+        self.assertEqual('new', db_alt.ws('Sheet').address('B2'))
+        self.assertEqual('A1+1', db_alt.ws('Sheet')._data['A3']['f'])
+
+        os.remove('temp_patch.xlsx')
+
 
 class TestWriteCSV(TestCase):
 
@@ -534,3 +762,128 @@ class TestWriteCSV(TestCase):
         self.assertEqual('20,20.0,20.0,False,\n', f.readline())
         self.assertEqual(',,,, \n', f.readline())
         self.assertEqual('sh2\n', f.readline())
+
+    def test_writecsv_quoting(self):
+        db = xl.Database()
+        db.add_ws('sh1')
+        db.add_ws('sh2')
+        db.ws('sh1').update_address('A1', 'a,b')
+        db.ws('sh1').update_address('B1', 'say "hi"')
+        db.ws('sh1').update_address('C3', 'line\nbreak')
+        db.ws('sh2').update_address('B2', 22)
+
+        f = io.StringIO()
+        xl.writecsv(db=db, fn=f, ws='sh1')
+        self.assertEqual('"a,b","say ""hi""",\n,,\n,,"line\nbreak"\n', f.getvalue())
+
+        self.assertEqual([['', ''], ['', 22]], list(xl.writecsv_rows(db.ws('sh2'))))
+
+        xl.writecsv(db=db, fn='outcsv', workers=2)
+        with open('outcsv_sh2.csv', 'r') as f:
+            self.assertEqual(',\n,22\n', f.read())
+        os.remove('outcsv_sh1.csv')
+        os.remove('outcsv_sh2.csv')
+
+    def test_xlsx2csv(self):
+        db = xl.Database()
+        db.add_ws('sh1')
+        db.add_ws('sh2')
+        db.ws('sh1').update_address('A1', 'a,b')
+        db.ws('sh1').update_address('C1', 12)
+        db.ws('sh1').update_address('B4', 4.5)
+        db.ws('sh2').update_address('B2', 'sh2')
+
+        if 'temp_xlsx2csv.xlsx' in os.listdir('.'):
+            os.remove('temp_xlsx2csv.xlsx')
+        xl.writexl(db, 'temp_xlsx2csv.xlsx')
+
+        f = io.StringIO()
+        xl.xlsx2csv('temp_xlsx2csv.xlsx', f)
+        self.assertEqual('"a,b",,12\n,,\n,,\n,4.5,\n,\n,sh2\n', f.getvalue())
+
+        xl.xlsx2csv('temp_xlsx2csv.xlsx', 'outcsv', ws='sh2')
+        self.assertFalse('outcsv_sh1.csv' in os.listdir('.'))
+        with open('outcsv_sh2.csv', 'r') as f:
+            self.assertEqual(',\n,sh2\n', f.read())
+        os.remove('outcsv_sh2.csv')
+
+        with self.assertRaises(UserWarning) as context:
+            xl.xlsx2csv('temp_xlsx2csv.xlsx', 'outcsv', ws='sh3')
+        os.remove('temp_xlsx2csv.xlsx')
+
+
+class TestAsync(TestCase):
+
+    def test_areadxl_awritexl(self):
+        if sys.version_info < (3, 5):
+            return
+        import asyncio
+
+        db = xl.Database()
+        db.add_ws('sh1')
+        db.add_ws('sh2')
+        db.ws('sh1').update_address('A1', 'text')
+        db.ws('sh2').update_address('B2', 22)
+
+        if 'temp_async.xlsx' in os.listdir('.'):
+            os.remove('temp_async.xlsx')
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(xl.awritexl(db, 'temp_async.xlsx', loop=loop, chunksize=256))
+            self.assertFalse('temp_async.xlsx.pylightxl.tmp' in os.listdir('.'))
+            self.assertEqual(os.path.abspath('temp_async.xlsx'), db._source)
+
+            db_read = loop.run_until_complete(xl.areadxl('temp_async.xlsx', loop=loop))
+            self.assertEqual(['sh1', 'sh2'], db_read.ws_names)
+            self.assertEqual('text', db_read.ws('sh1').address('A1'))
+            self.assertEqual(22, db_read.ws('sh2').address('B2'))
+            self.assertEqual([2, 2], db_read.ws('sh2').size)
+
+            # existing files are patched
+            db.ws('sh1').update_address('C3', 33)
+            loop.run_until_complete(xl.awritexl(db, 'temp_async.xlsx', loop=loop))
+            self.assertEqual(33, xl.readxl('temp_async.xlsx').ws('sh1').address('C3'))
+
+            # concurrent writes to existing files do not share a working directory or temp folder
+            import concurrent.futures
+            fns = ['temp_async{}.xlsx'.format(i) for i in range(4)]
+            for fn in fns:
+                xl.writexl(db, fn)
+            with concurrent.futures.ThreadPoolExecutor(4) as executor:
+                loop.run_until_complete(asyncio.gather(*[xl.awritexl(xl.readxl(fn), fn, executor=executor, loop=loop)
+                                                         for fn in fns]))
+            for fn in fns:
+                self.assertEqual(33, xl.readxl(fn).ws('sh1').address('C3'))
+                os.remove(fn)
+
+            # cancelling a write to an existing file leaves it untouched
+            import threading
+            release = threading.Event()
+            db.ws('sh1').update_address('D4', 44)
+            with concurrent.futures.ThreadPoolExecutor(1) as executor:
+                future = xl.awritexl(db, 'temp_async.xlsx', executor=executor, loop=loop,
+                                     progress=lambda record: release.wait(5))
+                future.cancel()
+                release.set()
+            loop.run_until_complete(asyncio.sleep(0.1))
+            self.assertEqual('', xl.readxl('temp_async.xlsx').ws('sh1').address('D4'))
+            self.assertEqual([], [name for name in os.listdir('.') if name.startswith('_pylightxl_')])
+            loop.run_until_complete(xl.awritexl(db, 'temp_async.xlsx', loop=loop))
+            self.assertEqual(44, xl.readxl('temp_async.xlsx').ws('sh1').address('D4'))
+
+            # new files get an .xlsx extension like writexl
+            loop.run_until_complete(xl.awritexl(db, 'temp_async_ext.xlsm', loop=loop))
+            self.assertTrue('temp_async_ext.xlsx' in os.listdir('.'))
+            os.remove('temp_async_ext.xlsx')
+
+            future = xl.areadxl('temp_async.xlsx', loop=loop)
+            future.cancel()
+            with self.assertRaises(asyncio.CancelledError) as context:
+                loop.run_until_complete(future)
+
+            with self.assertRaises(UserWarning) as context:
+                loop.run_until_complete(xl.areadxl('missing.xlsx', loop=loop))
+        finally:
+            loop.close()
+            os.remove('temp_async.xlsx')